@@ -1,22 +1,62 @@
 # pip install fastapi uvicorn openai python-dotenv
-from fastapi import FastAPI
-from pydantic import BaseModel
-from openai import AsyncOpenAI
-import os
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from pydantic import BaseModel, Field
+import asyncio
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
-from crawling import fetch_recruitment_info,convert_to_recruitment_info, fetch_and_store_job_content
+from crawling import (
+    fetch_recruitment_info_async, fetch_recruitment_pages_async, iter_recruitment_pages_async,
+    convert_to_recruitment_info, SEARCH_MAX_PAGES,
+)
+from search_cache import SearchCache, normalize_company
+from streaming import ndjson_line, sse_event, NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, SSE_HEADERS
+from http_client import aclose_async_client
 from fastapi import Query
 from pathlib import Path
-from job_gpt import fetch_job_json_by_company
-from image_ocr import perform_ocr_to_txt_auto
+from contextlib import asynccontextmanager
+from job_pipeline import fetch_job_list, artifact_sink
+from job_queue import job_queue, JobQueueFull
+from feedback_engine import stream_feedback, iter_feedback_batch, FEEDBACK_ENGINE
+from assistant_manage import get_assistant_id
+from ocr_executor import ocr_executor, OCRQueueFull
+from openai_scheduler import openai_scheduler, OpenAIQueueFull
+from crawl_scheduler import crawl_scheduler
+from http_cache import http_cache
+from text_normalize import count_tokens
+from job_gpt import EXTRACTION_MODEL
+from ocr_cache import ocr_cache
+from extraction_cache import extraction_cache
+from response_cache import response_cache
+import metrics
 
 env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path) # Load .env file if present
 
-openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 시작 시 Assistant 를 한 번만 확인해 프로세스 전역으로 캐시 (요청마다 retrieve 하지 않음)
+    if FEEDBACK_ENGINE == "assistant":
+        try:
+            await get_assistant_id()
+        except Exception as e:
+            print(f"⚠️ Assistant 확인 실패 (첫 요청 때 다시 시도): {e}")
+    # OpenAI 스케줄러의 토큰 추정용 tiktoken 인코딩을 미리 불러 둠 (첫 요청이 로딩을 기다리지 않도록)
+    await asyncio.to_thread(count_tokens, "", EXTRACTION_MODEL)
+    # /jobdescription?mode=async 작업을 실행할 워커 Task
+    job_queue.start()
+    yield
+    # 종료 시 실행 중인 작업을 멈추고, 남은 산출물 저장을 마치고 크롤러 커넥션 풀 정리
+    await job_queue.stop()
+    await artifact_sink.drain()
+    await aclose_async_client()
+    ocr_executor.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+# /search 결과 캐시 (TTL + stale-while-revalidate, 워커 간 디스크 공유)
+search_cache = SearchCache()
 
 # Allow CORS for local dev
 app.add_middleware(
@@ -27,32 +67,185 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청별 지연 · 진행 중 요청 수 (/metrics)
+app.add_middleware(metrics.MetricsMiddleware)
+
 
 @app.get("/search")
-async def search_endpoint(company: str = Query(...)):
+async def search_endpoint(
+    company: str = Query(...),
+    pages: int = Query(1, ge=1, le=SEARCH_MAX_PAGES),
+):
     """
     프론트에서 입력받은 회사명을 가지고 웹크롤링 해서
     모집공고 데이터를 뽑아주는 함수
+    (pages > 1 이면 여러 결과 페이지를 동시에 가져와 합침)
     """
     print(f"Received company: {company}")
-    data = fetch_recruitment_info(company)
-    ans = convert_to_recruitment_info(data)
+
+    async def load():
+        if pages > 1:
+            data = await fetch_recruitment_pages_async(company, max_pages=pages)
+        else:
+            data = await fetch_recruitment_info_async(company)
+        return convert_to_recruitment_info(data)
+
+    cache_key = f"{normalize_company(company)}|pages={pages}"
+    ans = await search_cache.get_or_load(cache_key, load)
 
     if not ans:
         return {"message": "No recruitment information found."}
     
     return ans
 
+
+@app.get("/search/stream")
+async def search_stream_endpoint(
+    company: str = Query(...),
+    pages: int = Query(SEARCH_MAX_PAGES, ge=1, le=SEARCH_MAX_PAGES),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+):
+    """
+    /search 의 스트리밍 버전
+    결과 페이지를 동시에 가져오면서, 파싱이 끝난 공고부터 바로 내려보냄
+    - ndjson: 공고 1개당 JSON 한 줄
+    - sse   : 공고 1개당 data 이벤트, 마지막에 event: done (총 개수)
+    """
+    print(f"Received company (stream): {company}")
+
+    async def generate():
+        seen, count = set(), 0
+        async for _, data in iter_recruitment_pages_async(company, max_pages=pages):
+            for item in convert_to_recruitment_info(data):
+                if item.get("url") in seen:
+                    continue
+                seen.add(item.get("url"))
+                count += 1
+                yield sse_event(item) if format == "sse" else ndjson_line(item)
+        if format == "sse":
+            yield sse_event({"count": count}, event="done")
+
+    if format == "sse":
+        return StreamingResponse(generate(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+@app.get("/ocr/stats")
+async def ocr_stats_endpoint():
+    """
+    OCR 프로세스 풀 상태 (대기열 깊이, 처리 시간 등) + OCR 캐시 hit/miss
+    """
+    return {**ocr_executor.stats(), "cache": ocr_cache.stats()}
+
+# 캐시 hit 비율 · OCR 대기열은 기존 stats() 를 스크레이프 때 읽어서 노출
+_caches = {
+    "search": search_cache,
+    "http": http_cache,
+    "ocr": ocr_cache,
+    "extraction": extraction_cache,
+    "response": response_cache,
+}
+metrics.register_callback(
+    "devcoach_cache_hit_ratio", "캐시별 hit 비율 (워커 시작 이후)", "gauge",
+    lambda: [({"cache": name}, cache.stats()["hit_ratio"]) for name, cache in _caches.items()],
+)
+def _cache_lookups():
+    for name, cache in _caches.items():
+        stats = cache.stats()
+        # stale/exact/semantic hit 도 hit 로 합침 (ocr 의 total_* 는 전체 워커 누적이라 제외)
+        hits = sum(v for k, v in stats.items() if k.endswith("hits") and not k.startswith("total_"))
+        yield {"cache": name, "result": "hit"}, hits
+        yield {"cache": name, "result": "miss"}, stats["misses"]
+
+metrics.register_callback(
+    "devcoach_cache_lookups_total", "캐시별 조회 수 (result=hit|miss)", "counter", _cache_lookups,
+)
+metrics.register_callback(
+    "devcoach_ocr_tasks", "OCR 프로세스 풀 작업 수 (state=in_flight|abandoned|queued)", "gauge",
+    lambda: [
+        ({"state": "in_flight"}, ocr_executor.stats()["in_flight"]),
+        ({"state": "abandoned"}, ocr_executor.stats()["abandoned"]),
+        ({"state": "queued"}, ocr_executor.stats()["queue_depth"]),
+    ],
+)
+metrics.register_callback(
+    "devcoach_ocr_events_total", "OCR 작업 결과 (result=completed|failed|rejected|timeout)", "counter",
+    lambda: [
+        ({"result": result}, ocr_executor.stats()[key])
+        for result, key in (
+            ("completed", "completed"), ("failed", "failed"),
+            ("rejected", "rejected"), ("timeout", "timeouts"),
+        )
+    ],
+)
+
+metrics.register_callback(
+    "devcoach_openai_queued", "OpenAI 스케줄러에서 rate limit 버킷을 기다리는 호출 수", "gauge",
+    lambda: [({}, openai_scheduler.stats()["queued"])],
+)
+metrics.register_callback(
+    "devcoach_openai_events_total", "OpenAI 호출 결과 (result=completed|failed|rejected|retry)", "counter",
+    lambda: [
+        ({"result": result}, openai_scheduler.stats()[key])
+        for result, key in (
+            ("completed", "completed"), ("failed", "failed"),
+            ("rejected", "rejected"), ("retry", "retries"),
+        )
+    ],
+)
+
+metrics.register_callback(
+    "devcoach_crawl_host_rate", "호스트별 현재 크롤링 속도 (req/s, 감속 반영)", "gauge",
+    lambda: [({"host": host}, stats["rate"]) for host, stats in crawl_scheduler.stats().items()],
+)
+metrics.register_callback(
+    "devcoach_crawl_circuit_open", "호스트별 circuit 상태 (1=open/half_open)", "gauge",
+    lambda: [
+        ({"host": host}, int(stats["circuit"] != "closed"))
+        for host, stats in crawl_scheduler.stats().items()
+    ],
+)
+metrics.register_callback(
+    "devcoach_crawl_requests_total", "호스트별 크롤링 요청 결과 (result=succeeded|failed|throttled|rejected)", "counter",
+    lambda: [
+        ({"host": host, "result": result}, stats[result])
+        for host, stats in crawl_scheduler.stats().items()
+        for result in ("succeeded", "failed", "throttled", "rejected")
+    ],
+)
+
+metrics.register_callback(
+    "devcoach_jobs", "비동기 /jobdescription 작업 수 (state=queued|running)", "gauge",
+    lambda: [
+        ({"state": "queued"}, job_queue.stats()["queued"]),
+        ({"state": "running"}, job_queue.stats()["running"]),
+    ],
+)
+metrics.register_callback(
+    "devcoach_job_events_total", "비동기 작업 결과 (result=succeeded|failed|rejected)", "counter",
+    lambda: [({"result": result}, job_queue.stats()[result]) for result in ("succeeded", "failed", "rejected")],
+)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Prometheus 텍스트 형식 메트릭 (단계별 지연, 토큰 사용량, 캐시 hit 비율, 진행 중 작업 수)
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 class JobDescriptionRequest(BaseModel):
     company: str
     url : str
     
 @app.post("/jobdescription")
-async def chat_endpoint(req: JobDescriptionRequest):
+async def chat_endpoint(
+    req: JobDescriptionRequest,
+    mode: str = Query("sync", pattern="^(sync|async)$"),
+):
     """
     프론트에서 입력받은 회사명, url을 바탕으로 웹크롤링을 하여
     텍스트 또는 이미지 파일을 ocr 과정을 통해
     직무 종류 데이터를 뽑아주는 함수
+    (mode=async 면 작업 ID 만 바로 반환(202)하고 결과는 GET /jobs/{id} 또는 /jobs/{id}/events 로 조회)
     """
     
     # 회사
@@ -60,14 +253,33 @@ async def chat_endpoint(req: JobDescriptionRequest):
     # url
     url = req.url
 
-    fetch_and_store_job_content(url, company) # 직무 txt파일로 뽑기
-
-    is_ocr_success = perform_ocr_to_txt_auto(company) # 이미지파일 직무 txt파일로 뽑기
-
-    if is_ocr_success == None:
-        print('ocr 된 게 없습니다.')
+    if mode == "async":
+        try:
+            job = await job_queue.submit(company, url)
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+        return JSONResponse(
+            status_code=202,
+            content={
+                "job_id": job["id"],
+                "status": job["status"],
+                "status_url": f"/jobs/{job['id']}",
+                "events_url": f"/jobs/{job['id']}/events",
+            },
+        )
 
-    job_list = await fetch_job_json_by_company(company)
+    # 같은 공고(rec_idx)에 대한 동시 요청은 파이프라인을 한 번만 실행
+    try:
+        job_list = await fetch_job_list(company, url)
+    except OCRQueueFull as e:
+        # OCR 대기열이 가득 찬 경우 → 잠시 후 재시도 요청
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except OpenAIQueueFull as e:
+        # OpenAI 호출 대기열이 가득 찬 경우 (rate limit 한도까지 밀려 있음)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    except TimeoutError as e:
+        # 다른 요청이 실행 중인 같은 공고의 결과를 기다리다 시간 초과
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
     if job_list == None:
         return {"message" : "None"}
     else:
@@ -267,6 +479,37 @@ async def chat_endpoint(req: JobDescriptionRequest):
     # ]
 
 
+@app.get("/jobs/{job_id}")
+async def job_status_endpoint(job_id: str):
+    """
+    /jobdescription?mode=async 작업 조회
+    - status: queued | running | succeeded | failed, stage: 현재 단계 (crawl/images/ocr/extraction)
+    - succeeded 면 result 에 동기 /jobdescription 과 같은 응답, failed 면 error
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 없거나 보관 기간이 지났습니다.")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def job_events_endpoint(job_id: str):
+    """
+    작업 진행 상황 SSE
+    - 기본 이벤트: 상태·단계가 바뀔 때마다 작업 레코드
+    - event: done  끝난 작업 레코드 (succeeded / failed)
+    """
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="작업이 없거나 보관 기간이 지났습니다.")
+
+    async def generate():
+        async for job in job_queue.watch(job_id):
+            if job["status"] in ("succeeded", "failed"):
+                yield sse_event(job, event="done")
+            else:
+                yield sse_event(job)
+
+    return StreamingResponse(generate(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
 class AssistantRequest(BaseModel):
     company: str
     position: str
@@ -278,9 +521,10 @@ class AssistantRequest(BaseModel):
     question: str 
     answer: str
      
-@app.post("/assistant")
-async def assistant_endpoint(req: AssistantRequest):
-    
+def build_feedback_message(req: AssistantRequest) -> str:
+    """
+    요청의 직무 정보 + 질문/답변으로 Assistant 에 보낼 유저 메세지(user prompt)를 만듭니다.
+    """
     # 파라미터 추출
     # 회사 
     company = req.company
@@ -301,17 +545,8 @@ async def assistant_endpoint(req: AssistantRequest):
     # 답변
     answer = req.answer
 
-    #  assistant = openai.beta.assistants.create(
-    #     name="Devcorch",
-    #     instructions="You are a helpful assistant that answers user queries.",
-    #     model="gpt-4o-mini",
-    # )
-
-    # 우리는 앞서 만든 assistant를 사용합니다.
-    assistant = await openai.beta.assistants.retrieve("asst_jjSTOBjMS5aNgt5U8GcONkyO")
-
     # 유저 메세지(user prompt) 생성
-    user_message = f"""
+    return f"""
     -회사: {company}
     -직무: {position}
     -자격요건: {qualifications}
@@ -337,41 +572,105 @@ async def assistant_endpoint(req: AssistantRequest):
     4. 요청이 오지 않는 한 영어를 사용하지 않는다.  
     """
 
-    # Create a new thread with the user's message
-    thread = await openai.beta.threads.create(
-        messages=[{"role": "user", "content": user_message}]
-    )
-
-    # Create a run and poll until completion using the helper method
-    run = await openai.beta.threads.runs.create_and_poll(
-        thread_id=thread.id, assistant_id=assistant.id
-    )
-
-    # Get messages for this specific run
-    messages = list(
-        await openai.beta.threads.messages.list(thread_id=thread.id, run_id=run.id)
-    )
-
-    # Process the first message's content and annotations
-    message_content = messages[0][1][0].content[0].text
-    annotations = message_content.annotations
-    citations = []
-
-    # Replace annotations with citation markers and build citations list
-    for index, annotation in enumerate(annotations):
-        message_content.value = message_content.value.replace(
-            annotation.text, f"[{index}]"
-        )
-        if file_citation := getattr(annotation, "file_citation", None):
-            cited_file = await openai.files.retrieve(file_citation.file_id)
-            citations.append(f"[{index}] {cited_file.filename}")
-
-    # Combine message content with citations if any exist
-    assistant_reply = message_content.value
-    if citations:
-        assistant_reply += "\n\n" + "\n".join(citations)
+def feedback_request(req: AssistantRequest) -> dict:
+    """
+    stream_feedback 인자: user_message + 응답 캐시 키 (답변을 뺀 나머지 요청 내용 / 답변)
+    """
+    return {
+        "user_message": build_feedback_message(req),
+        "cache_scope": build_feedback_message(req.model_copy(update={"answer": ""})),
+        "cache_answer": req.answer,
+    }
+
+@app.post("/assistant")
+async def assistant_endpoint(req: AssistantRequest):
+    """
+    자기소개서 답변 피드백 (JSON 한 번에 반환)
+    - FEEDBACK_ENGINE=assistant: Assistants streaming Run (create_and_poll 폴링 없음)
+    - FEEDBACK_ENGINE=chat     : Chat Completions 한 번 호출
+    """
+    # Assistant 는 lifespan 에서 한 번 확인해 둔 것을 사용 (assistant_manage.get_assistant_id)
+    # Run the configured engine and keep the final (citation-formatted) reply
+    assistant_reply = ""
+    try:
+        async for event in stream_feedback(**feedback_request(req), stream=False):
+            assistant_reply = event["reply"]
+    except OpenAIQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     return {"reply": assistant_reply}
-  
+
+@app.post("/assistant/stream")
+async def assistant_stream_endpoint(req: AssistantRequest):
+    """
+    자기소개서 답변 피드백을 SSE 로 스트리밍
+    - 기본 이벤트: {"delta": "..."}  생성되는 토큰 조각
+    - event: done  {"reply": "..."}  인용 정리까지 끝난 전체 응답 (/assistant 응답과 동일)
+    - event: error {"detail": "..."} 실행 중 오류
+    """
+    request = feedback_request(req)
+
+    async def generate():
+        try:
+            async for event in stream_feedback(**request):
+                if "reply" in event:
+                    yield sse_event(event, event="done")
+                else:
+                    yield sse_event(event)
+        except RuntimeError as e:
+            yield sse_event({"detail": str(e)}, event="error")
+
+    return StreamingResponse(generate(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+class QuestionAnswer(BaseModel):
+    question: str
+    answer: str
+
+class AssistantBatchRequest(BaseModel):
+    company: str
+    position: str
+    qualifications: str = ""
+    requirements: str = ""
+    duties: str = ""
+    preferred: str = ""
+    ideal: str = ""
+    items: list[QuestionAnswer] = Field(..., min_length=1, max_length=20)
+
+@app.post("/assistant/batch")
+async def assistant_batch_endpoint(
+    req: AssistantBatchRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+):
+    """
+    자기소개서 문항 여러 개를 한 번에 첨삭 (직무 정보는 한 번만 전송)
+    문항들은 동시에 실행하고(FEEDBACK_BATCH_CONCURRENCY 개까지), 끝난 문항부터 바로 내려보냄
+    - ndjson: 문항 1개당 {"index", "question", "reply"} 또는 {"index", "question", "error"} 한 줄
+    - sse   : 문항 1개당 data 이벤트, 마지막에 event: done (총 개수)
+    """
+    job = req.model_dump(exclude={"items"})
+    requests = [
+        feedback_request(AssistantRequest(**job, question=qa.question, answer=qa.answer))
+        for qa in req.items
+    ]
+
+    async def generate():
+        count = 0
+        async for index, result in iter_feedback_batch(requests):
+            item = {"index": index, "question": req.items[index].question}
+            if isinstance(result, Exception):
+                item["error"] = str(result)
+            else:
+                item["reply"] = result
+            count += 1
+            yield sse_event(item) if format == "sse" else ndjson_line(item)
+        if format == "sse":
+            yield sse_event({"count": count}, event="done")
+
+    if format == "sse":
+        return StreamingResponse(generate(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
 #   print(f"Received company: {company}, position: {position}, qualifications: {qualifications}, requirements: {requirements}, duties: {duties}, preferred: {preferred}")
 #   feedback = f"{req.company}의 {req.position} 직무 기준으로 첨삭을 완료했습니다."
 #   return {"reply": feedback}
@@ -0,0 +1,219 @@
+"""
+artifact_store.py
+~~~~~~~~~~~~~~~~~
+/jobdescription 파이프라인 산출물(다운로드한 본문 이미지)을
+내용 해시(sha256) 기준으로 저장하는 모듈입니다.
+
+디렉토리 구조
+-------------
+.cache/artifacts/
+├─ blobs/ab/abcdef...      ← 내용 해시 = 파일명 (같은 내용은 한 번만 저장)
+└─ manifests/<rec_idx>.json
+     {"image:0": {"input": <입력 해시>, "output": <산출물 해시>, "updated": ts}, ...}
+
+주요 기능
+---------
+1. **put_blob(data) / get_blob(digest) / blob_path(digest)**  내용 주소 기반 저장·조회
+2. **record(rec_idx, stage, input_hash, output_hash)**  공고별 단계 결과 기록
+3. **lookup(rec_idx, stage, input_hash)**
+   입력 해시가 지난번과 같고 산출물이 남아 있으면 산출물 해시 반환 → 단계 생략
+4. 모든 쓰기는 임시 파일 + ``os.replace`` 로 원자적으로 처리
+5. blob 총 용량이 MAX_BYTES 를 넘으면 오래 안 쓴(mtime) blob 부터 삭제
+6. **AsyncArtifactSink**
+   파이프라인용 비동기 래퍼. ``submit()`` 은 해시만 바로 계산해 돌려주고
+   실제 디스크 쓰기는 백그라운드 스레드에서 처리합니다(ARTIFACT_PERSIST=0 이면 끔).
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+ARTIFACT_DIR       = Path(os.getenv("ARTIFACT_DIR", str(PROJECT_ROOT / ".cache" / "artifacts")))
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(512 * 1024 * 1024)))
+EVICT_TARGET_RATIO = 0.9                     # 정리 후 MAX_BYTES 의 90% 까지 줄임
+# 0 이면 디스크에 아무것도 남기지 않고 단계 재사용도 하지 않음
+ARTIFACT_PERSIST   = os.getenv("ARTIFACT_PERSIST", "1") != "0"
+
+# ---------------------------------------------------------------------------
+# Helper: 해시 & 원자적 쓰기
+# ---------------------------------------------------------------------------
+
+def content_hash(*parts: bytes | str | None) -> str:
+    """여러 조각을 순서대로 이어 sha256 해시(hex)를 만듭니다. None 은 빈 조각."""
+    h = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b""
+        elif isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(len(part).to_bytes(8, "big"))   # 조각 경계가 섞이지 않도록 길이 접두
+        h.update(part)
+    return h.hexdigest()
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """같은 디렉토리의 임시 파일에 쓴 뒤 os.replace 로 교체합니다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+# ---------------------------------------------------------------------------
+# Public: ArtifactStore
+# ---------------------------------------------------------------------------
+
+class ArtifactStore:
+    """내용 해시 기반 blob 저장소 + 공고(rec_idx)별 단계 manifest."""
+
+    def __init__(self, root: Path = ARTIFACT_DIR, max_bytes: int = ARTIFACT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.blob_dir = self.root / "blobs"
+        self.manifest_dir = self.root / "manifests"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest_lock = threading.Lock()  # 백그라운드 쓰기 간 manifest 갱신 직렬화
+        # 워커별 대략적인 사용량 (시작 시 한 번 스캔, 이후 put 마다 누적)
+        self._total_bytes = sum(p.stat().st_size for p in self._iter_blobs())
+
+    # ------------------------------ blob ---------------------------------
+
+    def _iter_blobs(self):
+        return (p for p in self.blob_dir.glob("*/*") if not p.name.startswith(".tmp-"))
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    def put_blob(self, data: bytes) -> str:
+        """data 를 저장하고 내용 해시를 반환합니다(이미 있으면 쓰지 않음)."""
+        digest = content_hash(data)
+        path = self.blob_path(digest)
+        if path.exists():
+            os.utime(path)                       # 최근 사용 표시
+            return digest
+        atomic_write(path, data)
+        self._total_bytes += len(data)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+        return digest
+
+    def get_blob(self, digest: str) -> Optional[bytes]:
+        path = self.blob_path(digest)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def evict(self) -> None:
+        """오래 안 쓴 blob 부터 지워 용량을 MAX_BYTES * 0.9 이하로 맞춥니다."""
+        blobs = []
+        for p in self._iter_blobs():
+            try:
+                st = p.stat()
+            except FileNotFoundError:            # 다른 워커가 먼저 삭제
+                continue
+            blobs.append((st.st_mtime, st.st_size, p))
+        blobs.sort()
+
+        total = sum(size for _, size, _ in blobs)
+        target = int(self.max_bytes * EVICT_TARGET_RATIO)
+        for _, size, p in blobs:
+            if total <= target:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
+
+    # ---------------------------- manifest --------------------------------
+
+    def _manifest_path(self, rec_idx: str) -> Path:
+        return self.manifest_dir / f"{rec_idx}.json"
+
+    def _load_manifest(self, rec_idx: str) -> dict:
+        try:
+            return json.loads(self._manifest_path(rec_idx).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def record(self, rec_idx: str, stage: str, input_hash: str, output_hash: str) -> None:
+        """rec_idx 공고의 stage 결과(입력 해시 → 산출물 해시)를 기록합니다."""
+        with self._manifest_lock:
+            manifest = self._load_manifest(rec_idx)
+            manifest[stage] = {"input": input_hash, "output": output_hash, "updated": time.time()}
+            atomic_write(
+                self._manifest_path(rec_idx),
+                json.dumps(manifest, ensure_ascii=False).encode("utf-8"),
+            )
+
+    def lookup(self, rec_idx: str, stage: str, input_hash: str) -> Optional[str]:
+        """입력 해시가 같고 산출물 blob 이 남아 있으면 산출물 해시를 반환합니다."""
+        entry = self._load_manifest(rec_idx).get(stage)
+        if not entry or entry.get("input") != input_hash:
+            return None
+        if not self.blob_path(entry["output"]).exists():
+            return None                          # 용량 정리로 삭제됨
+        return entry["output"]
+
+# ---------------------------------------------------------------------------
+# Public: 파이프라인용 비동기 sink
+# ---------------------------------------------------------------------------
+
+class AsyncArtifactSink:
+    """
+    단계 산출물을 메모리로 넘기면서 디스크 보관은 뒤에서 처리하는 래퍼.
+    enabled=False 면 저장·조회를 모두 건너뜁니다(해시 계산만 수행).
+    """
+
+    def __init__(self, store: Optional[ArtifactStore] = None, enabled: bool = ARTIFACT_PERSIST):
+        self.enabled = enabled
+        self.store = (store or ArtifactStore()) if enabled else None
+        self._pending: set[asyncio.Task] = set()
+
+    def submit(self, rec_idx: str, stage: str, input_hash: str, data: bytes) -> str:
+        """산출물 해시를 바로 반환하고, 저장은 백그라운드 Task 로 넘깁니다."""
+        output_hash = content_hash(data)
+        if self.enabled:
+            task = asyncio.create_task(asyncio.to_thread(self._persist, rec_idx, stage, input_hash, data))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        return output_hash
+
+    def _persist(self, rec_idx: str, stage: str, input_hash: str, data: bytes) -> None:
+        try:
+            output_hash = self.store.put_blob(data)
+            self.store.record(rec_idx, stage, input_hash, output_hash)
+        except OSError as e:
+            print(f"[!] 산출물 저장 실패 ({stage}, rec_idx={rec_idx}): {e}")
+
+    async def lookup(self, rec_idx: str, stage: str, input_hash: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.store.lookup, rec_idx, stage, input_hash)
+
+    async def load(self, digest: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.store.get_blob, digest)
+
+    async def drain(self) -> None:
+        """아직 끝나지 않은 저장 작업을 모두 기다립니다(앱 종료 시)."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
@@ -13,38 +13,53 @@ OpenAI Assistant ID를 관리하기 위한 유틸리티 모듈입니다.
 3. **delete_assistant()**
    `.assistant.id`에 기록된 Assistant를 삭제하고 해당 파일도 제거합니다.
 4. **get_or_create_assistant()**
-   Assistant가 이미 있으면 그대로 사용하고, 없거나 ID가 잘못됐으면 새로 생성합니다.
+   ``OPENAI_ASSISTANT_ID`` 환경 변수가 있으면 그 Assistant 를 사용합니다(운영 환경).
+   없으면 `.assistant.id` 의 Assistant 를 사용하고, 없거나 ID가 잘못됐으면 새로 생성합니다.
+   생성은 워커 간 잠금(diskcache) 안에서 파일을 다시 읽은 뒤 하므로,
+   여러 gunicorn 워커가 동시에 시작해도 Assistant 는 하나만 만들어집니다.
+5. **get_assistant_id() / invalidate_assistant()**
+   get_or_create_assistant() 결과를 프로세스 전역으로 캐시합니다. (FastAPI lifespan 에서 한 번 확인)
+   요청마다 retrieve 하지 않고, Run 이 NotFound 로 실패했을 때만 무효화 후 다시 확인합니다.
 
 파일 맨 아래에는 개발자가 로컬에서 빠르게 테스트할 수 있는 간단한 CLI가 포함돼 있습니다.
 """
 
 import os
+import uuid
 import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 
+import diskcache
 from openai import AsyncOpenAI
 from openai import NotFoundError, OpenAIError
 from dotenv import load_dotenv
 
+from artifact_store import atomic_write
+from openai_scheduler import openai_scheduler
+
 # ---------------------------------------------------------------------------
 # 비동기 OpenAI 클라이언트(모듈당 한 번만 초기화)
 # ---------------------------------------------------------------------------
 env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path) # Load .env file if present
 
-openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)   # 재시도는 openai_scheduler
 
 # ---------------------------------------------------------------------------
 # 상수 및 경로 설정
 # ---------------------------------------------------------------------------
 ASSISTANT_FILE = ".assistant.id"               # Assistant ID를 저장할 파일
 PROMPT_FILE    = "prompts/assistant_prompt.txt" # 시스템 프롬프트 위치
-KEY_NAME       = "OPENAI_ASSISTANT_ID"          # .assistant.id 파일 내 키 이름
+KEY_NAME       = "OPENAI_ASSISTANT_ID"          # .assistant.id 파일 내 키 이름 (같은 이름의 환경 변수가 우선)
 
 # 현재 파일 기준 프로젝트 루트 경로
 PROJECT_ROOT = Path(__file__).resolve().parent
 
+ASSISTANT_LOCK_DIR = os.getenv("ASSISTANT_LOCK_DIR", str(PROJECT_ROOT / ".cache" / "assistant"))
+ASSISTANT_LOCK_TTL = 120.0      # 생성 잠금 만료(초) — 잠금을 잡은 워커가 죽어도 풀리도록
+
 # ---------------------------------------------------------------------------
 # Helper: 로컬 Assistant ID 읽기
 # ---------------------------------------------------------------------------
@@ -75,15 +90,16 @@ async def create_assistant(
 
     system_prompt = prompt_path.read_text(encoding="utf-8")
 
-    assistant = await openai.beta.assistants.create(
-        name="Devcorch",
-        instructions=system_prompt,
-        model="gpt-4o-mini",
+    assistant = await openai_scheduler.run(
+        lambda: openai.beta.assistants.create(
+            name="Devcorch",
+            instructions=system_prompt,
+            model="gpt-4o-mini",
+        )
     )
 
-    # 새 ID 파일에 기록
-    with file_path.open("w", encoding="utf-8") as fout:
-        fout.write(f"{KEY_NAME}={assistant.id}\n")
+    # 새 ID 파일에 기록 (다른 워커가 쓰다 만 파일을 읽지 않도록 교체 방식)
+    atomic_write(file_path, f"{KEY_NAME}={assistant.id}\n".encode("utf-8"))
 
     print(f"🆕 Assistant 생성 완료: {assistant.id}")
     return assistant.id
@@ -101,7 +117,7 @@ async def delete_assistant(file_path: Path = PROJECT_ROOT / ASSISTANT_FILE) -> N
         return
 
     try:
-        await openai.beta.assistants.delete(assistant_id)
+        await openai_scheduler.run(lambda: openai.beta.assistants.delete(assistant_id))
         file_path.unlink(missing_ok=True)
         print(f"🗑️  Assistant {assistant_id} 삭제 및 파일 제거 완료.")
     except OpenAIError as exc:
@@ -111,23 +127,84 @@ async def delete_assistant(file_path: Path = PROJECT_ROOT / ASSISTANT_FILE) -> N
 # Public: Assistant ID 가져오기(없으면 생성)
 # ---------------------------------------------------------------------------
 
+async def _exists(assistant_id: str) -> bool:
+    """Assistant 가 실제로 존재하는지 확인합니다 (NotFound 외 오류는 RuntimeError)."""
+    try:
+        await openai_scheduler.run(lambda: openai.beta.assistants.retrieve(assistant_id))
+        return True
+    except NotFoundError:
+        return False
+    except OpenAIError as exc:
+        raise RuntimeError(f"Assistant 확인 중 오류: {exc}") from exc
+
+
+@asynccontextmanager
+async def _creation_lock() -> AsyncIterator[None]:
+    """워커 간 Assistant 생성 잠금 (diskcache 의 원자적 add, 만료 시 자동 해제)."""
+    disk = diskcache.Cache(ASSISTANT_LOCK_DIR)
+    owner = uuid.uuid4().hex
+    try:
+        while not await asyncio.to_thread(disk.add, "create", owner, expire=ASSISTANT_LOCK_TTL):
+            await asyncio.sleep(0.2)
+        try:
+            yield
+        finally:
+            if await asyncio.to_thread(disk.get, "create") == owner:
+                await asyncio.to_thread(disk.delete, "create")
+    finally:
+        disk.close()
+
+
 async def get_or_create_assistant() -> str:
     """유효한 Assistant ID를 반환합니다(필요 시 자동 생성)."""
 
+    # 운영 환경: 환경 변수로 지정한 Assistant 만 사용 (없다고 새로 만들지 않음)
+    env_id = os.getenv(KEY_NAME)
+    if env_id:
+        if not await _exists(env_id):
+            raise RuntimeError(f"{KEY_NAME} 환경 변수의 Assistant 를 찾을 수 없습니다: {env_id}")
+        print(f"✅ 기존 Assistant 사용: {env_id}")
+        return env_id
+
     assistant_id = load_assistant_id()
-    if assistant_id:
-        try:
-            # ID가 실제로 존재하는지 확인
-            await openai.beta.assistants.retrieve(assistant_id)
-            print(f"✅ 기존 Assistant 사용: {assistant_id}")
-            return assistant_id
-        except NotFoundError:
+    if assistant_id and await _exists(assistant_id):
+        print(f"✅ 기존 Assistant 사용: {assistant_id}")
+        return assistant_id
+
+    # ID가 없거나 무효 → 잠금을 잡고, 그 사이 다른 워커가 만들었으면 그것을 사용
+    async with _creation_lock():
+        latest = load_assistant_id()
+        if latest and latest != assistant_id and await _exists(latest):
+            print(f"✅ 다른 워커가 만든 Assistant 사용: {latest}")
+            return latest
+        if assistant_id:
             print("⚠️  저장된 Assistant ID가 유효하지 않습니다. 새로 생성합니다…")
-        except OpenAIError as exc:
-            raise RuntimeError(f"Assistant 확인 중 오류: {exc}") from exc
+        return await create_assistant()
 
-    # ID가 없거나 무효 → 새로 생성
-    return await create_assistant()
+# ---------------------------------------------------------------------------
+# Public: 프로세스 전역 Assistant ID 캐시
+# ---------------------------------------------------------------------------
+_cached_assistant_id: Optional[str] = None
+_resolve_lock = asyncio.Lock()
+
+async def get_assistant_id() -> str:
+    """캐시된 Assistant ID를 반환합니다(처음 한 번만 get_or_create_assistant 로 확인)."""
+    global _cached_assistant_id
+    if _cached_assistant_id:
+        return _cached_assistant_id
+
+    async with _resolve_lock:           # 동시 요청이 한 번만 확인하도록
+        if not _cached_assistant_id:
+            _cached_assistant_id = await get_or_create_assistant()
+    return _cached_assistant_id
+
+
+def invalidate_assistant(stale_id: str) -> None:
+    """stale_id 가 아직 캐시에 있으면 지워서 다음 get_assistant_id() 가 다시 확인하게 합니다."""
+    global _cached_assistant_id
+    if _cached_assistant_id == stale_id:
+        print(f"⚠️  Assistant {stale_id} 를 찾을 수 없습니다. 다시 확인합니다…")
+        _cached_assistant_id = None
 
 # ---------------------------------------------------------------------------
 # 개발자용 간단한 CLI
@@ -8,35 +8,46 @@ Features
 - run_assistant()
     주어진 assistant_id와 request_data로 user_message를 생성하여
     Assistant API를 호출하고, 응답을 문자열로 반환합니다.
+- stream_assistant()
+    Run 을 streaming API 로 실행해 생성되는 토큰 조각을 바로 넘겨줍니다.
+    (create_and_poll 처럼 완료까지 폴링하지 않으므로 첫 글자가 곧바로 나옴)
+    마지막에는 인용 표시를 정리한 전체 응답을 한 번 더 넘겨줍니다.
+- format_reply()
+    인용(annotation)을 [번호] 로 바꾸고 인용 파일 목록을 붙입니다.
+    파일명은 한꺼번에 동시에 조회하고(file_id → filename LRU/TTL 캐시), 본문은 한 번에 재구성합니다.
 """
 
 import os
+import re
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from typing import AsyncIterator
+
 from openai import AsyncOpenAI
-from openai.error import OpenAIError
+from openai import NotFoundError, OpenAIError
+
+from metrics import record_usage
+from openai_scheduler import openai_scheduler, estimate_tokens
 
 # 비동기 클라이언트
-openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)   # 재시도는 openai_scheduler
 
-async def run_assistant(assistant_id: str, request_data: dict) -> str:
-    """
-    assistant_id와 request_data를 받아, user_message를 구성하고 Assistant API를 호출한 뒤
-    응답을 문자열로 반환합니다.
+# TPM 차감용: Assistant instructions + 예상 출력 토큰 (user_message 는 따로 셈)
+ASSISTANT_RUN_TOKENS = int(os.getenv("ASSISTANT_RUN_TOKENS", "5000"))
 
-    Parameters
-    ----------
-    assistant_id : str
-        사용할 Assistant의 ID
-    request_data : dict
-        FastAPI 요청 데이터(Pydantic 모델의 .dict())
+# 인용 파일명 캐시 설정 (환경 변수로 덮어쓰기 가능)
+CITATION_CACHE_SIZE = int(os.getenv("CITATION_CACHE_SIZE", "512"))
+CITATION_CACHE_TTL  = float(os.getenv("CITATION_CACHE_TTL", str(6 * 3600)))   # 6시간
 
-    Returns
-    -------
-    str
-        Assistant의 응답 메시지
-    """
+# file_id → (저장 시각, filename), 워커별 LRU
+_filename_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
 
-    # 1️⃣ user_message 구성
-    user_message = f"""
+
+def build_user_message(request_data: dict) -> str:
+    """request_data(직무 정보 + 질문/답변) → Assistant 에 보낼 user_message"""
+    return f"""
 - 회사: {request_data['company']}
 - 직무: {request_data['position']}
 - 자격요건: {request_data['qualifications']}
@@ -51,7 +62,7 @@ async def run_assistant(assistant_id: str, request_data: dict) -> str:
 
 ---
 
-너는 지원자가 지원하는 {company}회사의 10년차 인사담당자야. 지원자의 답장이 질문의 의도에 맞게 잘 작성되었는지 좋은 점이나 나쁜 점을 피드백해줘.
+너는 지원자가 지원하는 {request_data['company']}회사의 10년차 인사담당자야. 지원자의 답장이 질문의 의도에 맞게 잘 작성되었는지 좋은 점이나 나쁜 점을 피드백해줘.
 
 사용자가 작성한 질문을 중심으로 다음의 내용을 참고하여 사용자의 답변이 질문의 의도에 맞게 작성되어 있는지 피드백 해줘.
 
@@ -69,32 +80,146 @@ async def run_assistant(assistant_id: str, request_data: dict) -> str:
 친절하고 구체적으로, 면접관 또는 커리어 코치의 시선으로 피드백을 작성해주세요.
 """
 
+
+async def _retrieve_filename(file_id: str) -> str:
+    """파일명 조회. 실패하면 인용 번호만이라도 남도록 file_id 를 그대로 씁니다."""
     try:
-        # 2️⃣ 새로운 Thread 생성
-        thread = await openai.beta.threads.create(
-            messages=[{"role": "user", "content": user_message}]
-        )
+        cited_file = await openai_scheduler.run(lambda: openai.files.retrieve(file_id))
+        return cited_file.filename
+    except OpenAIError as exc:
+        print(f"⚠️ 인용 파일 조회 실패 ({file_id}): {exc}")
+        return file_id
 
-        # 3️⃣ Run 생성 및 완료될 때까지 대기
-        run = await openai.beta.threads.runs.create_and_poll(
-            thread_id=thread.id,
-            assistant_id=assistant_id,
-        )
 
-        # 4️⃣ Run 결과에서 메시지 가져오기
-        messages = await openai.beta.threads.messages.list(
-            thread_id=thread.id,
-            run_id=run.id,
+async def resolve_filenames(file_ids: list[str]) -> dict[str, str]:
+    """
+    file_id 목록 → {file_id: filename}
+    캐시에 없는 것만 asyncio.gather 로 동시에 조회합니다(왕복 1번).
+    """
+    now = time.time()
+    names: dict[str, str] = {}
+    missing: list[str] = []
+    for file_id in dict.fromkeys(file_ids):         # 순서 유지 중복 제거
+        entry = _filename_cache.get(file_id)
+        if entry is not None and now - entry[0] < CITATION_CACHE_TTL:
+            _filename_cache.move_to_end(file_id)
+            names[file_id] = entry[1]
+        else:
+            missing.append(file_id)
+
+    fetched = await asyncio.gather(*(_retrieve_filename(file_id) for file_id in missing))
+    for file_id, filename in zip(missing, fetched):
+        names[file_id] = filename
+        if filename != file_id:                     # 조회 실패는 캐싱하지 않음
+            _filename_cache[file_id] = (now, filename)
+            _filename_cache.move_to_end(file_id)
+    while len(_filename_cache) > CITATION_CACHE_SIZE:
+        _filename_cache.popitem(last=False)
+    return names
+
+
+async def format_reply(message_content) -> str:
+    """
+    메시지 text 의 annotation 을 [번호] 로 바꾸고, 인용 파일 목록을 끝에 붙입니다.
+    """
+    reply = message_content.value
+    annotations = message_content.annotations
+    if not annotations:
+        return reply
+
+    # 같은 표시 문자열은 처음 나온 annotation 번호로 (한 번의 정규식 치환으로 재구성)
+    markers: dict[str, str] = {}
+    for index, annotation in enumerate(annotations):
+        if annotation.text:
+            markers.setdefault(annotation.text, f"[{index}]")
+    pattern = re.compile("|".join(re.escape(text) for text in sorted(markers, key=len, reverse=True)))
+    if markers:
+        reply = pattern.sub(lambda m: markers[m.group(0)], reply)
+
+    cited = [
+        (index, file_citation.file_id)
+        for index, annotation in enumerate(annotations)
+        if (file_citation := getattr(annotation, "file_citation", None))
+    ]
+    if cited:
+        names = await resolve_filenames([file_id for _, file_id in cited])
+        reply += "\n\n" + "\n".join(f"[{index}] {names[file_id]}" for index, file_id in cited)
+    return reply
+
+
+async def stream_assistant(assistant_id: str, user_message: str) -> AsyncIterator[dict]:
+    """
+    user_message 로 새 Thread 를 만들고 Run 을 streaming 으로 실행합니다.
+
+    Yields
+    ------
+    dict
+        ``{"delta": "..."}``  생성되는 대로 토큰 조각
+        ``{"reply": "..."}``  마지막 한 번, 인용 정리까지 끝난 전체 응답
+    """
+    try:
+        # 1️⃣ 새로운 Thread 생성
+        thread = await openai_scheduler.run(
+            lambda: openai.beta.threads.create(
+                messages=[{"role": "user", "content": user_message}]
+            )
         )
 
-        # 첫 번째 메시지 내용 추출
-        reply_text = messages.data[0].content[0].text.value
+        # 2️⃣ Run 을 streaming 으로 실행 (폴링 없이 토큰이 오는 대로 전달)
+        #    스트림 열기(429 여부가 결정되는 요청)까지만 스케줄러가 관리
+        async with AsyncExitStack() as stack:
+            stream = await openai_scheduler.run(
+                lambda: stack.enter_async_context(
+                    openai.beta.threads.runs.stream(
+                        thread_id=thread.id,
+                        assistant_id=assistant_id,
+                    )
+                ),
+                tokens=estimate_tokens(user_message, completion=ASSISTANT_RUN_TOKENS),
+            )
+            async for text in stream.text_deltas:
+                yield {"delta": text}
+            run = await stream.get_final_run()
+            messages = await stream.get_final_messages()
+        record_usage(run.usage, run.model)
 
-        return reply_text.strip()
+        if run.status != "completed":
+            detail = run.last_error.message if run.last_error else run.status
+            raise RuntimeError(f"Assistant 실행 실패: {detail}")
 
+        # 3️⃣ 마지막 assistant 메시지로 전체 응답 구성
+        reply = await format_reply(messages[-1].content[0].text) if messages else ""
+        yield {"reply": reply.strip()}
+
+    except NotFoundError:
+        raise                           # Assistant 가 삭제된 경우 → 호출한 쪽에서 새로 확인
     except OpenAIError as exc:
         raise RuntimeError(f"Assistant 실행 중 오류: {exc}") from exc
 
+
+async def run_assistant(assistant_id: str, request_data: dict) -> str:
+    """
+    assistant_id와 request_data를 받아, user_message를 구성하고 Assistant API를 호출한 뒤
+    응답을 문자열로 반환합니다. (streaming Run 을 끝까지 받아서 반환)
+
+    Parameters
+    ----------
+    assistant_id : str
+        사용할 Assistant의 ID
+    request_data : dict
+        FastAPI 요청 데이터(Pydantic 모델의 .dict())
+
+    Returns
+    -------
+    str
+        Assistant의 응답 메시지
+    """
+    reply_text = ""
+    async for event in stream_assistant(assistant_id, build_user_message(request_data)):
+        if "reply" in event:
+            reply_text = event["reply"]
+    return reply_text
+
 # =====================================================
 # 6️⃣  CLI: RAGAS 평가용 실행 (assistant_service.py 직접 실행 시)
 # =====================================================
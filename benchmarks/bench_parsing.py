@@ -0,0 +1,142 @@
+"""
+bench_parsing.py
+~~~~~~~~~~~~~~~~
+crawling.py 의 부분 파싱(SoupStrainer)과 기존 전체 트리 파싱을 저장해 둔 사람인 페이지로 비교합니다.
+
+사용법
+------
+    python benchmarks/bench_parsing.py --fetch 지아이티   # 검색 결과·첫 공고 상세 HTML 을 fixtures/ 에 저장
+    python benchmarks/bench_parsing.py [-n 50]             # fixtures/*.html 로 비교
+
+- fixtures/list_*.html   : 검색 결과 페이지 (파일명 list_<회사명>.html)
+- fixtures/detail_*.html : view-detail iframe 페이지
+두 방식의 결과가 같은지 먼저 확인한 뒤, 파일별 평균 시간(ms)과 속도 향상 배율을 출력합니다.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import requests
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))   # 프로젝트 루트의 crawling 사용
+import crawling  # noqa: E402
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# ---------------------------------------------------------------------------
+# 기준: 변경 전 전체 트리 파싱 (html.parser, find 반복)
+# ---------------------------------------------------------------------------
+
+def baseline_recruitment_page(html, company_name):
+    soup = BeautifulSoup(html, "html.parser")
+    main_url = "https://www.saramin.co.kr"
+    recruitment_data = []
+
+    div_common_recruilt_list = soup.find('div', attrs={"class": "common_recruilt_list"})
+    if div_common_recruilt_list is not None:
+        div_list_body = div_common_recruilt_list.find('div', attrs={"class": "list_body"})
+        div_box_item = div_list_body.find_all('div', attrs={"class", 'box_item'})
+        for num in range(len(div_box_item)):
+            company_data = []
+            div_company_nm = div_box_item[num].find('div', attrs={"class": "company_nm"})
+            company_nm = div_company_nm.find('a') or div_company_nm.find('span')
+            div_notification_info = div_box_item[num].find('div', attrs={"class": "notification_info"})
+            a_str_tit = div_notification_info.find('a', attrs={"class", "str_tit"})
+            a_href = a_str_tit['href']
+            company_group_name = company_nm.get_text(strip=True)
+            company_title = a_str_tit.get_text(strip=True)
+            if company_name in company_group_name:
+                company_data.append(company_group_name)
+                company_data.append(company_title)
+                company_data.append(main_url + a_href)
+                div_recruit_info = div_box_item[num].find('div', attrs={"class": "recruit_info"})
+                for p in div_recruit_info.find_all('p'):
+                    company_data.append(p.get_text(strip=True))
+                recruitment_data.append(company_data)
+
+    pages = [
+        int(tag["page"])
+        for tag in soup.find_all(attrs={"page": True})
+        if str(tag["page"]).isdigit()
+    ]
+    return recruitment_data, max(pages, default=1)
+
+
+def baseline_job_detail(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return crawling.extract_job_text(soup), crawling.find_image_urls(soup)
+
+# ---------------------------------------------------------------------------
+# Helper: fixture 저장 / 시간 측정
+# ---------------------------------------------------------------------------
+
+def fetch_fixtures(company_name):
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    url = crawling.build_search_url(company_name)
+    response = requests.get(url, headers=crawling.headers, timeout=crawling.REQUEST_TIMEOUT)
+    response.raise_for_status()
+    (FIXTURE_DIR / f"list_{company_name}.html").write_text(response.text, encoding="utf-8")
+    print(f"[✔] 저장: list_{company_name}.html")
+
+    recruitment_data, _ = crawling.parse_recruitment_page(response.text, company_name)
+    if recruitment_data:
+        detail_url = crawling.build_iframe_url(recruitment_data[0][2])
+        detail = requests.get(detail_url, headers=crawling.headers, timeout=crawling.REQUEST_TIMEOUT)
+        detail.raise_for_status()
+        rec_idx = crawling.extract_rec_idx(recruitment_data[0][2])
+        (FIXTURE_DIR / f"detail_{rec_idx}.html").write_text(detail.text, encoding="utf-8")
+        print(f"[✔] 저장: detail_{rec_idx}.html")
+
+
+def timeit(fn, *args, number):
+    started = time.perf_counter()
+    for _ in range(number):
+        fn(*args)
+    return (time.perf_counter() - started) / number * 1000
+
+
+def compare(label, baseline, fast, args, number):
+    expected, actual = baseline(*args), fast(*args)
+    if expected != actual:
+        print(f"[!] {label}: 결과 불일치\n    기준: {expected!r}\n    부분: {actual!r}")
+        return False
+    base_ms, fast_ms = timeit(baseline, *args, number=number), timeit(fast, *args, number=number)
+    print(f"{label:<40} 기준 {base_ms:8.2f}ms  부분 {fast_ms:8.2f}ms  ×{base_ms / fast_ms:.1f}")
+    return True
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="SoupStrainer 부분 파싱 vs 전체 파싱 벤치마크")
+    parser.add_argument("--fetch", metavar="COMPANY", help="해당 회사 검색 결과·상세 페이지를 fixture 로 저장")
+    parser.add_argument("-n", "--number", type=int, default=50, help="파일별 반복 횟수")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_fixtures(args.fetch)
+
+    list_pages = sorted(FIXTURE_DIR.glob("list_*.html"))
+    detail_pages = sorted(FIXTURE_DIR.glob("detail_*.html"))
+    if not list_pages and not detail_pages:
+        print(f"fixture 가 없습니다. --fetch <회사명> 으로 {FIXTURE_DIR} 에 저장하세요.")
+        return 1
+
+    ok = True
+    for path in list_pages:
+        company_name = path.stem.removeprefix("list_")
+        html = path.read_text(encoding="utf-8")
+        ok &= compare(path.name, baseline_recruitment_page, crawling.parse_recruitment_page,
+                      (html, company_name), args.number)
+    for path in detail_pages:
+        html = path.read_text(encoding="utf-8")
+        ok &= compare(path.name, baseline_job_detail, crawling._parse_job_detail, (html,), args.number)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
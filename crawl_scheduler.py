@@ -0,0 +1,273 @@
+"""
+crawl_scheduler.py
+~~~~~~~~~~~~~~~~~~
+크롤링 요청(사람인 검색·상세·이미지)을 호스트별로 조절하는 politeness 스케줄러 모듈입니다.
+
+/search 트래픽이 몰려도 한 호스트에 보내는 요청 속도를 일정하게 유지해
+egress IP 가 throttle 당해 모든 요청이 느려지는 상황을 막습니다.
+
+주요 기능
+---------
+1. **호스트별 동시 요청 수 제한**
+   CRAWL_HOST_CONCURRENCY 개까지만 동시에 보냄 (FIFO 순서)
+2. **토큰 버킷 pacing**
+   호스트별로 초당 CRAWL_HOST_RATE 개 (순간 CRAWL_HOST_BURST 개까지) 간격을 두고 보냄
+3. **적응형 감속 (AIMD)**
+   - 429 또는 오류율(EWMA)이 CRAWL_ERROR_RATE 를 넘는 상태의 5xx·타임아웃 → 속도 × CRAWL_SLOWDOWN
+   - 성공할 때마다 CRAWL_SPEEDUP 씩 원래 속도까지 회복
+   - 429/503 의 ``Retry-After`` 동안은 해당 호스트 요청을 멈춤
+4. **circuit breaker**
+   연속 실패가 CRAWL_BREAKER_THRESHOLD 번이면 CRAWL_BREAKER_COOLDOWN 초 동안 즉시 거절
+   (``HostUnavailable``), 이후 요청 1개로 상태를 확인(half-open)해 성공하면 다시 엶
+   대기 시간이 CRAWL_MAX_WAIT 를 넘어야 하는 경우도 기다리지 않고 거절합니다.
+5. **CrawlScheduler.get() / stream() / stats()**
+   공유 httpx 클라이언트(http_client) 호출을 감싼 함수와 호스트별 상태
+
+``HostUnavailable`` 은 ``httpx.HTTPError`` 이므로 기존 크롤링 함수의 요청 실패 처리를 그대로 탑니다.
+동기(requests) CLI 경로는 대상이 아닙니다.
+"""
+
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from http_client import get_async_client
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+CRAWL_HOST_CONCURRENCY  = int(os.getenv("CRAWL_HOST_CONCURRENCY", "4"))       # 호스트별 동시 요청 수
+CRAWL_HOST_RATE         = float(os.getenv("CRAWL_HOST_RATE", "5"))            # 호스트별 초당 요청 수
+CRAWL_HOST_BURST        = float(os.getenv("CRAWL_HOST_BURST", "5"))           # 순간 허용 요청 수
+CRAWL_MIN_RATE          = float(os.getenv("CRAWL_MIN_RATE", "0.5"))           # 감속 하한(초당)
+CRAWL_SLOWDOWN          = float(os.getenv("CRAWL_SLOWDOWN", "0.5"))           # 감속 배율
+CRAWL_SPEEDUP           = float(os.getenv("CRAWL_SPEEDUP", "0.1"))            # 성공 1회당 회복량(초당)
+CRAWL_ERROR_RATE        = float(os.getenv("CRAWL_ERROR_RATE", "0.2"))         # 5xx·타임아웃 감속 기준 오류율
+CRAWL_BREAKER_THRESHOLD = int(os.getenv("CRAWL_BREAKER_THRESHOLD", "5"))      # 연속 실패 → circuit open
+CRAWL_BREAKER_COOLDOWN  = float(os.getenv("CRAWL_BREAKER_COOLDOWN", "30"))    # open 유지(초)
+CRAWL_MAX_WAIT          = float(os.getenv("CRAWL_MAX_WAIT", "10"))            # 이보다 오래 기다려야 하면 거절(초)
+
+ERROR_EWMA_ALPHA = 0.2          # 오류율 지수이동평균 가중치
+THROTTLE_STATUS  = {429, 503}   # Retry-After 를 따르는 응답
+
+
+class HostUnavailable(httpx.HTTPError):
+    """circuit 이 열려 있거나 throttle 대기가 너무 길어 요청을 보내지 않았을 때 발생합니다."""
+
+# ---------------------------------------------------------------------------
+# Helper: Retry-After
+# ---------------------------------------------------------------------------
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after", "")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None                     # HTTP-date 형식은 감속만 적용
+
+# ---------------------------------------------------------------------------
+# Helper: 호스트 상태
+# ---------------------------------------------------------------------------
+
+class _HostState:
+    """호스트 1개의 동시성 제한 + 토큰 버킷 + 오류율 + circuit 상태."""
+
+    def __init__(self, host: str, concurrency: int, rate: float, burst: float):
+        self.host = host
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.lock = asyncio.Lock()              # pacing 순서 보장 (FIFO)
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_slowdown = 0.0
+        self.error_rate = 0.0
+
+        # circuit breaker
+        self.circuit = "closed"                 # closed | open | half_open
+        self.opened_at = 0.0
+        self.probing = False
+        self.consecutive_failures = 0
+
+        # 지표
+        self.in_flight = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.throttled = 0
+        self.rejected = 0
+
+    # ------------------------------ circuit ------------------------------
+
+    def admit(self, now: float) -> tuple[bool, bool]:
+        """
+        circuit 상태상 요청을 보내도 되는지 → (통과 여부, 이 요청이 half-open probe 인지)
+        half-open 이면 probe 1개만 통과.
+        """
+        if self.circuit == "open":
+            if now - self.opened_at < CRAWL_BREAKER_COOLDOWN:
+                return False, False
+            self.circuit = "half_open"
+        if self.circuit == "half_open":
+            if self.probing:
+                return False, False
+            self.probing = True
+            return True, True
+        return True, False
+
+    # ------------------------------ pacing -------------------------------
+
+    def wait_time(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        pause = max(0.0, self.paused_until - now)
+        return max(pause, (1.0 - self.tokens) / self.rate if self.tokens < 1.0 else 0.0)
+
+    async def pace(self) -> None:
+        async with self.lock:
+            while True:
+                wait = self.wait_time(time.monotonic())
+                if wait <= 0:
+                    self.tokens -= 1.0
+                    return
+                if wait > CRAWL_MAX_WAIT:
+                    self.rejected += 1
+                    raise HostUnavailable(f"{self.host} throttle 대기 {wait:.0f}s > {CRAWL_MAX_WAIT:.0f}s")
+                await asyncio.sleep(wait)
+
+    # ------------------------------ 결과 반영 ----------------------------
+
+    def _slow_down(self, now: float) -> None:
+        # 동시에 실패한 요청들이 한꺼번에 속도를 바닥까지 내리지 않도록 1초에 한 번만
+        if now - self.last_slowdown >= 1.0:
+            self.rate = max(CRAWL_MIN_RATE, self.rate * CRAWL_SLOWDOWN)
+            self.last_slowdown = now
+            print(f"[🐢] {self.host} 감속 → {self.rate:.2f} req/s (오류율 {self.error_rate:.2f})")
+
+    def record_success(self, is_probe: bool = False) -> None:
+        self.succeeded += 1
+        self.error_rate *= 1 - ERROR_EWMA_ALPHA
+        self.rate = min(self.base_rate, self.rate + CRAWL_SPEEDUP)
+        self.consecutive_failures = 0
+        # circuit 은 probe 결과로만 닫음 (open 전에 보낸 요청이 늦게 성공한 경우는 제외)
+        if is_probe:
+            print(f"[🔌] {self.host} circuit closed")
+            self.circuit, self.probing = "closed", False
+
+    def record_failure(
+        self, throttled: bool = False, retry_after: Optional[float] = None, is_probe: bool = False
+    ) -> None:
+        now = time.monotonic()
+        self.failed += 1
+        self.error_rate = self.error_rate * (1 - ERROR_EWMA_ALPHA) + ERROR_EWMA_ALPHA
+        if throttled:
+            self.throttled += 1
+        if retry_after is not None:
+            self.paused_until = max(self.paused_until, now + retry_after)
+        if throttled or self.error_rate > CRAWL_ERROR_RATE:
+            self._slow_down(now)
+
+        self.consecutive_failures += 1
+        if self.circuit == "half_open" or self.consecutive_failures >= CRAWL_BREAKER_THRESHOLD:
+            if self.circuit != "open":
+                print(f"[🔌] {self.host} circuit open ({CRAWL_BREAKER_COOLDOWN:.0f}s)")
+            self.circuit, self.opened_at = "open", now
+        if is_probe:
+            self.probing = False
+
+    def record(self, response: httpx.Response, is_probe: bool = False) -> None:
+        status = response.status_code
+        if status == 429 or status >= 500:
+            retry_after = _retry_after(response) if status in THROTTLE_STATUS else None
+            self.record_failure(throttled=status == 429, retry_after=retry_after, is_probe=is_probe)
+        else:
+            self.record_success(is_probe)   # 404 등은 호스트 상태와 무관
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "error_rate": self.error_rate,
+            "circuit": self.circuit,
+            "in_flight": self.in_flight,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+        }
+
+# ---------------------------------------------------------------------------
+# Public: CrawlScheduler
+# ---------------------------------------------------------------------------
+
+class CrawlScheduler:
+    """호스트별 _HostState 를 만들어 공유 httpx 클라이언트 호출 앞에 둡니다."""
+
+    def __init__(
+        self,
+        concurrency: int = CRAWL_HOST_CONCURRENCY,
+        rate: float = CRAWL_HOST_RATE,
+        burst: float = CRAWL_HOST_BURST,
+    ):
+        self.concurrency, self.rate, self.burst = concurrency, rate, burst
+        self._hosts: dict[str, _HostState] = {}
+
+    def _host(self, url: str) -> _HostState:
+        host = urlsplit(url).hostname or ""
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(host, self.concurrency, self.rate, self.burst)
+        return state
+
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[tuple[_HostState, bool]]:
+        """
+        circuit 확인 → 동시성 슬롯 → pacing 을 통과한 동안 유지되는 구간.
+        (호스트 상태, 이 요청이 half-open probe 인지) 를 yield
+        """
+        state = self._host(url)
+        admitted, is_probe = state.admit(time.monotonic())
+        if not admitted:
+            state.rejected += 1
+            raise HostUnavailable(f"{state.host} circuit open")
+        try:
+            async with state.semaphore:
+                await state.pace()
+                state.in_flight += 1
+                try:
+                    yield state, is_probe
+                finally:
+                    state.in_flight -= 1
+        except (httpx.TimeoutException, httpx.NetworkError):
+            state.record_failure(is_probe=is_probe)
+            raise
+        finally:
+            if is_probe:
+                state.probing = False       # 결과 없이 끝난 probe(취소 등)는 다음 요청에 넘김
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """``get_async_client().get()`` + 호스트별 조절."""
+        async with self._slot(url) as (state, is_probe):
+            response = await get_async_client().get(url, **kwargs)
+            state.record(response, is_probe)
+            return response
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """``get_async_client().stream()`` + 호스트별 조절 (본문을 다 읽을 때까지 슬롯 유지)."""
+        async with self._slot(url) as (state, is_probe):
+            async with get_async_client().stream(method, url, **kwargs) as response:
+                state.record(response, is_probe)
+                yield response
+
+    def stats(self) -> dict:
+        return {host: state.stats() for host, state in self._hosts.items()}
+
+
+# 프로세스 전역 크롤링 스케줄러
+crawl_scheduler = CrawlScheduler()
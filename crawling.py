@@ -2,17 +2,34 @@
 crawling.py  (★ 크롤링 로직은 요청대로 ‘그대로’ 유지)
 ────────────────────────────────────────────────────────
 - 검색 → 채용 목록 수집
-- 상세 iframe → JPG·TXT 저장
+- 상세 iframe → JPG·TXT 저장 (CLI) / 텍스트·이미지 반환 (FastAPI)
 
 !! 수정 사항 !!
 1. 프로젝트 루트(project_root) 기준 경로 전역 선언
 2. JPG·TXT 저장 시 company/ 폴더 아래로 저장
    (크롤링 로직은 변경하지 않음, 단순 경로만 변경)
+3. 파싱 로직을 parse_* 함수로 분리하고, FastAPI 용 비동기 버전
+   (*_async, 공유 커넥션 풀 사용) 추가. 동기 버전은 CLI 용으로 유지
+4. FastAPI 경로는 company/<회사명> 파일을 쓰지 않음
+   (텍스트·이미지를 메모리로 넘기고, 보관은 artifact_store 가 비동기로 처리)
+5. 비동기 요청은 crawl_scheduler 를 거쳐 호스트별 동시성·속도 제한, 감속, circuit breaker 적용
+6. 검색 결과·상세 iframe HTML 은 http_cache 로 조건부 재검증 (304 면 다운로드·파싱 생략)
+7. 파싱은 SoupStrainer 로 필요한 부분(common_recruilt_list, <td>·<img>)만 트리로 만듦
 """
 
+import os
+import re
+import asyncio
 from pathlib import Path
 import requests
-from bs4 import BeautifulSoup
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+from PIL import ImageFile
+
+from http_client import CONNECT_TIMEOUT, READ_TIMEOUT
+from crawl_scheduler import crawl_scheduler
+from http_cache import http_cache
+from metrics import STAGE_SECONDS
 
 # =====================================================
 # 0️⃣  프로젝트 루트 & company 폴더 경로  (경로 관련 추가)
@@ -32,56 +49,239 @@ headers = {
     )
 }
 
+# 동기(requests) 호출용 타임아웃 (connect, read)
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# 다중 페이지 검색: 최대 페이지 수 / 동시 요청 수
+SEARCH_MAX_PAGES         = int(os.getenv("SEARCH_MAX_PAGES", "5"))
+SEARCH_PAGE_CONCURRENCY  = int(os.getenv("SEARCH_PAGE_CONCURRENCY", "4"))
+
+# 상세 페이지 이미지: 최대 개수 / 동시 다운로드 수 / 본문 이미지로 볼 최소 크기
+MAX_JOB_IMAGES           = int(os.getenv("MAX_JOB_IMAGES", "10"))
+IMAGE_DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_DOWNLOAD_CONCURRENCY", "4"))
+MIN_IMAGE_SIDE           = int(os.getenv("MIN_IMAGE_SIDE", "100"))     # 가로·세로 최소(px)
+MIN_IMAGE_AREA           = int(os.getenv("MIN_IMAGE_AREA", "40000"))   # 최소 면적(px², 200x200)
+MIN_IMAGE_BYTES          = 2048     # 이보다 작으면 트래킹 픽셀·아이콘으로 봄
+IMAGE_PROBE_BYTES        = 256 * 1024   # 이만큼 읽어도 크기를 모르면 그냥 받음
+
+# 부분 파싱: 검색 결과는 common_recruilt_list 하위, 상세 페이지는 <td>·<img> 만 트리로 만듦
+RECRUIT_LIST_ONLY  = SoupStrainer("div", class_="common_recruilt_list")
+JOB_DETAIL_ONLY    = SoupStrainer(["td", "img"])
+BOX_ITEM_SECTIONS  = ("company_nm", "notification_info", "recruit_info")
+PAGE_ATTR          = re.compile(r"""<[a-zA-Z][^>]*?\spage=["']?(\d+)""")
+
 # =====================================================
-# 1️⃣  검색 페이지에서 채용 목록 크롤링  (변경 없음)
+# 1️⃣  검색 페이지에서 채용 목록 크롤링  (파싱 로직 변경 없음)
 # =====================================================
-def fetch_recruitment_info(company_name):
+def build_search_url(company_name, page=1):
     """
-    회사명 검색 → 채용공고 리스트(list[list]) 반환
+    회사명 → 사람인 직무 카테고리 검색 URL (page > 1 이면 해당 결과 페이지)
     """
-    main_url = "https://www.saramin.co.kr"
     url_front = (
         "https://www.saramin.co.kr/zf_user/jobs/list/job-category"
         "?cat_mcls=2&keydownAccess=&searchType=search&searchword="
     )
     url_back = "&panel_type=&search_optional_item=y&search_done=y&panel_count=y&preview=y"
     url = url_front + str(company_name) + url_back
+    if page > 1:
+        url += f"&page={page}"
+    return url
+
 
-    response = requests.get(url, headers=headers)
+def _parse_box_item(box_item, company_name, main_url):
+    """
+    box_item 1개 → [회사명, 공고 제목, URL, recruit_info <p>...] (회사명이 다르거나 형식이 깨졌으면 None)
+    - company_nm / notification_info / recruit_info 를 find_all 한 번으로 찾음
+    """
+    sections = {}
+    for div in box_item.find_all("div", class_=BOX_ITEM_SECTIONS):
+        for cls in div.get("class", ()):
+            sections.setdefault(cls, div)
+
+    div_company_nm = sections.get("company_nm")
+    div_notification_info = sections.get("notification_info")
+    if div_company_nm is None or div_notification_info is None:
+        return None
+    company_nm = div_company_nm.find('a') or div_company_nm.find('span')  # 예외 처리
+    if company_nm is None:
+        return None
+    company_group_name = company_nm.get_text(strip=True)
+    if company_name not in company_group_name:      # 다른 회사 공고는 나머지 필드를 보지 않음
+        return None
+
+    a_str_tit = div_notification_info.find('a', class_="str_tit")
+    if a_str_tit is None or not a_str_tit.has_attr("href"):
+        return None
+    company_data = [company_group_name, a_str_tit.get_text(strip=True), main_url + a_str_tit['href']]
+
+    div_recruit_info = sections.get("recruit_info")
+    if div_recruit_info is not None:
+        company_data.extend(p.get_text(strip=True) for p in div_recruit_info.find_all('p'))
+    return company_data
+
+
+def _parse_recruitment_soup(soup, company_name):
+    main_url = "https://www.saramin.co.kr"
+    recruitment_data = []
+
+    div_common_recruilt_list = soup.find('div', attrs={"class": "common_recruilt_list"})
+    if div_common_recruilt_list is None:       # 결과 없음 / 범위 밖 페이지
+        return recruitment_data
+    div_list_body = div_common_recruilt_list.find('div', attrs={"class": "list_body"})
+    if div_list_body is None:
+        return recruitment_data
+    for box_item in div_list_body.find_all('div', class_='box_item'):
+        company_data = _parse_box_item(box_item, company_name, main_url)
+        if company_data is not None:
+            recruitment_data.append(company_data)
+
+    return recruitment_data
+
+
+def _parse_last_page(html):
+    """
+    페이지네이션 영역의 page="N" 속성 중 최댓값 (없으면 1)
+    (common_recruilt_list 밖이라 트리를 만들지 않고 태그 속성만 정규식으로 읽음)
+    """
+    return max((int(page) for page in PAGE_ATTR.findall(html)), default=1)
+
+
+def _recruitment_soup(html):
+    # common_recruilt_list 하위만 트리로 만듦 (나머지 태그는 토큰화만 하고 버림)
+    return BeautifulSoup(html, "html.parser", parse_only=RECRUIT_LIST_ONLY)
+
+
+def parse_recruitment_list(html, company_name):
+    """
+    검색 결과 HTML → 채용공고 리스트(list[list]) 반환
+    """
+    return _parse_recruitment_soup(_recruitment_soup(html), company_name)
+
+
+def parse_recruitment_page(html, company_name):
+    """
+    검색 결과 HTML → (채용공고 리스트, 마지막 페이지 번호) 반환
+    """
+    return parse_recruitment_list(html, company_name), _parse_last_page(html)
+
+
+def fetch_recruitment_info(company_name):
+    """
+    회사명 검색 → 채용공고 리스트(list[list]) 반환
+    """
+    url = build_search_url(company_name)
+
+    response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
     recruitment_data = []
 
     if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "html.parser")
-        div_common_recruilt_list = soup.find('div', attrs={"class": "common_recruilt_list"})
-        div_list_body = div_common_recruilt_list.find('div', attrs={"class": "list_body"})
-        div_box_item = div_list_body.find_all('div', attrs={"class", 'box_item'})
-        for num in range(len(div_box_item)):
-            company_data = []
-            div_company_nm = div_box_item[num].find('div', attrs={"class": "company_nm"})
-            company_nm = div_company_nm.find('a') or div_company_nm.find('span')  # 예외 처리
-
-            div_notification_info = div_box_item[num].find('div', attrs={"class": "notification_info"})
-            a_str_tit = div_notification_info.find('a', attrs={"class", "str_tit"})
-            a_href = a_str_tit['href']
-
-            company_group_name = company_nm.get_text(strip=True)
-            company_title = a_str_tit.get_text(strip=True)
-            if company_name in company_group_name:
-                company_data.append(company_group_name)
-                company_data.append(company_title)
-                company_data.append(main_url + a_href)
-
-                div_recruit_info = div_box_item[num].find('div', attrs={"class": "recruit_info"})
-                p_class_list = div_recruit_info.find_all('p')
-                for p in p_class_list:
-                    company_data.append(p.get_text(strip=True))
-                recruitment_data.append(company_data)
+        recruitment_data = parse_recruitment_list(response.text, company_name)
     else:
         print(f"[!] 요청 실패 - 상태 코드: {response.status_code}")
 
     return recruitment_data
 
 
+async def fetch_recruitment_info_async(company_name):
+    """
+    fetch_recruitment_info 의 비동기 버전 (공유 커넥션 풀 사용)
+    - 이벤트 루프를 막지 않도록 HTML 파싱은 스레드에서 수행
+    """
+    url = build_search_url(company_name)
+
+    try:
+        with STAGE_SECONDS.time(stage="crawl_search"):
+            response = await http_cache.get(url, headers=headers)
+    except httpx.HTTPError as e:
+        print(f"[!] 요청 오류: {e!r}")
+        return []
+
+    if response.status_code != 200:
+        print(f"[!] 요청 실패 - 상태 코드: {response.status_code}")
+        return []
+
+    with STAGE_SECONDS.time(stage="parse_search"):
+        return await http_cache.parse(
+            response, f"list|{url}|{company_name}", parse_recruitment_list, response.text, company_name
+        )
+
+
+async def _fetch_recruitment_page_async(company_name, page):
+    """
+    검색 결과 한 페이지 → (채용공고 리스트, 마지막 페이지 번호)
+    """
+    url = build_search_url(company_name, page)
+
+    try:
+        with STAGE_SECONDS.time(stage="crawl_search"):
+            response = await http_cache.get(url, headers=headers)
+    except httpx.HTTPError as e:
+        print(f"[!] 요청 오류(page={page}): {e!r}")
+        return [], 1
+
+    if response.status_code != 200:
+        print(f"[!] 요청 실패(page={page}) - 상태 코드: {response.status_code}")
+        return [], 1
+
+    with STAGE_SECONDS.time(stage="parse_search"):
+        return await http_cache.parse(
+            response, f"page|{url}|{company_name}", parse_recruitment_page, response.text, company_name
+        )
+
+
+async def iter_recruitment_pages_async(
+    company_name,
+    max_pages=SEARCH_MAX_PAGES,
+    concurrency=SEARCH_PAGE_CONCURRENCY,
+):
+    """
+    여러 결과 페이지를 동시에 가져오며, 파싱이 끝난 페이지부터
+    (page, 채용공고 리스트) 를 yield 하는 비동기 제너레이터
+
+    - 1페이지를 먼저 받아 바로 내보내고, 페이지네이션에서 마지막 페이지를 확인
+    - 2페이지 이후는 최대 concurrency 개씩 동시에 요청 (완료 순서대로 yield)
+    - 소비자가 중간에 멈추면 남은 요청은 취소
+    """
+    first_page, last_page = await _fetch_recruitment_page_async(company_name, 1)
+    yield 1, first_page
+
+    last_page = min(last_page, max_pages)
+    if last_page <= 1:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(page):
+        async with semaphore:
+            data, _ = await _fetch_recruitment_page_async(company_name, page)
+            return page, data
+
+    tasks = [asyncio.create_task(fetch(page)) for page in range(2, last_page + 1)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_recruitment_pages_async(company_name, max_pages=SEARCH_MAX_PAGES):
+    """
+    여러 페이지의 채용공고를 모두 모아 list[list] 로 반환 (URL 기준 중복 제거, 페이지 순 정렬)
+    """
+    pages = {}
+    async for page, data in iter_recruitment_pages_async(company_name, max_pages):
+        pages[page] = data
+
+    recruitment_data, seen = [], set()
+    for page in sorted(pages):
+        for company_data in pages[page]:
+            if company_data[2] not in seen:
+                seen.add(company_data[2])
+                recruitment_data.append(company_data)
+    return recruitment_data
+
+
 def convert_to_recruitment_info(recruitment_data):
     """
     2차원 리스트 → dict 리스트 변환
@@ -115,43 +315,210 @@ def replace_image_url(image_url):
 # 3️⃣  상세 페이지 크롤링 → company/ 에 저장
 #     (크롤링 로직 동일, 단 저장 경로만 company/ 로 변경)
 # =====================================================
-def fetch_and_store_job_content(company_url, company_name):
+def extract_rec_idx(company_url):
+    """
+    공고 URL → rec_idx (공고 고유 번호)
+    """
+    return company_url.split("rec_idx=")[1].split("&")[0]
+
+
+def build_iframe_url(company_url):
+    """
+    공고 URL(rec_idx 포함) → 상세 iframe URL
+    """
     main_url = "https://www.saramin.co.kr"
-    company_number = company_url.split("rec_idx=")[1].split("&")[0]
-    iframe_url = f"{main_url}/zf_user/jobs/relay/view-detail?rec_idx={company_number}&amp;rec_seq=0"
+    company_number = extract_rec_idx(company_url)
+    return f"{main_url}/zf_user/jobs/relay/view-detail?rec_idx={company_number}&amp;rec_seq=0"
+
+
+def find_image_url(soup):
+    """
+    상세 페이지의 첫 번째 <img> → 보정된 이미지 URL (없으면 None)
+    """
+    img = soup.find("img")
+    if img and img.has_attr("src"):
+        return replace_image_url(img["src"])
+    return None
+
+
+def store_job_image(company_name, content):
+    img_path = COMPANY_DIR / f"{company_name}.jpg"           # ← company/ 경로
+    with img_path.open("wb") as img_file:
+        img_file.write(content)
+    print(f"[✔] 이미지 저장 완료: {img_path.name}")
 
-    response = requests.get(iframe_url, headers=headers)
+
+def extract_job_text(soup):
+    """
+    상세 페이지의 모든 <td> 텍스트 → 하나의 문자열 (TXT 저장 형식과 동일)
+    """
+    return "".join(
+        text + "\n" if text else " "
+        for text in (td.get_text(strip=True) for td in soup.find_all("td"))
+    )
+
+
+def store_job_text(company_name, soup):
+    txt_path = COMPANY_DIR / f"{company_name}.txt"                      # ← company/ 경로
+    with txt_path.open("w", encoding="utf-8") as f:
+        f.write(extract_job_text(soup))
+
+    print(f"[✔] 텍스트 저장 완료: {txt_path.name}")
+
+
+def fetch_and_store_job_content(company_url, company_name=None):
+    """
+    상세 페이지 → (td 텍스트, 이미지 bytes 또는 None) 반환, 실패 시 None
+    company_name 을 주면 기존처럼 company/<회사명>.jpg·.txt 에도 저장
+    """
+    iframe_url = build_iframe_url(company_url)
+
+    response = requests.get(iframe_url, headers=headers, timeout=REQUEST_TIMEOUT)
     if response.status_code != 200:
         print(f"[!] 요청 실패 - 상태 코드: {response.status_code}")
-        return
+        return None
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(response.text, "html.parser", parse_only=JOB_DETAIL_ONLY)
 
-    # ------------ 이미지 저장 ------------
-    img = soup.find("img")
-    if img and img.has_attr("src"):
-        img_url = replace_image_url(img["src"])
+    # ------------ 이미지 ------------
+    image = None
+    img_url = find_image_url(soup)
+    if img_url:
         try:
-            img_response = requests.get(img_url, headers=headers)
+            img_response = requests.get(img_url, headers=headers, timeout=REQUEST_TIMEOUT)
             if img_response.status_code == 200:
-                img_path = COMPANY_DIR / f"{company_name}.jpg"           # ← company/ 경로
-                with img_path.open("wb") as img_file:
-                    img_file.write(img_response.content)
-                print(f"[✔] 이미지 저장 완료: {img_path.name}")
+                image = img_response.content
+                if company_name:
+                    store_job_image(company_name, image)
             else:
                 print(f"[!] 이미지 요청 실패 - 상태 코드: {img_response.status_code}")
         except Exception as e:
             print(f"[!] 이미지 다운로드 오류: {e}")
 
-    # ------------ 텍스트 저장 ------------
-    td_tags = soup.find_all("td")
-    txt_path = COMPANY_DIR / f"{company_name}.txt"                      # ← company/ 경로
-    with txt_path.open("w", encoding="utf-8") as f:
-        for td in td_tags:
-            text = td.get_text(strip=True)
-            f.write(text + "\n" if text else " ")
+    # ------------ 텍스트 ------------
+    if company_name:
+        store_job_text(company_name, soup)
 
-    print(f"[✔] 텍스트 저장 완료: {txt_path.name}")
+    return extract_job_text(soup), image
+
+
+def _is_tiny(value):
+    # width/height 속성이 숫자로 명시돼 있고 MIN_IMAGE_SIDE 미만이면 True
+    value = str(value).strip().removesuffix("px")
+    return value.isdigit() and int(value) < MIN_IMAGE_SIDE
+
+
+def find_image_urls(soup, limit=MAX_JOB_IMAGES):
+    """
+    상세 페이지의 본문 후보 <img> → 보정된 이미지 URL 리스트 (문서 순서, 중복 제거)
+    - data: URI, svg, width/height 속성이 작은 이미지(로고·아이콘·트래킹 픽셀)는 제외
+    """
+    urls = []
+    for img in soup.find_all("img"):
+        src = img.get("src")
+        if not src or src.startswith("data:") or src.lower().endswith(".svg"):
+            continue
+        if _is_tiny(img.get("width", "")) or _is_tiny(img.get("height", "")):
+            continue
+        url = replace_image_url(src)
+        if url not in urls:
+            urls.append(url)
+        if len(urls) >= limit:
+            break
+    return urls
+
+
+def _parse_job_detail(html):
+    soup = BeautifulSoup(html, "html.parser", parse_only=JOB_DETAIL_ONLY)
+    return extract_job_text(soup), find_image_urls(soup)
+
+
+async def fetch_job_detail_async(company_url):
+    """
+    상세 iframe → (td 텍스트, 본문 이미지 URL 리스트), 실패 시 None
+    (공유 커넥션 풀 사용, 파싱은 스레드에서 수행)
+    """
+    iframe_url = build_iframe_url(company_url)
+
+    try:
+        with STAGE_SECONDS.time(stage="crawl_detail"):
+            response = await http_cache.get(iframe_url, headers=headers)
+    except httpx.HTTPError as e:
+        print(f"[!] 요청 오류: {e!r}")
+        return None
+    if response.status_code != 200:
+        print(f"[!] 요청 실패 - 상태 코드: {response.status_code}")
+        return None
+
+    with STAGE_SECONDS.time(stage="parse_detail"):
+        return await http_cache.parse(response, f"detail|{iframe_url}", _parse_job_detail, response.text)
+
+
+def _too_small(size):
+    width, height = size
+    return width < MIN_IMAGE_SIDE or height < MIN_IMAGE_SIDE or width * height < MIN_IMAGE_AREA
+
+
+async def download_image_async(img_url):
+    """
+    이미지 URL → bytes (실패하거나 본문 이미지가 아니면 None)
+
+    스트리밍으로 받으면서 본문을 다 받기 전에 걸러냄
+    - Content-Type 이 image/* 가 아니거나 Content-Length 가 너무 작으면 바로 중단
+    - 앞부분만으로 헤더를 읽어 가로·세로가 작으면(로고·트래킹 픽셀) 중단
+    """
+    try:
+        async with crawl_scheduler.stream("GET", img_url, headers=headers) as img_response:
+            if img_response.status_code != 200:
+                print(f"[!] 이미지 요청 실패 - 상태 코드: {img_response.status_code}")
+                return None
+
+            content_type = img_response.headers.get("content-type", "")
+            if content_type and not content_type.startswith("image/"):
+                print(f"[-] 이미지 아님, 건너뜀 ({content_type}): {img_url}")
+                return None
+            length = img_response.headers.get("content-length")
+            if length and length.isdigit() and int(length) < MIN_IMAGE_BYTES:
+                print(f"[-] 너무 작은 이미지, 건너뜀 ({length} bytes): {img_url}")
+                return None
+
+            chunks, received = [], 0
+            parser, size = ImageFile.Parser(), None
+            async for chunk in img_response.aiter_bytes():
+                chunks.append(chunk)
+                received += len(chunk)
+                if parser is not None:
+                    try:
+                        parser.feed(chunk)
+                    except Exception:
+                        parser = None           # 헤더 해석 불가 → 크기 확인 없이 받음
+                    if parser is not None and parser.image is not None:
+                        size, parser = parser.image.size, None
+                        if _too_small(size):
+                            print(f"[-] 작은 이미지 {size}, 건너뜀: {img_url}")
+                            return None
+                    elif received > IMAGE_PROBE_BYTES:
+                        parser = None
+    except httpx.HTTPError as e:
+        print(f"[!] 이미지 다운로드 오류: {e!r}")
+        return None
+
+    if received < MIN_IMAGE_BYTES:
+        return None
+    return b"".join(chunks)
+
+
+async def download_images_async(img_urls, concurrency=IMAGE_DOWNLOAD_CONCURRENCY):
+    """
+    여러 이미지 URL 을 동시에 받아 URL 순서대로 bytes 또는 None 리스트로 반환
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(url):
+        async with semaphore:
+            return await download_image_async(url)
+
+    return await asyncio.gather(*(fetch(url) for url in img_urls))
 
 
 # =====================================================
@@ -0,0 +1,130 @@
+"""
+extraction_cache.py
+~~~~~~~~~~~~~~~~~~~
+GPT 직무 추출 결과(job_list)를 디스크에 캐싱하는 모듈입니다.
+
+원문 텍스트·OCR 텍스트·system prompt·모델·temperature 가 모두 같으면
+같은 결과를 다시 받기 위해 LLM 을 호출하지 않습니다.
+
+주요 기능
+---------
+1. **extraction_key(text1, text2, system_prompt, model, temperature)**
+   다섯 입력을 길이 접두 sha256 으로 묶은 캐시 키
+2. **ExtractionCache.get(...) / set(...)**
+   diskcache 에 저장 (gunicorn 워커·재시작 간 공유, size_limit 초과 시 LRU 삭제)
+3. **버전 무효화**
+   항목마다 prompt 버전(= prompt 내용 해시) 태그를 붙여 두고,
+   prompts/system_prompt.txt 가 바뀌어 새 버전이 처음 보이면
+   이전 버전 태그의 항목을 한꺼번에 지웁니다(``Cache.evict(tag)``).
+"""
+
+import os
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+import diskcache
+
+from artifact_store import content_hash
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+EXTRACTION_CACHE_DIR        = os.getenv("EXTRACTION_CACHE_DIR", str(PROJECT_ROOT / ".cache" / "extraction"))
+EXTRACTION_CACHE_SIZE_LIMIT = int(os.getenv("EXTRACTION_CACHE_SIZE_LIMIT", str(128 * 1024 * 1024)))
+EXTRACTION_CACHE_EXPIRE     = float(os.getenv("EXTRACTION_CACHE_EXPIRE", str(14 * 24 * 3600)))  # 14일
+
+VERSION_KEY = "__prompt_version__"     # 마지막으로 본 prompt 버전
+
+# ---------------------------------------------------------------------------
+# Helper: 캐시 키 / prompt 버전
+# ---------------------------------------------------------------------------
+
+def prompt_version(system_prompt: str) -> str:
+    return content_hash(system_prompt)[:16]
+
+
+def extraction_key(
+    text1: str, text2: str, system_prompt: str, model: str, temperature: float
+) -> str:
+    digest = content_hash(text1, text2, system_prompt, model, repr(float(temperature)))
+    return f"jobs:{prompt_version(system_prompt)}:{digest}"
+
+# ---------------------------------------------------------------------------
+# Public: ExtractionCache
+# ---------------------------------------------------------------------------
+
+class ExtractionCache:
+    """LLM 직무 추출 결과 캐시 (prompt 버전 태그로 무효화)."""
+
+    def __init__(
+        self,
+        cache_dir: str = EXTRACTION_CACHE_DIR,
+        size_limit: int = EXTRACTION_CACHE_SIZE_LIMIT,
+        expire: float = EXTRACTION_CACHE_EXPIRE,
+    ):
+        self.expire = expire
+        self._disk = diskcache.Cache(
+            cache_dir,
+            size_limit=size_limit,
+            eviction_policy="least-recently-used",
+            tag_index=True,
+        )
+        self._known_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_version(self, version: str) -> None:
+        """새 prompt 버전이면 이전 버전 항목을 모두 지웁니다(워커 간 공유)."""
+        if version == self._known_version:
+            return
+        with self._disk.transact():
+            previous = self._disk.get(VERSION_KEY)
+            if previous != version:
+                if previous is not None:
+                    removed = self._disk.evict(previous)
+                    print(f"[♻] system prompt 변경 → 추출 캐시 {removed}건 무효화")
+                self._disk.set(VERSION_KEY, version)
+        self._known_version = version
+
+    def _get(self, key: str, version: str):
+        self._ensure_version(version)
+        return self._disk.get(key)
+
+    def _set(self, key: str, version: str, job_list: list[dict]) -> None:
+        self._ensure_version(version)
+        self._disk.set(key, job_list, expire=self.expire, tag=version)
+
+    async def get(
+        self, text1: str, text2: str, system_prompt: str, model: str, temperature: float
+    ) -> Optional[list[dict]]:
+        key = extraction_key(text1, text2, system_prompt, model, temperature)
+        job_list = await asyncio.to_thread(self._get, key, prompt_version(system_prompt))
+        if job_list is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return job_list
+
+    async def set(
+        self, text1: str, text2: str, system_prompt: str, model: str, temperature: float,
+        job_list: list[dict],
+    ) -> None:
+        key = extraction_key(text1, text2, system_prompt, model, temperature)
+        await asyncio.to_thread(self._set, key, prompt_version(system_prompt), job_list)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._disk),
+            "prompt_version": self._known_version,
+        }
+
+
+# 프로세스 전역 추출 캐시
+extraction_cache = ExtractionCache()
@@ -0,0 +1,240 @@
+"""
+feedback_engine.py
+~~~~~~~~~~~~~~~~~~
+자기소개서 피드백을 생성하는 엔진을 배포 설정으로 골라 쓰는 모듈입니다.
+
+주요 기능
+---------
+1. **FEEDBACK_ENGINE** (환경 변수)
+   - ``assistant`` (기본): Assistants API (Thread 생성 → Run streaming → 인용 정리)
+   - ``chat``            : Chat Completions 한 번 호출
+     (prompts/assistant_prompt.txt 를 system, user_message 를 user 로 보내므로
+     Thread·Run·메시지 조회 왕복이 없음)
+2. **stream_feedback(user_message, stream=True)**
+   어느 엔진이든 같은 형태로 넘겨줍니다.
+   ``{"delta": "..."}`` (stream=True 일 때 토큰 조각) → 마지막에 ``{"reply": "..."}``
+   엔진별 첫 토큰까지 시간(TTFT)·전체 시간을 로그로 남겨 운영에서 비교할 수 있습니다.
+   cache_scope/cache_answer 를 주면 response_cache(정확 일치 → 유사 답변) 를 먼저 확인합니다.
+3. **iter_feedback_batch(requests, concurrency)**
+   자기소개서 문항 여러 개를 최대 concurrency 개씩 동시에 실행하고,
+   끝난 문항부터 (index, reply 또는 예외) 를 넘겨줍니다.
+"""
+
+import os
+import time
+import asyncio
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from openai import AsyncOpenAI
+from openai import NotFoundError, OpenAIError
+from dotenv import load_dotenv
+
+from artifact_store import content_hash
+from assistant_manage import get_assistant_id, invalidate_assistant
+from assistant_service import stream_assistant
+from response_cache import response_cache
+from metrics import STAGE_SECONDS, FEEDBACK_TTFT_SECONDS, FEEDBACK_IN_FLIGHT, record_usage
+from openai_scheduler import openai_scheduler, estimate_tokens
+
+# ---------------------------------------------------------------------------
+# 비동기 OpenAI 클라이언트 / 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+env_path = Path(__file__).parent / ".env"
+load_dotenv(dotenv_path=env_path) # Load .env file if present
+
+openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)   # 재시도는 openai_scheduler
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+PROMPT_FILE  = PROJECT_ROOT / "prompts" / "assistant_prompt.txt"   # Assistant 생성 때와 같은 프롬프트
+
+FEEDBACK_ENGINES     = ("assistant", "chat")
+FEEDBACK_ENGINE      = os.getenv("FEEDBACK_ENGINE", "assistant").strip().lower()
+FEEDBACK_MODEL       = os.getenv("FEEDBACK_MODEL", "gpt-4o-mini")
+FEEDBACK_TEMPERATURE = float(os.getenv("FEEDBACK_TEMPERATURE", "1.0"))   # Assistant 기본값과 동일
+FEEDBACK_MAX_OUTPUT  = int(os.getenv("FEEDBACK_MAX_OUTPUT", "1000"))     # TPM 차감용 예상 출력 토큰 (600자 피드백)
+FEEDBACK_BATCH_CONCURRENCY = int(os.getenv("FEEDBACK_BATCH_CONCURRENCY", "4"))  # 배치 동시 실행 문항 수
+
+if FEEDBACK_ENGINE not in FEEDBACK_ENGINES:
+    raise ValueError(f"FEEDBACK_ENGINE 은 {FEEDBACK_ENGINES} 중 하나여야 합니다: {FEEDBACK_ENGINE!r}")
+
+# ---------------------------------------------------------------------------
+# Helper: system prompt 읽기 (프로세스당 한 번, 프롬프트를 바꾸면 재시작)
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def load_feedback_prompt(prompt_path: Path = PROMPT_FILE) -> str:
+    """prompts/assistant_prompt.txt 내용을 반환합니다(없거나 비어 있으면 RuntimeError)."""
+    try:
+        content = prompt_path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError as exc:
+        raise RuntimeError(f"시스템 프롬프트 파일이 없습니다: {prompt_path}") from exc
+    if not content:
+        raise RuntimeError(f"시스템 프롬프트 파일이 비어 있습니다: {prompt_path}")
+    return content
+
+
+async def _cache_scope(engine: str, cache_scope: str) -> str:
+    """
+    response_cache 공간 키. 답변을 만드는 설정이 바뀌면 다른 공간이 됩니다.
+    - chat     : 모델 + system prompt
+    - assistant: Assistant ID (instructions 는 Assistant 에 고정되어 있음)
+    """
+    if engine == "chat":
+        return content_hash(engine, FEEDBACK_MODEL, load_feedback_prompt(), cache_scope)
+    return content_hash(engine, await get_assistant_id(), cache_scope)
+
+# ---------------------------------------------------------------------------
+# Engine: Chat Completions
+# ---------------------------------------------------------------------------
+
+async def stream_chat_feedback(user_message: str, stream: bool = True) -> AsyncIterator[dict]:
+    """
+    system(assistant_prompt.txt) + user_message 로 Chat Completions 를 한 번 호출합니다.
+    stream=False 면 토큰 조각 없이 ``{"reply": ...}`` 하나만 넘겨줍니다.
+    """
+    messages = [
+        {"role": "system", "content": load_feedback_prompt()},
+        {"role": "user",   "content": user_message},
+    ]
+    tokens = estimate_tokens(
+        messages[0]["content"], user_message, model=FEEDBACK_MODEL, completion=FEEDBACK_MAX_OUTPUT
+    )
+    try:
+        if not stream:
+            response = await openai_scheduler.run(
+                lambda: openai.chat.completions.create(
+                    model=FEEDBACK_MODEL, messages=messages, temperature=FEEDBACK_TEMPERATURE,
+                ),
+                tokens=tokens,
+            )
+            record_usage(response.usage, FEEDBACK_MODEL)
+            yield {"reply": (response.choices[0].message.content or "").strip()}
+            return
+
+        # 스트림은 응답 헤더를 받을 때까지(429 여부가 결정될 때까지)만 스케줄러가 관리
+        response = await openai_scheduler.run(
+            lambda: openai.chat.completions.create(
+                model=FEEDBACK_MODEL, messages=messages, temperature=FEEDBACK_TEMPERATURE,
+                stream=True, stream_options={"include_usage": True},
+            ),
+            tokens=tokens,
+        )
+        parts = []
+        async for chunk in response:
+            record_usage(chunk.usage, FEEDBACK_MODEL)      # 마지막 청크에만 usage 가 있음
+            if chunk.choices and (text := chunk.choices[0].delta.content):
+                parts.append(text)
+                yield {"delta": text}
+        yield {"reply": "".join(parts).strip()}
+
+    except OpenAIError as exc:
+        raise RuntimeError(f"Chat Completions 실행 중 오류: {exc}") from exc
+
+# ---------------------------------------------------------------------------
+# Public: 설정된 엔진으로 피드백 생성
+# ---------------------------------------------------------------------------
+
+async def _stream_assistant_feedback(user_message: str) -> AsyncIterator[dict]:
+    """
+    캐시된 Assistant 로 실행. Assistant 가 삭제돼 NotFound 가 나면
+    캐시를 비우고 다시 확인(필요 시 새로 생성)한 뒤 한 번만 재시도합니다.
+    """
+    assistant_id = await get_assistant_id()
+    started = False
+    try:
+        async for event in stream_assistant(assistant_id, user_message):
+            started = True
+            yield event
+        return
+    except NotFoundError as exc:
+        if started:                     # 이미 응답을 보내기 시작했으면 재시도하지 않음
+            raise RuntimeError(f"Assistant 실행 중 오류: {exc}") from exc
+        invalidate_assistant(assistant_id)
+
+    try:
+        async for event in stream_assistant(await get_assistant_id(), user_message):
+            yield event
+    except NotFoundError as exc:
+        raise RuntimeError(f"Assistant 실행 중 오류: {exc}") from exc
+
+
+async def stream_feedback(
+    user_message: str,
+    stream: bool = True,
+    engine: str = FEEDBACK_ENGINE,
+    cache_scope: Optional[str] = None,
+    cache_answer: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """
+    engine 에 맞는 피드백 스트림. 마지막 이벤트는 항상 ``{"reply": ...}``.
+    cache_scope(답변을 뺀 요청 내용)·cache_answer(답변) 를 주면 캐시된 피드백을 먼저 찾고,
+    새로 생성한 피드백은 저장합니다.
+    """
+    started = time.perf_counter()
+    use_cache = cache_scope is not None and cache_answer is not None
+    if use_cache:
+        scope = await _cache_scope(engine, cache_scope)
+        cached, vector = await response_cache.lookup(scope, cache_answer)
+        if cached is not None:
+            if stream:
+                yield {"delta": cached}
+            yield {"reply": cached}
+            print(f"[⏱] 피드백 engine=cache total={time.perf_counter() - started:.2f}s")
+            return
+
+    if engine == "chat":
+        events = stream_chat_feedback(user_message, stream=stream)
+    else:
+        events = _stream_assistant_feedback(user_message)
+
+    first_token: Optional[float] = None
+    reply = ""
+    with FEEDBACK_IN_FLIGHT.track(engine=engine):
+        async for event in events:
+            if first_token is None:
+                first_token = time.perf_counter() - started
+                FEEDBACK_TTFT_SECONDS.observe(first_token, engine=engine)
+            if "reply" in event:
+                reply = event["reply"]
+            if "delta" in event and not stream:
+                continue
+            yield event
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage=f"feedback_{engine}")
+    print(
+        f"[⏱] 피드백 engine={engine} "
+        f"ttft={first_token or 0:.2f}s total={time.perf_counter() - started:.2f}s"
+    )
+    if use_cache and reply:
+        await response_cache.store(scope, cache_answer, reply, vector)
+
+
+async def iter_feedback_batch(
+    requests: list[dict],
+    concurrency: int = FEEDBACK_BATCH_CONCURRENCY,
+) -> AsyncIterator[tuple[int, str | Exception]]:
+    """
+    여러 요청(stream_feedback 인자 dict)을 최대 concurrency 개씩 동시에 실행하고,
+    끝난 순서대로 (입력 index, 전체 응답 또는 RuntimeError) 를 yield 하는 비동기 제너레이터
+    - 소비자가 중간에 멈추면(클라이언트 연결 종료 등) 남은 작업은 취소
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, request: dict) -> tuple[int, str | Exception]:
+        async with semaphore:
+            try:
+                reply = ""
+                async for event in stream_feedback(**request, stream=False):
+                    reply = event["reply"]
+                return index, reply
+            except RuntimeError as exc:
+                return index, exc
+
+    tasks = [asyncio.create_task(run(i, r)) for i, r in enumerate(requests)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
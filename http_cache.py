@@ -0,0 +1,186 @@
+"""
+http_cache.py
+~~~~~~~~~~~~~
+크롤러가 받는 HTML(검색 결과 페이지, view-detail iframe)을 디스크에 보관하고
+조건부 요청으로 재검증하는 HTTP 캐시 모듈입니다.
+
+주요 기능
+---------
+1. **HttpCache.get(url, headers)**
+   - HTTP_CACHE_MIN_FRESH 초(또는 Cache-Control max-age 중 긴 쪽) 이내 → 요청 없이 저장본 반환
+   - 그 이후 → ``If-None-Match`` / ``If-Modified-Since`` 로 재검증, 304 면 저장본 반환
+   - 200 이면 본문·ETag·Last-Modified 를 저장 (요청은 crawl_scheduler 를 거침)
+   - 재검증이 실패(요청 오류·5xx·circuit open)하면 저장본을 대신 반환 (stale-if-error)
+   반환값은 ``httpx.Response`` 이므로 호출부는 그대로 ``status_code`` / ``text`` 를 씁니다.
+   ``response.extensions["cache"]`` 는 "fresh" | "revalidated" | "stale" | "miss".
+2. **HttpCache.parse(response, key, fn, *args)**
+   본문 해시가 지난번과 같으면 이전 파싱 결과를 재사용 (304 면 파싱도 생략)
+3. 본문은 zstandard 로 압축해 diskcache(워커 간 공유, LRU, 크기 제한)에 저장
+4. **HttpCache.stats()**  fresh/재검증 hit, miss 건수
+"""
+
+import os
+import re
+import time
+import asyncio
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import diskcache
+import httpx
+import zstandard
+
+from artifact_store import content_hash
+from crawl_scheduler import crawl_scheduler
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+HTTP_CACHE_DIR        = os.getenv("HTTP_CACHE_DIR", str(PROJECT_ROOT / ".cache" / "http"))
+HTTP_CACHE_MIN_FRESH  = float(os.getenv("HTTP_CACHE_MIN_FRESH", "300"))            # 재검증 없이 쓰는 최소 시간(초)
+HTTP_CACHE_MAX_AGE    = float(os.getenv("HTTP_CACHE_MAX_AGE", str(7 * 24 * 3600)))  # 저장본 보관(초)
+HTTP_CACHE_SIZE_LIMIT = int(os.getenv("HTTP_CACHE_SIZE_LIMIT", str(256 * 1024 * 1024)))
+HTTP_CACHE_ZSTD_LEVEL = int(os.getenv("HTTP_CACHE_ZSTD_LEVEL", "3"))
+
+# 304 응답에서 본문 대신 재구성할 때 남겨 둘 응답 헤더
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+# ---------------------------------------------------------------------------
+# Helper: 신선도
+# ---------------------------------------------------------------------------
+
+def _fresh_for(headers: dict) -> float:
+    """저장본을 재검증 없이 쓸 시간(초) = max(HTTP_CACHE_MIN_FRESH, max-age)."""
+    match = MAX_AGE.search(headers.get("cache-control", ""))
+    return max(HTTP_CACHE_MIN_FRESH, float(match.group(1)) if match else 0.0)
+
+# ---------------------------------------------------------------------------
+# Public: HttpCache
+# ---------------------------------------------------------------------------
+
+class HttpCache:
+    """조건부 재검증 + zstd 압축 디스크 HTTP 캐시 (GET, 200 응답만)."""
+
+    def __init__(
+        self,
+        cache_dir: str = HTTP_CACHE_DIR,
+        size_limit: int = HTTP_CACHE_SIZE_LIMIT,
+        max_age: float = HTTP_CACHE_MAX_AGE,
+    ):
+        self.max_age = max_age
+        self._disk = diskcache.Cache(
+            cache_dir, size_limit=size_limit, eviction_policy="least-recently-used"
+        )
+        self.fresh_hits = 0
+        self.revalidated_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    # ------------------------------ 저장소 -------------------------------
+
+    def _load(self, url: str) -> Optional[dict]:
+        return self._disk.get(f"page:{url}")
+
+    def _save(self, url: str, entry: dict) -> None:
+        self._disk.set(f"page:{url}", entry, expire=self.max_age)
+
+    @staticmethod
+    def _response(url: str, entry: dict, source: str) -> httpx.Response:
+        """저장본 → httpx.Response (본문 압축 해제)."""
+        return httpx.Response(
+            200,
+            headers=entry["headers"],
+            content=zstandard.decompress(entry["body"]),
+            request=httpx.Request("GET", url),
+            extensions={"cache": source, "digest": entry["digest"]},
+        )
+
+    # ------------------------------ 공개 API -----------------------------
+
+    async def get(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        entry = await asyncio.to_thread(self._load, url)
+        now = time.time()
+        if entry is not None and now - entry["stored"] < _fresh_for(entry["headers"]):
+            self.fresh_hits += 1
+            return await asyncio.to_thread(self._response, url, entry, "fresh")
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if "etag" in entry["headers"]:
+                request_headers["If-None-Match"] = entry["headers"]["etag"]
+            if "last-modified" in entry["headers"]:
+                request_headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+
+        try:
+            response = await crawl_scheduler.get(url, headers=request_headers)
+        except httpx.HTTPError as e:
+            if entry is None:
+                raise
+            print(f"[!] 재검증 실패, 저장본 사용: {e!r}")
+            self.stale_hits += 1
+            return await asyncio.to_thread(self._response, url, entry, "stale")
+
+        if response.status_code == 304 and entry is not None:
+            # 본문은 그대로, 갱신된 검증자·캐시 헤더만 반영
+            for name in KEPT_HEADERS:
+                if name in response.headers:
+                    entry["headers"][name] = response.headers[name]
+            entry["stored"] = now
+            await asyncio.to_thread(self._save, url, entry)
+            self.revalidated_hits += 1
+            return await asyncio.to_thread(self._response, url, entry, "revalidated")
+
+        if response.status_code >= 500 and entry is not None:
+            self.stale_hits += 1
+            return await asyncio.to_thread(self._response, url, entry, "stale")
+
+        self.misses += 1
+        if response.status_code == 200:
+            body = response.content
+            digest = content_hash(body)
+            response.extensions["cache"], response.extensions["digest"] = "miss", digest
+            entry = {
+                "stored": now,
+                "digest": digest,
+                "headers": {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers},
+                "body": await asyncio.to_thread(zstandard.compress, body, HTTP_CACHE_ZSTD_LEVEL),
+            }
+            await asyncio.to_thread(self._save, url, entry)
+        return response
+
+    async def parse(self, response: httpx.Response, key: str, fn: Callable[..., Any], *args) -> Any:
+        """
+        fn(*args) 를 스레드에서 실행한 결과를 반환합니다.
+        key(URL + 파싱 인자)의 지난 결과가 같은 본문(digest)에서 나온 것이면 재사용합니다.
+        """
+        digest = response.extensions.get("digest")
+        if digest is None:
+            return await asyncio.to_thread(fn, *args)
+
+        parsed_key = f"parsed:{key}"
+        cached = await asyncio.to_thread(self._disk.get, parsed_key)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        result = await asyncio.to_thread(fn, *args)
+        await asyncio.to_thread(self._disk.set, parsed_key, (digest, result), expire=self.max_age)
+        return result
+
+    def stats(self) -> dict:
+        hits = self.fresh_hits + self.revalidated_hits + self.stale_hits
+        lookups = hits + self.misses
+        return {
+            "fresh_hits": self.fresh_hits,
+            "revalidated_hits": self.revalidated_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+
+# 프로세스 전역 HTTP 캐시
+http_cache = HttpCache()
@@ -0,0 +1,63 @@
+"""
+http_client.py
+~~~~~~~~~~~~~~
+크롤러가 공유하는 비동기 HTTP 클라이언트(커넥션 풀) 모듈입니다.
+
+주요 기능
+---------
+1. **get_async_client()**
+   프로세스 전역에서 하나만 쓰는 ``httpx.AsyncClient`` 를 반환합니다.
+   keep-alive 커넥션 풀, 요청별 타임아웃, (h2 설치 시) HTTP/2 를 사용합니다.
+2. **aclose_async_client()**
+   앱 종료 시 커넥션 풀을 닫습니다. (FastAPI lifespan 에서 호출)
+
+환경 변수로 풀 크기·타임아웃을 조정할 수 있습니다.
+"""
+
+import os
+import importlib.util
+from typing import Optional
+
+import httpx
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+CONNECT_TIMEOUT = float(os.getenv("CRAWL_CONNECT_TIMEOUT", "5"))   # 연결 타임아웃(초)
+READ_TIMEOUT    = float(os.getenv("CRAWL_READ_TIMEOUT", "15"))     # 응답 타임아웃(초)
+MAX_CONNECTIONS = int(os.getenv("CRAWL_MAX_CONNECTIONS", "50"))    # 풀 전체 커넥션 수
+MAX_KEEPALIVE   = int(os.getenv("CRAWL_MAX_KEEPALIVE", "20"))      # 유지할 idle 커넥션 수
+KEEPALIVE_EXPIRY = float(os.getenv("CRAWL_KEEPALIVE_EXPIRY", "30"))
+
+# h2 패키지가 설치돼 있을 때만 HTTP/2 사용 (없으면 HTTP/1.1 keep-alive)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+
+# ---------------------------------------------------------------------------
+# Public: 공유 클라이언트
+# ---------------------------------------------------------------------------
+
+def get_async_client() -> httpx.AsyncClient:
+    """공유 ``httpx.AsyncClient`` 를 반환합니다(최초 호출 시 생성)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def aclose_async_client() -> None:
+    """공유 클라이언트의 커넥션 풀을 닫습니다."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
@@ -1,8 +1,12 @@
+from io import BytesIO
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import platform
 import os
+import numpy as np
 from PIL import Image
 import pytesseract
+from pytesseract import Output
 
 # =========================================
 # 1️⃣ 프로젝트 루트 디렉토리 계산
@@ -10,29 +14,245 @@ import pytesseract
 PROJECT_ROOT = Path(__file__).resolve().parent   # 현재 .py 위치
 COMPANY_DIR  = PROJECT_ROOT / "company"          # ./company 폴더
 
+OCR_LANG = "kor+eng"
+OCR_OEM  = int(os.getenv("OCR_OEM", "3"))     # 3 = Tesseract 기본 엔진 선택
+OCR_PSM  = int(os.getenv("OCR_PSM", "3"))     # 3 = 자동 페이지 분할 (기본값)
+OCR_CONFIG = f"--oem {OCR_OEM} --psm {OCR_PSM}"
+# 단어별 confidence(0~100)가 이보다 낮으면 버림 (0 이면 필터 없이 image_to_string 사용)
+OCR_MIN_WORD_CONF = float(os.getenv("OCR_MIN_WORD_CONF", "30"))
+
+# 세로로 긴 포스터 분할 OCR 설정
+OCR_TILED         = os.getenv("OCR_TILED", "1") != "0"            # 분할 모드 사용 여부
+OCR_STRIP_HEIGHT  = int(os.getenv("OCR_STRIP_HEIGHT", "1600"))     # 목표 띠 높이(px)
+OCR_STRIP_OVERLAP = int(os.getenv("OCR_STRIP_OVERLAP", "80"))      # 여백 행이 없을 때 위아래 겹침(px)
+BLANK_ROW_RANGE   = 12      # 한 행의 (최대-최소) 밝기가 이 값 미만이면 여백 행으로 봄
+
+
+def ocr_settings_key(tiled: bool = OCR_TILED) -> str:
+    """
+    OCR 결과에 영향을 주는 설정 문자열 (OCR 캐시 키에 포함)
+    """
+    key = f"lang={OCR_LANG};oem={OCR_OEM};psm={OCR_PSM};conf={OCR_MIN_WORD_CONF:g};tiled={int(tiled)}"
+    if tiled:
+        # stitch=2: 겹친 경계에서만 정확히 같은 줄 제거
+        key += f";strip={OCR_STRIP_HEIGHT};overlap={OCR_STRIP_OVERLAP};stitch=2"
+    return key
+
 # =========================================
 # 2️⃣ OCR 함수 정의
 # =========================================
-def perform_ocr_to_txt_auto(company_name: str) -> bool | None:
-    """
-    회사명을 입력받아 company/<회사명>.jpg 파일을 OCR 처리 후
-    company/<회사명>_ocr.txt 에 저장합니다.
+_tesseract_configured = False
 
+def configure_tesseract() -> None:
+    """
+    운영체제 감지 후 Tesseract 경로 설정 (프로세스당 한 번)
     ✅ Windows → 명시적 Tesseract 경로
     ✅ Ubuntu/Linux → 기본 경로
-    ✅ 이미지가 없으면 빈 txt 생성 후 None 반환
-    ✅ OCR 성공 시 True 반환
-
-    :param company_name: 예) '(주)지아이티'  (확장자 없이)
-    :return: 성공 True, 실패/없음 시 None
     """
+    global _tesseract_configured
+    if _tesseract_configured:
+        return
 
-    # 운영체제 감지 후 Tesseract 경로 설정
     if platform.system() == "Windows":
         pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
         print("🪟 Windows 환경 - Tesseract 경로 설정 완료")
     else:
         print("🐧 Linux/Ubuntu 환경 - 기본 Tesseract 경로 사용")
+    _tesseract_configured = True
+
+
+def words_to_text(data: dict, min_conf: float = OCR_MIN_WORD_CONF) -> str:
+    """
+    image_to_data(DICT) 결과 → 신뢰도 min_conf 이상 단어만 남긴 텍스트
+    - 같은 (block, par, line) 단어는 한 줄로, 문단이 바뀌면 빈 줄을 넣음
+    - 단어가 모두 버려진 줄은 통째로 빠짐
+    """
+    paragraphs: dict[tuple, dict[int, list[str]]] = {}
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf < 0:                    # 페이지·블록·줄 레벨 행 (단어 아님)
+            continue
+        par = (data["block_num"][i], data["par_num"][i])
+        words = paragraphs.setdefault(par, {}).setdefault(data["line_num"][i], [])
+        if word.strip() and conf >= min_conf:
+            words.append(word.strip())
+
+    blocks = []
+    for lines in paragraphs.values():
+        text = "\n".join(" ".join(words) for words in lines.values() if words)
+        if text:
+            blocks.append(text)
+    return "\n\n".join(blocks)
+
+
+def recognize_image(image_path: Path | BytesIO) -> str:
+    """
+    이미지 파일 하나를 OCR 해서 텍스트를 반환합니다. 실패하면 예외를 그대로 올립니다.
+    (OCRExecutor 는 이 함수를 써서 실패를 failed 지표로 집계)
+    """
+    configure_tesseract()
+    image = Image.open(image_path)
+    if OCR_MIN_WORD_CONF <= 0:
+        return pytesseract.image_to_string(image, lang=OCR_LANG, config=OCR_CONFIG)
+    data = pytesseract.image_to_data(
+        image, lang=OCR_LANG, config=OCR_CONFIG, output_type=Output.DICT
+    )
+    return words_to_text(data)
+
+
+def recognize_image_bytes(data: bytes) -> str:
+    """메모리의 이미지 bytes → OCR 텍스트 (실패하면 예외)."""
+    return recognize_image(BytesIO(data))
+
+
+def ocr_image_file(image_path: Path | BytesIO) -> str | None:
+    """
+    이미지 파일 하나를 OCR 해서 텍스트를 반환합니다.
+
+    :param image_path: 이미지 파일 경로 (또는 파일 객체)
+    :return: 추출 텍스트, 실패 시 None
+    """
+    try:
+        return recognize_image(image_path)
+    except Exception as e:
+        print(f"⚠️ OCR 실패: {e}")
+        return None
+
+
+def ocr_image_bytes(data: bytes) -> str | None:
+    """
+    메모리의 이미지 bytes 를 디스크를 거치지 않고 바로 OCR 합니다.
+
+    :param data: 이미지 파일 내용 (jpg/png 등)
+    :return: 추출 텍스트, 실패 시 None
+    """
+    return ocr_image_file(BytesIO(data))
+
+
+# =========================================
+# 2️⃣-1 세로로 긴 이미지 분할 OCR
+# =========================================
+def plan_strips(
+    gray: np.ndarray,
+    strip_height: int = OCR_STRIP_HEIGHT,
+    overlap: int = OCR_STRIP_OVERLAP,
+) -> tuple[list[tuple[int, int]], list[bool]]:
+    """
+    흑백 이미지 배열 → (가로 띠 (top, bottom) 목록, 경계별 겹침 여부)
+
+    - 목표 높이 근처(±strip_height/4)에서 여백 행을 찾아 그 위치에서 자름 (겹침 없음)
+    - 여백 행이 없으면 목표 위치에서 위아래 overlap 만큼 겹치게 자름 (겹침 있음)
+    - 짧은 이미지는 ([(0, height)], [])
+    overlaps[i] 는 띠 i 와 띠 i+1 사이 경계가 겹치는지 여부입니다.
+    """
+    height = gray.shape[0]
+    search = strip_height // 4
+    if height <= strip_height + search:
+        return [(0, height)], []
+
+    blank = np.ptp(gray, axis=1) < BLANK_ROW_RANGE
+    boxes, overlaps, top = [], [], 0
+    while height - top > strip_height + search:
+        target = top + strip_height
+        lo, hi = target - search, target + search
+        candidates = np.flatnonzero(blank[lo:hi]) + lo
+        if candidates.size:
+            cut = int(candidates[np.argmin(np.abs(candidates - target))])
+            boxes.append((top, cut))
+            overlaps.append(False)
+            top = cut
+        else:
+            boxes.append((top, min(height, target + overlap)))
+            overlaps.append(True)
+            top = target - overlap
+    boxes.append((top, height))
+    return boxes, overlaps
+
+
+def split_image_strips(data: bytes) -> tuple[list[bytes], list[bool]]:
+    """
+    이미지 bytes → (가로 띠 PNG bytes 목록, 경계별 겹침 여부)
+    분할할 필요가 없으면 ([], [])
+    """
+    image = Image.open(BytesIO(data))
+    image.load()
+    boxes, overlaps = plan_strips(np.asarray(image.convert("L")))
+    if len(boxes) <= 1:
+        return [], []
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")        # CMYK JPEG 등은 PNG 로 저장할 수 없음
+
+    strips = []
+    for top, bottom in boxes:
+        buf = BytesIO()
+        image.crop((0, top, image.width, bottom)).save(buf, format="PNG")
+        strips.append(buf.getvalue())
+    return strips, overlaps
+
+
+def _normalize_line(line: str) -> str:
+    return " ".join(line.split())
+
+
+def stitch_strip_texts(
+    texts: list[str], overlaps: list[bool] | None = None, max_overlap_lines: int = 6
+) -> str:
+    """
+    띠별 OCR 결과를 위에서 아래 순서로 이어 붙입니다.
+    겹치게 자른 경계(overlaps[i] 가 True)에서만, 앞 띠의 끝 줄들과 다음 띠의 첫 줄들이
+    공백 정규화 후 정확히 같으면 한 번만 남깁니다.
+    여백 행에서 자른 경계는 그대로 이어 붙입니다 (비슷한 줄도 실제로 다른 내용일 수 있음).
+    """
+    overlaps = overlaps or []
+    lines: list[str] = []
+    for k, text in enumerate(texts):
+        new = text.splitlines()
+        drop = 0
+        if k > 0 and k - 1 < len(overlaps) and overlaps[k - 1]:
+            prev_idx = [i for i, l in enumerate(lines) if l.strip()][-max_overlap_lines:]
+            new_idx = [i for i, l in enumerate(new) if l.strip()][:max_overlap_lines]
+            for n in range(min(len(prev_idx), len(new_idx)), 0, -1):
+                pairs = zip(prev_idx[-n:], new_idx[:n])
+                if all(_normalize_line(lines[p]) == _normalize_line(new[q]) for p, q in pairs):
+                    drop = new_idx[n - 1] + 1
+                    break
+        lines.extend(new[drop:])
+    return "\n".join(lines)
+
+
+def ocr_image_tiled(data: bytes, max_workers: int | None = None) -> str | None:
+    """
+    세로로 긴 이미지를 띠로 나눠 병렬 OCR 후 이어 붙입니다(짧으면 일반 OCR).
+    tesseract 는 별도 프로세스로 실행되므로 스레드로도 코어 수만큼 병렬화됩니다.
+    """
+    try:
+        strips, overlaps = split_image_strips(data)
+    except Exception as e:
+        print(f"⚠️ 이미지 분할 실패, 전체 이미지로 OCR: {e}")
+        return ocr_image_bytes(data)
+    if not strips:
+        return ocr_image_bytes(data)
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        texts = list(pool.map(ocr_image_bytes, strips))
+    if all(t is None for t in texts):
+        return None
+    return stitch_strip_texts([t or "" for t in texts], overlaps)
+
+
+def perform_ocr_to_txt_auto(company_name: str, tiled: bool = OCR_TILED) -> bool | None:
+    """
+    회사명을 입력받아 company/<회사명>.jpg 파일을 OCR 처리 후
+    company/<회사명>_ocr.txt 에 저장합니다.
+
+    ✅ 이미지가 없으면 빈 txt 생성 후 None 반환
+    ✅ OCR 성공 시 True 반환
+    ✅ tiled=True 면 세로로 긴 이미지를 띠로 나눠 병렬 OCR
+
+    :param company_name: 예) '(주)지아이티'  (확장자 없이)
+    :param tiled: 분할 병렬 OCR 사용 여부
+    :return: 성공 True, 실패/없음 시 None
+    """
 
     # ---------------- 경로 설정 ----------------
     image_path  = COMPANY_DIR / f"{company_name}.jpg"
@@ -46,21 +266,25 @@ def perform_ocr_to_txt_auto(company_name: str) -> bool | None:
         return None
 
     # ---------------- OCR 처리 ----------------
-    try:
-        image = Image.open(image_path)
-        text  = pytesseract.image_to_string(image, lang="kor+eng")
-
-        with output_path.open("w", encoding="utf-8") as f:
-            f.write(text)
-
-        print(f"✅ OCR 완료: {output_path}")
-        return True
-
-    except Exception as e:
-        print(f"⚠️ OCR 실패: {e}")
+    if tiled:
+        configure_tesseract()
+        try:
+            text = ocr_image_tiled(image_path.read_bytes())
+        except Exception as e:
+            print(f"⚠️ OCR 실패: {e}")
+            text = None
+    else:
+        text = ocr_image_file(image_path)
+    if text is None:
         with output_path.open("w", encoding="utf-8") as f:
             f.write("")            # 오류 방지용 빈 파일
         return None
+
+    with output_path.open("w", encoding="utf-8") as f:
+        f.write(text)
+
+    print(f"✅ OCR 완료: {output_path}")
+    return True
     # OCR 성공 → True, 실패/없음 → None
 
 # =========================================
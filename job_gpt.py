@@ -6,6 +6,11 @@ import asyncio
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
 
+from extraction_cache import extraction_cache
+from text_normalize import normalize_for_extraction
+from metrics import record_usage
+from openai_scheduler import openai_scheduler, estimate_tokens, OpenAIQueueFull
+
 # =====================================================
 # 0️⃣  프로젝트 루트 & company 폴더 경로  (경로 관련 추가)
 # =====================================================
@@ -19,7 +24,13 @@ COMPANY_DIR.mkdir(exist_ok=True)                        #   └─ 없으면 생
 env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path)  # Load .env file if present
 
-openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# 재시도는 openai_scheduler 가 담당 (SDK 자체 재시도와 겹치지 않도록 0)
+openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+# 직무 추출에 쓰는 모델 설정 (추출 캐시 키에도 포함)
+EXTRACTION_MODEL       = os.getenv("EXTRACTION_MODEL", "gpt-4o-mini")
+EXTRACTION_TEMPERATURE = float(os.getenv("EXTRACTION_TEMPERATURE", "0.2"))
+EXTRACTION_MAX_OUTPUT  = int(os.getenv("EXTRACTION_MAX_OUTPUT", "2000"))   # TPM 차감용 예상 출력 토큰
 
 # =========================================
 # 2) System Prompt (앞서 만든 내용 그대로)
@@ -33,10 +44,13 @@ def is_notebook():
         return False
 
 
+_prompt_cache: dict = {}     # {path: (mtime_ns, size, content)}
+
 def load_system_prompt_from_file() -> str | None:
     """
     prompts/system_prompt.txt 파일을 읽어 system_prompt 문자열을 반환한다.
     경로 오류 또는 파일 내용이 비어 있으면 None 반환.
+    (파일이 바뀌지 않았으면(mtime·크기 동일) 메모리에 둔 내용을 재사용)
     """
     try:
         # 현재 프로젝트 루트 계산
@@ -53,9 +67,15 @@ def load_system_prompt_from_file() -> str | None:
             print(f"[경고] 파일 없음: {prompt_path}")
             return None
 
+        stat = prompt_path.stat()
+        cached = _prompt_cache.get(prompt_path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
         with prompt_path.open("r", encoding="utf-8") as fp:
-            content = fp.read().strip()
-            return content if content else None
+            content = fp.read().strip() or None
+        _prompt_cache[prompt_path] = (stat.st_mtime_ns, stat.st_size, content)
+        return content
 
     except Exception as e:
         print(f"[에러] system_prompt 로딩 실패: {e}")
@@ -69,7 +89,8 @@ async def call_openai_assistant_api(
         text2: str,
         system_prompt: str,
         user_prompt_prefix: str = "다음 두 텍스트를 분석해 규칙에 맞게 구조화해줘.",
-        model: str = "gpt-4o-mini"
+        model: str = EXTRACTION_MODEL,
+        temperature: float = EXTRACTION_TEMPERATURE,
     ) -> dict:
     """
     두 텍스트를 GPT-4o-mini에 전달 후 JSON 결과 반환
@@ -84,14 +105,21 @@ async def call_openai_assistant_api(
     {text2}""".strip()
 
     try:
-        response = await openai.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user",    "content": user_prompt}
-            ],
-            temperature=0.2
+        # rate limit 을 지키며 호출 (429·5xx 는 Retry-After 를 따라 재시도)
+        response = await openai_scheduler.run(
+            lambda: openai.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user",    "content": user_prompt}
+                ],
+                temperature=temperature
+            ),
+            tokens=estimate_tokens(
+                system_prompt, user_prompt, model=model, completion=EXTRACTION_MAX_OUTPUT
+            ),
         )
+        record_usage(response.usage, model)
 
         reply = response.choices[0].message.content.strip()
 
@@ -102,6 +130,8 @@ async def call_openai_assistant_api(
             print("⚠️ JSON 파싱 실패 – 원본 문자열 반환")
             return {"raw_response": reply}
 
+    except OpenAIQueueFull:
+        raise                       # 과부하는 호출한 쪽에서 503 으로 처리
     except Exception as e:
         return {"error": str(e)}
 
@@ -120,13 +150,7 @@ async def fetch_job_json_by_company(company_name: str) -> list[dict] | None:
         job_list: [{...}, {...}, ...] 형식의 리스트 (성공 시)
         None: system_prompt 없음 또는 에러 발생 시
     """
-    # 1. system_prompt 불러오기
-    system_prompt = load_system_prompt_from_file()
-    if system_prompt is None:
-        print("❌ [에러] system_prompt.txt 를 찾을 수 없거나 비어 있습니다.")
-        return None
-
-    # 2. 파일 경로 설정 및 텍스트 읽기 (company/ 폴더 기준)
+    # 1. 파일 경로 설정 및 텍스트 읽기 (company/ 폴더 기준)
     try:
         file1_path = COMPANY_DIR / f"{company_name}.txt"
         file2_path = COMPANY_DIR / f"{company_name}_ocr.txt"
@@ -141,10 +165,36 @@ async def fetch_job_json_by_company(company_name: str) -> list[dict] | None:
         print(f"❌ [에러] 텍스트 파일 누락: {e}")
         return None
 
-    # 3. GPT 호출 (await 사용!)
+    # 2. GPT 호출 및 결과 검증
+    return await extract_job_list(txt1, txt2)
+
+
+async def extract_job_list(txt1: str, txt2: str) -> list[dict] | None:
+    """
+    원문 텍스트(txt1)·OCR 텍스트(txt2)를 GPT 로 구조화한 직무 JSON 리스트를 반환합니다.
+    system_prompt 없음 / API 오류 / JSON 파싱 실패 시 None.
+    두 텍스트는 잡음 제거·토큰 예산 적용(text_normalize) 후 사용하고,
+    입력·prompt·모델·temperature 가 모두 같으면 추출 캐시 결과를 그대로 반환합니다.
+    """
+    # 1. system_prompt 불러오기
+    system_prompt = load_system_prompt_from_file()
+    if system_prompt is None:
+        print("❌ [에러] system_prompt.txt 를 찾을 수 없거나 비어 있습니다.")
+        return None
+
+    # 잡음 줄·공백 정리 + 토큰 예산 (tiktoken 계산은 CPU 작업이라 스레드에서)
+    txt1, txt2 = await asyncio.to_thread(normalize_for_extraction, txt1, txt2, EXTRACTION_MODEL)
+
+    cache_args = (txt1, txt2, system_prompt, EXTRACTION_MODEL, EXTRACTION_TEMPERATURE)
+    cached = await extraction_cache.get(*cache_args)
+    if cached is not None:
+        print("[♻] 직무 추출 캐시 사용")
+        return cached
+
+    # 2. GPT 호출 (await 사용!)
     result = await call_openai_assistant_api(txt1, txt2, system_prompt)
 
-    # 4. 결과 검증 및 반환
+    # 3. 결과 검증 및 반환
     if isinstance(result, dict) and "error" in result:
         print(f"❌ [API 호출 실패] {result['error']}")
         return None
@@ -153,7 +203,8 @@ async def fetch_job_json_by_company(company_name: str) -> list[dict] | None:
         print("⚠️ [경고] JSON 파싱 실패 – 원본 문자열로 반환됨")
         return None
 
-    # 5. 정상 JSON 데이터 반환
+    # 4. 정상 JSON 데이터 캐싱 후 반환
+    await extraction_cache.set(*cache_args, result)
     return result  # type: ignore[return-value]
 
 
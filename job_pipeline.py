@@ -0,0 +1,187 @@
+"""
+job_pipeline.py
+~~~~~~~~~~~~~~~
+/jobdescription 의 처리 파이프라인 (크롤링 → 이미지(여러 장) → OCR → GPT 직무 추출) 모듈입니다.
+
+주요 기능
+---------
+1. **run_job_pipeline(company, url)**
+   공고 하나에 대해 각 단계를 순서대로 실행하고 직무 JSON 리스트를 반환합니다.
+   단계 사이 데이터(텍스트·이미지 bytes·OCR 텍스트)는 메모리로 바로 넘깁니다.
+   다운로드한 이미지만 AsyncArtifactSink 가 백그라운드에서 보관합니다(다시 받지 않기 위해).
+   OCR·추출 결과의 원본은 ocr_cache / extraction_cache 하나뿐입니다.
+   본문 이미지는 모두 찾아 동시에 받고(작은 이미지·중복은 제외), 한 묶음으로 OCR 합니다.
+   같은 URL 의 이미지는 다시 받지 않고, OCR 은 이미지 해시 + 설정 기준 ocr_cache,
+   GPT 추출은 입력·prompt·모델 기준 extraction_cache 로 공고 간에도 재사용합니다.
+2. **fetch_job_list(company, url)**
+   같은 공고(rec_idx)에 대한 동시 요청을 single-flight 로 합쳐서
+   크롤링·OCR·LLM 호출이 한 번만 일어나도록 합니다. (엔드포인트는 이 함수를 사용)
+3. **pipeline_progress**
+   단계가 바뀔 때 호출할 비동기 콜백을 담는 contextvar (job_queue 가 작업 진행 상황 기록에 사용)
+   single-flight follower 는 leader 의 진행 상황을 받지 않습니다.
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+from artifact_store import AsyncArtifactSink, content_hash
+from crawling import fetch_job_detail_async, download_images_async, extract_rec_idx
+from ocr_cache import ocr_cache
+from ocr_executor import ocr_executor, OCRQueueFull
+from job_gpt import extract_job_list
+from metrics import STAGE_SECONDS, JOB_PIPELINES_IN_FLIGHT
+from openai_scheduler import OpenAIQueueFull
+from single_flight import SingleFlight
+
+# 프로세스 전역 single-flight (워커 간은 디스크 잠금으로 합침)
+# 대기열 초과는 다른 워커의 follower 에서도 같은 예외로 받아 503 으로 응답
+job_flight = SingleFlight(reraise=(OCRQueueFull, OpenAIQueueFull))
+
+# 단계별 산출물 보관 (rec_idx + 해시, 쓰기는 비동기)
+artifact_sink = AsyncArtifactSink()
+
+# 단계 진입 시 await 할 콜백 (None 이면 보고하지 않음)
+pipeline_progress: ContextVar[Optional[Callable[[str], Awaitable[None]]]] = ContextVar(
+    "pipeline_progress", default=None
+)
+
+
+async def _report(stage: str) -> None:
+    callback = pipeline_progress.get()
+    if callback is not None:
+        await callback(stage)
+
+# =====================================================
+# 1️⃣  단계별 헬퍼 (입력 해시가 같으면 저장된 산출물 재사용)
+# =====================================================
+async def _collect_images(rec_idx: str, img_urls: list[str]) -> list[tuple[str, bytes | None, int]]:
+    """
+    이미지 URL 들 → [(이미지 해시, bytes 또는 None, img_urls 위치)] (문서 순서, 내용 중복 제거)
+    같은 URL 은 저장된 해시만 재사용하고(bytes=None), 나머지는 동시에 다운로드
+    """
+    image_inputs = [content_hash(img_url) for img_url in img_urls]
+    known = await asyncio.gather(
+        *(artifact_sink.lookup(rec_idx, f"image:{i}", key) for i, key in enumerate(image_inputs))
+    )
+    missing = [i for i, image_hash in enumerate(known) if image_hash is None]
+    downloaded = dict(zip(missing, await download_images_async([img_urls[i] for i in missing])))
+
+    images, seen = [], set()
+    for i, image_input in enumerate(image_inputs):
+        image_hash, image = known[i], downloaded.get(i)
+        if image_hash is None:
+            if not image:               # 실패했거나 로고·트래킹 픽셀 등으로 걸러짐
+                continue
+            image_hash = artifact_sink.submit(rec_idx, f"image:{i}", image_input, image)
+        if image_hash not in seen:      # 같은 이미지가 여러 번 들어간 경우
+            seen.add(image_hash)
+            images.append((image_hash, image, i))
+    return images
+
+
+async def _load_images(
+    rec_idx: str, img_urls: list[str], images: list[tuple[str, bytes | None, int]]
+) -> list[tuple[str, bytes | None]]:
+    """
+    OCR 할 이미지들의 (해시, bytes). 다운로드를 생략한 이미지는 저장소에서 읽고,
+    blob 이 이미 지워졌으면(LRU 정리) 다시 다운로드해 저장 (실패하면 bytes=None)
+    """
+    loaded = [
+        (image_hash, image if image is not None else await artifact_sink.load(image_hash))
+        for image_hash, image, _ in images
+    ]
+    evicted = [n for n, (_, image) in enumerate(loaded) if image is None]
+    if not evicted:
+        return loaded
+
+    print(f"[↻] 저장된 이미지 {len(evicted)}개가 정리되어 다시 다운로드 (rec_idx={rec_idx})")
+    urls = [img_urls[images[n][2]] for n in evicted]
+    for n, url, image in zip(evicted, urls, await download_images_async(urls)):
+        if not image:
+            print(f"⚠️ 이미지 재다운로드 실패, OCR 에서 제외: {url}")
+            continue
+        image_hash = artifact_sink.submit(rec_idx, f"image:{images[n][2]}", content_hash(url), image)
+        loaded[n] = (image_hash, image)
+    return loaded
+
+
+async def _ocr_posting_images(rec_idx: str, img_urls: list[str]) -> str:
+    """
+    공고의 본문 이미지 전체를 OCR 해서 문서 순서대로 이어 붙인 텍스트를 반환
+    - 같은 이미지·같은 설정이면 ocr_cache 사용 (공고 간 공유)
+    - 캐시에 없는 이미지만 한 묶음으로 프로세스 풀에 넘김
+      (대기열이 가득 차면 OCRQueueFull 이 그대로 올라감)
+    """
+    await _report("images")
+    with STAGE_SECONDS.time(stage="images"):
+        images = await _collect_images(rec_idx, img_urls)
+    if not images:
+        print('ocr 된 게 없습니다.')
+        return ""
+
+    texts = list(await asyncio.gather(*(ocr_cache.get(image_hash) for image_hash, _, _ in images)))
+    pending = [i for i, text in enumerate(texts) if text is None]
+    if len(pending) < len(images):
+        print(f"[♻] ocr 캐시 사용 {len(images) - len(pending)}/{len(images)} (rec_idx={rec_idx})")
+
+    if pending:
+        # 다운로드를 생략한 이미지는 저장소에서 bytes 를 읽어옴 (없어졌으면 다시 다운로드)
+        batch = await _load_images(rec_idx, img_urls, [images[i] for i in pending])
+        ready = [(i, image_hash) for i, (image_hash, image) in zip(pending, batch) if image]
+        await _report("ocr")
+        with STAGE_SECONDS.time(stage="ocr"):
+            results = await ocr_executor.ocr_batch([image for _, image in batch if image])
+        for (i, image_hash), text in zip(ready, results):
+            if text is not None:
+                texts[i] = text
+                await ocr_cache.set(image_hash, text)
+
+    ocr_text = "\n\n".join(text.strip() for text in texts if text and text.strip())
+    if not ocr_text:
+        print('ocr 된 게 없습니다.')
+    return ocr_text
+
+# =====================================================
+# 2️⃣  파이프라인 본체
+# =====================================================
+async def run_job_pipeline(company: str, url: str) -> list[dict] | None:
+    """
+    크롤링 → 이미지(여러 장) → OCR → GPT 추출을 실행하고 직무 JSON 리스트(실패 시 None)를 반환
+    """
+    rec_idx = extract_rec_idx(url)
+    with JOB_PIPELINES_IN_FLIGHT.track(), STAGE_SECONDS.time(stage="job_pipeline"):
+        return await _run_job_pipeline(rec_idx, company, url)
+
+
+async def _run_job_pipeline(rec_idx: str, company: str, url: str) -> list[dict] | None:
+    # ------------ 1. 상세 페이지 텍스트 ------------
+    await _report("crawl")
+    detail = await fetch_job_detail_async(url)
+    if detail is None:
+        return None
+    page_text, img_urls = detail
+
+    # ------------ 2~3. 이미지 → OCR ------------
+    ocr_text = await _ocr_posting_images(rec_idx, img_urls)
+
+    # ------------ 4. GPT 직무 추출 (입력·prompt·모델이 같으면 extraction_cache) ------------
+    await _report("extraction")
+    with STAGE_SECONDS.time(stage="extraction"):
+        job_list = await extract_job_list(page_text, ocr_text)
+    print(f"[✔] 직무 추출 완료: {company} (rec_idx={rec_idx})")
+    return job_list
+
+# =====================================================
+# 3️⃣  공고 단위 요청 합치기
+# =====================================================
+async def fetch_job_list(company: str, url: str) -> list[dict] | None:
+    """
+    rec_idx 가 같은 동시 요청은 leader 하나만 파이프라인을 실행하고
+    나머지(follower)는 그 결과를 기다려 그대로 받음
+    """
+    rec_idx = extract_rec_idx(url)
+    return await job_flight.do(
+        f"jobdescription:{rec_idx}",
+        lambda: run_job_pipeline(company, url),
+    )
@@ -0,0 +1,196 @@
+"""
+job_queue.py
+~~~~~~~~~~~~
+/jobdescription 파이프라인을 백그라운드 작업으로 실행하는 비동기 작업 큐 모듈입니다.
+
+크롤링 → 이미지 → OCR → GPT 추출이 프록시·gunicorn 타임아웃을 넘기기 쉬우므로
+요청은 작업 ID 만 받아 바로 끝내고, 결과는 따로 조회합니다.
+
+주요 기능
+---------
+1. **JobQueue.submit(company, url)**
+   작업 레코드를 만들고 bounded 대기열(JOB_QUEUE_SIZE)에 넣은 뒤 작업 ID 를 반환
+   (가득 차면 ``JobQueueFull``)
+2. **워커 풀**
+   워커마다 JOB_WORKERS 개의 Task 가 대기열에서 꺼내 fetch_job_list 를 실행
+   (lifespan 에서 ``start()`` / ``stop()``)
+3. **진행 상황**
+   status: queued → running → succeeded | failed
+   stage : job_pipeline.pipeline_progress 로 받은 단계 (crawl, images, ocr, extraction)
+4. **JobQueue.get(job_id) / watch(job_id)**
+   레코드 조회, 상태가 바뀔 때마다 레코드를 yield 하는 비동기 제너레이터 (SSE 용)
+5. 레코드는 diskcache 에 JOB_RESULT_TTL 동안 보관 (gunicorn 워커 간 공유 → 어느 워커에서든 조회 가능)
+"""
+
+import os
+import time
+import uuid
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import diskcache
+
+from job_pipeline import fetch_job_list, pipeline_progress
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+JOB_WORKERS        = int(os.getenv("JOB_WORKERS", "2"))              # 워커(프로세스)당 동시 실행 작업 수
+JOB_QUEUE_SIZE     = int(os.getenv("JOB_QUEUE_SIZE", "50"))          # 워커당 대기 작업 수
+JOB_RESULT_TTL     = float(os.getenv("JOB_RESULT_TTL", "3600"))      # 마지막 갱신 후 레코드 보관(초)
+JOB_POLL_INTERVAL  = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))    # watch() 가 레코드를 다시 읽는 간격(초)
+JOB_DIR            = os.getenv("JOB_DIR", str(PROJECT_ROOT / ".cache" / "jobs"))
+
+FINISHED = ("succeeded", "failed")
+
+
+class JobQueueFull(RuntimeError):
+    """작업 대기열이 가득 차서 새 작업을 받을 수 없을 때 발생합니다."""
+
+# ---------------------------------------------------------------------------
+# Public: JobQueue
+# ---------------------------------------------------------------------------
+
+class JobQueue:
+    """bounded asyncio.Queue + 워커 Task 풀 + diskcache 작업 레코드."""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        queue_size: int = JOB_QUEUE_SIZE,
+        ttl: float = JOB_RESULT_TTL,
+        cache_dir: str = JOB_DIR,
+    ):
+        self.workers = max(1, workers)
+        self.ttl = ttl
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self._disk = diskcache.Cache(cache_dir)
+        self._tasks: list[asyncio.Task] = []
+        self._running = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._rejected = 0
+
+    # ------------------------------ 레코드 -------------------------------
+
+    def _key(self, job_id: str) -> str:
+        return f"job:{job_id}"
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._disk.get, self._key(job_id))
+
+    async def _save(self, job: dict) -> None:
+        job["updated"] = time.time()
+        await asyncio.to_thread(self._disk.set, self._key(job["id"]), dict(job), expire=self.ttl)
+
+    # ------------------------------ 제출 ---------------------------------
+
+    async def submit(self, company: str, url: str) -> dict:
+        """작업을 대기열에 넣고 레코드(status=queued)를 반환합니다."""
+        if self._queue.full():
+            self._rejected += 1
+            raise JobQueueFull(f"작업 대기열 초과 ({self._queue.qsize()}/{self._queue.maxsize})")
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "stage": None,
+            "company": company,
+            "url": url,
+            "created": time.time(),
+            "result": None,
+            "error": None,
+        }
+        await self._save(job)
+        self._queue.put_nowait(job)
+        return job
+
+    # ------------------------------ 워커 ---------------------------------
+
+    async def _execute(self, job: dict) -> None:
+        async def progress(stage: str) -> None:
+            job["stage"] = stage
+            await self._save(job)
+
+        job["status"] = "running"
+        await self._save(job)
+        self._running += 1
+        token = pipeline_progress.set(progress)
+        try:
+            job_list = await fetch_job_list(job["company"], job["url"])
+            # 동기 /jobdescription 응답과 같은 형태
+            job["result"] = {"message": "None"} if job_list is None else {"reply": job_list}
+            job["status"] = "succeeded"
+            self._succeeded += 1
+        except asyncio.CancelledError:
+            job["status"], job["error"] = "failed", "서버 종료로 작업이 중단되었습니다."
+            self._failed += 1
+            await asyncio.shield(self._save(job))
+            raise
+        except Exception as e:
+            print(f"[!] 작업 실패 ({job['id']}): {e!r}")
+            job["status"], job["error"] = "failed", str(e) or type(e).__name__
+            self._failed += 1
+        finally:
+            pipeline_progress.reset(token)
+            self._running -= 1
+        job["stage"] = None
+        await self._save(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    def start(self) -> None:
+        """워커 Task 를 띄웁니다. (lifespan 시작 시)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """워커를 멈추고, 아직 시작하지 않은 작업은 failed 로 기록합니다. (lifespan 종료 시)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            job["status"], job["error"] = "failed", "서버 종료로 작업이 실행되지 않았습니다."
+            await self._save(job)
+
+    # ------------------------------ 조회 ---------------------------------
+
+    async def watch(self, job_id: str) -> AsyncIterator[dict]:
+        """상태·단계가 바뀔 때마다 레코드를 yield, 끝나면(또는 만료되면) 종료합니다."""
+        last = None
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            state = (job["status"], job["stage"])
+            if state != last:
+                last = state
+                yield job
+            if job["status"] in FINISHED:
+                return
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "running": self._running,
+            "workers": self.workers,
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+            "rejected": self._rejected,
+        }
+
+
+# 프로세스 전역 작업 큐
+job_queue = JobQueue()
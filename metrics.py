@@ -0,0 +1,284 @@
+"""
+metrics.py
+~~~~~~~~~~
+hot path 계측용 경량 메트릭 모듈입니다. (/metrics 에서 Prometheus 텍스트 형식으로 노출)
+
+외부 의존성 없이 dict 누적만 하므로 관측 한 번의 비용은 락 + 덧셈 수준입니다.
+값은 워커(프로세스)별로 집계됩니다.
+
+주요 기능
+---------
+1. **Counter / Gauge / Histogram**
+   라벨별 값을 누적합니다.
+   - ``STAGE_SECONDS.time(stage="ocr")``  with 블록 소요 시간 기록 (async 코드에서도 사용)
+   - ``IN_FLIGHT.track(endpoint=...)``    with 블록 동안 +1
+2. **register_callback(name, help, type, fn)**
+   스크레이프 시점에 fn() 을 불러 값을 채웁니다(캐시 hit 비율, OCR 대기열 등 기존 stats 재사용).
+3. **record_usage(usage, model)**
+   OpenAI 응답의 usage 를 현재 엔드포인트·모델별 토큰 카운터에 더합니다.
+   현재 엔드포인트는 MetricsMiddleware 가 contextvar 로 넘겨줍니다.
+4. **MetricsMiddleware / render()**
+   요청별 지연·진행 중 요청 수를 기록하는 ASGI 미들웨어와 텍스트 출력
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional
+
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 지연(초) 버킷: 캐시 hit(ms) ~ LLM/OCR(수십 초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# 현재 요청의 엔드포인트(라우트 경로). 백그라운드 작업 등 요청 밖이면 "background"
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="background")
+
+_registry: list = []
+
+# ---------------------------------------------------------------------------
+# Helper: 라벨 / 출력 형식
+# ---------------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+    return f"{{{inner}}}" if inner else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+# ---------------------------------------------------------------------------
+# Public: 메트릭 타입
+# ---------------------------------------------------------------------------
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(value)}"
+            for key, value in items
+        ]
+
+    def render(self) -> list[str]:
+        return self._header() + self.samples()
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    @contextmanager
+    def track(self, **labels: str):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = [(key, ([*state[0]], state[1], state[2])) for key, state in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_labels(labels + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class _Callback(_Metric):
+    """스크레이프 때 fn() → [(라벨 dict, 값)] 으로 채우는 메트릭."""
+
+    def __init__(self, name: str, help: str, type: str, fn: Callable[[], Iterable[tuple[dict, float]]]):
+        super().__init__(name, help)
+        self.type, self._fn = type, fn
+
+    def samples(self) -> list[str]:
+        try:
+            values = list(self._fn())
+        except Exception as e:
+            print(f"⚠️ 메트릭 수집 실패 ({self.name}): {e}")
+            return []
+        return [
+            f"{self.name}{_format_labels(sorted(labels.items()))} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+def register_callback(
+    name: str, help: str, type: str, fn: Callable[[], Iterable[tuple[dict, float]]]
+) -> None:
+    _Callback(name, help, type, fn)
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# ---------------------------------------------------------------------------
+# 공통 메트릭 정의
+# ---------------------------------------------------------------------------
+
+REQUEST_SECONDS = Histogram(
+    "devcoach_request_seconds", "HTTP 요청 처리 시간 (스트리밍 본문 전송 포함)",
+    ("endpoint", "method", "status"),
+)
+IN_FLIGHT = Gauge(
+    "devcoach_requests_in_flight", "처리 중인 HTTP 요청 수", ("endpoint",),
+)
+STAGE_SECONDS = Histogram(
+    "devcoach_stage_seconds", "단계별 처리 시간 (crawl/image/ocr/extraction/feedback 등)",
+    ("stage",),
+)
+FEEDBACK_TTFT_SECONDS = Histogram(
+    "devcoach_feedback_ttft_seconds", "피드백 첫 토큰까지 시간", ("engine",),
+)
+JOB_PIPELINES_IN_FLIGHT = Gauge(
+    "devcoach_job_pipelines_in_flight", "실행 중인 /jobdescription 파이프라인 수 (single-flight leader 기준)",
+)
+FEEDBACK_IN_FLIGHT = Gauge(
+    "devcoach_feedback_in_flight", "생성 중인 피드백 수", ("engine",),
+)
+OPENAI_TOKENS = Counter(
+    "devcoach_openai_tokens_total", "OpenAI 사용 토큰 수", ("endpoint", "model", "kind"),
+)
+
+
+def record_usage(usage: Optional[Any], model: str) -> None:
+    """OpenAI usage 객체(prompt_tokens/completion_tokens) → 토큰 카운터."""
+    if usage is None:
+        return
+    endpoint = current_endpoint.get()
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, kind, None)
+        if tokens:
+            OPENAI_TOKENS.inc(tokens, endpoint=endpoint, model=model, kind=kind.split("_")[0])
+
+# ---------------------------------------------------------------------------
+# Public: ASGI 미들웨어
+# ---------------------------------------------------------------------------
+
+def _route_path(scope: dict) -> str:
+    """요청 경로 → 라우트 경로 템플릿 (라벨 수가 늘지 않도록 /jobs/{id} 형태)."""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "other")
+    return "other"
+
+
+class MetricsMiddleware:
+    """요청별 지연 히스토그램 + 진행 중 요청 게이지 + 엔드포인트 contextvar."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = _route_path(scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = current_endpoint.set(endpoint)
+        started = time.perf_counter()
+        try:
+            with IN_FLIGHT.track(endpoint=endpoint):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                endpoint=endpoint, method=scope["method"], status=str(status["code"]),
+            )
+            current_endpoint.reset(token)
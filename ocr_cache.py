@@ -0,0 +1,96 @@
+"""
+ocr_cache.py
+~~~~~~~~~~~~
+OCR 결과를 이미지 내용 해시 + OCR 설정 기준으로 캐싱하는 모듈입니다.
+
+회사들이 같은 배너(인재상·복리후생 등) 이미지를 여러 공고에 재사용하므로
+공고(rec_idx)와 상관없이 같은 이미지면 Tesseract 를 다시 돌리지 않습니다.
+
+주요 기능
+---------
+1. **ocr_cache_key(image_hash, settings)**
+   이미지 내용 해시(artifact_store.content_hash) + OCR 설정(lang, oem, psm, 분할 여부)
+   해시만 있으면 되므로 이미지 다운로드를 생략한 경우에도 조회할 수 있습니다.
+2. **OCRCache.get(image_hash) / set(image_hash, text)**
+   diskcache 에 저장 (워커·재시작 간 유지, size_limit 초과 시 LRU 삭제)
+3. **OCRCache.stats()**
+   이 워커의 hit/miss 와, diskcache 에 누적된 전체 워커 hit/miss
+"""
+
+import os
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+import diskcache
+
+from image_ocr import ocr_settings_key
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+OCR_CACHE_DIR        = os.getenv("OCR_CACHE_DIR", str(PROJECT_ROOT / ".cache" / "ocr"))
+OCR_CACHE_SIZE_LIMIT = int(os.getenv("OCR_CACHE_SIZE_LIMIT", str(256 * 1024 * 1024)))
+OCR_CACHE_EXPIRE     = float(os.getenv("OCR_CACHE_EXPIRE", str(30 * 24 * 3600)))  # 30일
+
+# ---------------------------------------------------------------------------
+# Helper: 캐시 키
+# ---------------------------------------------------------------------------
+
+def ocr_cache_key(image_hash: str, settings: Optional[str] = None) -> str:
+    """이미지 내용 해시와 OCR 설정으로 캐시 키를 만듭니다."""
+    settings = settings if settings is not None else ocr_settings_key()
+    return f"ocr:{image_hash}:{settings}"
+
+# ---------------------------------------------------------------------------
+# Public: OCRCache
+# ---------------------------------------------------------------------------
+
+class OCRCache:
+    """이미지 해시 기반 OCR 결과 캐시 (diskcache, hit/miss 집계)."""
+
+    def __init__(
+        self,
+        cache_dir: str = OCR_CACHE_DIR,
+        size_limit: int = OCR_CACHE_SIZE_LIMIT,
+        expire: float = OCR_CACHE_EXPIRE,
+    ):
+        self.expire = expire
+        self._disk = diskcache.Cache(
+            cache_dir, size_limit=size_limit, eviction_policy="least-recently-used"
+        )
+        self._disk.stats(enable=True)           # 워커 공통 hit/miss 누적
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, image_hash: str, settings: Optional[str] = None) -> Optional[str]:
+        text = await asyncio.to_thread(self._disk.get, ocr_cache_key(image_hash, settings))
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    async def set(self, image_hash: str, text: str, settings: Optional[str] = None) -> None:
+        await asyncio.to_thread(
+            self._disk.set, ocr_cache_key(image_hash, settings), text, expire=self.expire
+        )
+
+    def stats(self) -> dict:
+        total_hits, total_misses = self._disk.stats()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "total_hits": total_hits,            # 전체 워커 누적
+            "total_misses": total_misses,
+            "entries": len(self._disk),
+            "size_bytes": self._disk.volume(),
+        }
+
+
+# 프로세스 전역 OCR 캐시
+ocr_cache = OCRCache()
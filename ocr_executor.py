@@ -0,0 +1,283 @@
+"""
+ocr_executor.py
+~~~~~~~~~~~~~~~
+Tesseract OCR 을 별도 프로세스 풀에서 실행하는 모듈입니다.
+
+주요 기능
+---------
+1. **OCRExecutor.ocr(image_bytes)**
+   이미지 bytes 를 프로세스 풀에 넘겨 OCR 하고 텍스트를 반환합니다.
+   - 워커 수: OCR_WORKERS (기본: CPU 코어 수)
+   - 대기열: 실행 중 + 대기 슬롯이 ``workers + OCR_MAX_QUEUE`` 를 넘으면
+     ``OCRQueueFull`` 로 즉시 거절 (backpressure)
+     이미지 1개가 슬롯 1개, 분할하면 띠 수만큼 차지합니다 (자리가 없으면 분할 없이 OCR)
+   - 작업별 타임아웃: OCR_TIMEOUT 초 (시작 전이면 취소, 이미 실행 중이면 결과만 버림)
+     이미 실행 중이던 작업은 워커 프로세스가 실제로 끝날 때까지 슬롯 1개를 계속 차지합니다.
+   - tiled=True 면 세로로 긴 포스터를 띠로 나눠 워커들에 동시에 배분한 뒤
+     이어 붙입니다 (image_ocr.split_image_strips / stitch_strip_texts)
+   - ocr_batch(images) 는 한 공고의 여러 이미지를 한 묶음으로 동시에 처리
+     (이미지 수만큼 슬롯을 한 번에 잡음)
+   - OCR 예외는 워커에서 그대로 올라와 failed 지표로 집계된 뒤 None 으로 바뀝니다
+2. **OCRExecutor.stats()**
+   대기열 깊이, 실행 중 작업 수, 처리/거절/타임아웃 건수, 대기·처리 시간 통계
+3. **OCRExecutor.shutdown()**
+   앱 종료 시 프로세스 풀 정리 (FastAPI lifespan 에서 호출)
+
+이벤트 루프는 OCR 이 끝나기를 await 만 하므로 HTTP 처리가 멈추지 않습니다.
+"""
+
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from image_ocr import recognize_image_bytes, split_image_strips, stitch_strip_texts, OCR_TILED
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+OCR_WORKERS   = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+OCR_MAX_QUEUE = int(os.getenv("OCR_MAX_QUEUE", str(OCR_WORKERS * 2)))   # 실행 대기 가능 작업 수
+OCR_TIMEOUT   = float(os.getenv("OCR_TIMEOUT", "60"))                   # 작업별 타임아웃(초)
+
+
+class OCRQueueFull(RuntimeError):
+    """OCR 대기열이 가득 차서 작업을 받을 수 없을 때 발생합니다."""
+
+# ---------------------------------------------------------------------------
+# Helper: 워커 프로세스에서 실행되는 함수 (pickle 가능해야 하므로 모듈 최상위)
+# ---------------------------------------------------------------------------
+
+def _init_worker() -> None:
+    # 여러 tesseract 가 동시에 돌 때 OpenMP 스레드가 코어를 서로 뺏지 않도록
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> tuple[Any, float]:
+    """
+    fn(*args) 결과와 워커 안에서 걸린 시간(초)을 함께 반환합니다.
+    예외는 RuntimeError 로 바꿔 올림 (TesseractNotFoundError 등 pickle 할 수 없는 예외는 풀을 깨뜨림)
+    """
+    started = time.perf_counter()
+    try:
+        result = fn(*args)
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    return result, time.perf_counter() - started
+
+# ---------------------------------------------------------------------------
+# Public: OCRExecutor
+# ---------------------------------------------------------------------------
+
+class OCRExecutor:
+    """크기 제한 대기열 + 타임아웃 + 지표를 갖춘 OCR 프로세스 풀."""
+
+    def __init__(
+        self,
+        workers: int = OCR_WORKERS,
+        max_queue: int = OCR_MAX_QUEUE,
+        timeout: float = OCR_TIMEOUT,
+    ):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # 지표
+        self._slots = 0                      # 대기열에 잡힌 슬롯 (이미지·띠 단위)
+        self._inflight = 0                   # 프로세스 풀에 넘긴 작업
+        self._abandoned = 0                  # 타임아웃 났지만 워커에서 아직 실행 중인 작업
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._service_total = 0.0
+        self._service_max = 0.0
+        self._wait_total = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # 처음 쓸 때 생성 (CLI·import 시 프로세스를 띄우지 않도록)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._pool
+
+    def _acquire(self, n: int = 1) -> None:
+        """
+        대기열 슬롯 n 개를 잡습니다 (이미지 1개 = 1, 분할하면 띠 수만큼).
+        실행 중 + 대기 슬롯이 workers + max_queue 를 넘으면 OCRQueueFull.
+        """
+        capacity = self.workers + self.max_queue
+        if self._slots + n > capacity:
+            self._rejected += 1
+            raise OCRQueueFull(f"OCR 대기열 초과 (실행+대기 {self._slots}+{n}/{capacity})")
+        self._slots += n
+
+    def _release(self, n: int = 1) -> None:
+        self._slots -= n
+
+    def _hold_until_done(self, future: Future) -> None:
+        """
+        타임아웃 후에도 워커에서 실행 중인 작업이 끝날 때까지 슬롯 1개를 잡아 둡니다.
+        (호출자는 바로 슬롯을 반납하므로, 그 대신 process future 완료 시 반납)
+        """
+        loop = asyncio.get_running_loop()
+        self._slots += 1
+        self._abandoned += 1
+
+        def release() -> None:
+            self._abandoned -= 1
+            self._release()
+
+        def done(_: Future) -> None:
+            # 프로세스 풀의 관리 스레드에서 호출되므로 이벤트 루프로 넘김
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                pass                         # 루프가 이미 닫힘 (종료 중)
+
+        future.add_done_callback(done)
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """fn(*args) 를 프로세스 풀에서 실행합니다 (슬롯은 호출자가 잡고 있어야 함)."""
+        self._inflight += 1
+        submitted = time.perf_counter()
+        future = self._get_pool().submit(_timed_call, fn, *args)
+        try:
+            result, service_time = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            if not future.cancel():          # 아직 시작 전이면 취소됨
+                self._hold_until_done(future)
+            raise
+        except BrokenProcessPool:
+            # 워커가 비정상 종료(OOM 등) → 다음 요청 때 풀을 새로 만듦
+            self._pool = None
+            self._failed += 1
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._inflight -= 1
+
+        self._completed += 1
+        self._service_total += service_time
+        self._service_max = max(self._service_max, service_time)
+        self._wait_total += max(0.0, time.perf_counter() - submitted - service_time)
+        return result
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """fn(*args) 를 슬롯 1개로 프로세스 풀에서 실행합니다. 대기열이 가득 차면 OCRQueueFull."""
+        self._acquire()
+        try:
+            return await self._submit(fn, *args)
+        finally:
+            self._release()
+
+    async def _ocr_admitted(self, image: bytes, tiled: bool) -> str | None:
+        """슬롯 1개를 이미 잡은 이미지 → OCR 텍스트. 실패하면 예외(실패 건수는 _submit 에서 집계)."""
+        if not tiled:
+            return await self._submit(recognize_image_bytes, image)
+
+        # 분할 여부 판단·자르기도 워커에서 (디코딩이 CPU 작업이므로)
+        try:
+            strips, overlaps = await self._submit(split_image_strips, image)
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            # 분할만 실패한 경우(손상된 헤더·저장 불가 모드 등) → 전체 이미지로 한 번에 OCR
+            print(f"⚠️ 이미지 분할 실패, 전체 이미지로 OCR: {e}")
+            strips, overlaps = [], []
+        if not strips:
+            return await self._submit(recognize_image_bytes, image)
+
+        # 띠 수만큼 대기열을 차지 (이미지 슬롯 1개 + 나머지 띠). 자리가 없으면 분할하지 않음
+        extra = len(strips) - 1
+        try:
+            self._acquire(extra)
+        except OCRQueueFull:
+            print(f"⚠️ OCR 대기열 부족, 분할 없이 OCR ({len(strips)}띠)")
+            return await self._submit(recognize_image_bytes, image)
+        try:
+            results = await asyncio.gather(
+                *(self._submit(recognize_image_bytes, strip) for strip in strips),
+                return_exceptions=True,
+            )
+        finally:
+            self._release(extra)
+
+        texts = [None if isinstance(r, BaseException) else r for r in results]
+        if all(t is None for t in texts):
+            raise next(r for r in results if isinstance(r, BaseException))
+        return stitch_strip_texts([t or "" for t in texts], overlaps)
+
+    async def ocr(self, image: bytes, tiled: bool = OCR_TILED) -> str | None:
+        """이미지 bytes → OCR 텍스트. 대기열이 가득 차면 OCRQueueFull, OCR 실패 시 None."""
+        self._acquire()
+        try:
+            return await self._ocr_admitted(image, tiled)
+        except Exception as e:
+            print(f"⚠️ OCR 실패: {e!r}")
+            return None
+        finally:
+            self._release()
+
+    async def ocr_batch(self, images: list[bytes], tiled: bool = OCR_TILED) -> list[str | None]:
+        """
+        여러 이미지를 한 묶음으로 받아 동시에 OCR 합니다(입력 순서대로 결과 반환).
+        이미지 수만큼 슬롯을 한 번에 잡고(모자라면 묶음 전체를 OCRQueueFull 로 거절),
+        개별 실패·타임아웃은 None 으로 처리.
+        """
+        if not images:
+            return []
+        self._acquire(len(images))
+        try:
+            results = await asyncio.gather(
+                *(self._ocr_admitted(image, tiled) for image in images),
+                return_exceptions=True,
+            )
+        finally:
+            self._release(len(images))
+        texts = []
+        for result in results:
+            if isinstance(result, BaseException):
+                print(f"⚠️ OCR 실패: {result!r}")
+                result = None
+            texts.append(result)
+        return texts
+
+    def stats(self) -> dict:
+        done = self._completed or 1
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._inflight,
+            "abandoned": self._abandoned,
+            "slots": self._slots,
+            "queue_depth": max(0, self._inflight + self._abandoned - self.workers),
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "timeouts": self._timeouts,
+            "service_time_avg": self._service_total / done,
+            "service_time_max": self._service_max,
+            "wait_time_avg": self._wait_total / done,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# 프로세스 전역 OCR 실행기
+ocr_executor = OCRExecutor()
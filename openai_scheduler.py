@@ -0,0 +1,211 @@
+"""
+openai_scheduler.py
+~~~~~~~~~~~~~~~~~~~
+모든 OpenAI 호출이 거쳐 가는 rate limit 인식 비동기 스케줄러 모듈입니다.
+
+RPM/TPM 한도에 부딪혀 429 로 튕겨 나오는 대신, 한도 안쪽 속도로 줄을 세워 보냅니다.
+
+주요 기능
+---------
+1. **토큰 버킷 2개 (요청 수 / 토큰 수)**
+   계정 한도 OPENAI_RPM, OPENAI_TPM 을 워커 프로세스 수(WEB_CONCURRENCY)로 나눈 값을
+   분당 보충 속도로 사용합니다. 버킷은 프로세스마다 따로 있으므로 한도는 프로세스 단위이며,
+   N 개 워커가 모두 꽉 차게 보내도 합계가 계정 한도를 넘지 않습니다.
+   토큰 수는 tiktoken 으로 센 입력 토큰 + 예상 출력 토큰(estimate_tokens)으로 미리 차감합니다.
+2. **bounded 대기열**
+   버킷을 기다리는 호출이 OPENAI_MAX_QUEUE 개를 넘으면 ``OpenAIQueueFull`` 로 즉시 거절
+   (FIFO: 먼저 온 호출부터 보냄)
+3. **재시도 (tenacity)**
+   429·5xx·연결 오류는 지수 백오프(jitter)로 재시도하되, 응답에 ``Retry-After`` 가 있으면
+   그 시간만큼 기다리고 버킷도 같이 멈춰 다른 호출이 곧바로 또 부딪히지 않게 합니다.
+4. **OpenAIScheduler.stats()**
+   대기 중 호출 수, 처리/거절/재시도 건수
+"""
+
+import os
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from openai import (
+    APIConnectionError, APIStatusError, APITimeoutError, InternalServerError, RateLimitError,
+)
+from tenacity import (
+    AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential,
+)
+
+from text_normalize import count_tokens
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+OPENAI_RPM          = int(os.getenv("OPENAI_RPM", "500"))          # 계정 전체 분당 요청 수
+OPENAI_TPM          = int(os.getenv("OPENAI_TPM", "200000"))       # 계정 전체 분당 토큰 수
+WEB_CONCURRENCY     = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))  # gunicorn 워커 수 (한도를 나눠 가짐)
+OPENAI_MAX_QUEUE    = int(os.getenv("OPENAI_MAX_QUEUE", "200"))    # 버킷 대기 최대 호출 수
+OPENAI_MAX_ATTEMPTS = int(os.getenv("OPENAI_MAX_ATTEMPTS", "5"))   # 재시도 포함 최대 시도 수
+OPENAI_MAX_BACKOFF  = float(os.getenv("OPENAI_MAX_BACKOFF", "30")) # 한 번 기다리는 최대 시간(초)
+
+RETRYABLE = (RateLimitError, InternalServerError, APIConnectionError, APITimeoutError)
+
+
+class OpenAIQueueFull(RuntimeError):
+    """OpenAI 호출 대기열이 가득 차서 호출을 받을 수 없을 때 발생합니다."""
+
+# ---------------------------------------------------------------------------
+# Helper: 토큰 추정 / Retry-After
+# ---------------------------------------------------------------------------
+
+def estimate_tokens(*texts: Optional[str], model: str = "gpt-4o-mini", completion: int = 0) -> int:
+    """입력 텍스트 토큰 합 + 예상 출력 토큰 (TPM 버킷 차감량)."""
+    return sum(count_tokens(text, model) for text in texts if text) + completion
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """응답 헤더의 retry-after-ms / retry-after(초) → 초. 없으면 None."""
+    if not isinstance(exc, APIStatusError):
+        return None
+    headers = exc.response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass                            # HTTP-date 형식 등은 백오프로 대신함
+    return None
+
+# ---------------------------------------------------------------------------
+# Helper: 토큰 버킷
+# ---------------------------------------------------------------------------
+
+class _TokenBucket:
+    """분당 per_minute 만큼 보충되는 버킷 (최대 1분치 저장)."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount 를 꺼낼 수 있을 때까지 남은 시간(초)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)     # 한 번에 1분치보다 큰 요청도 언젠가는 통과
+        pause = max(0.0, self.paused_until - now)
+        return max(pause, (amount - self.tokens) / self.rate if self.tokens < amount else 0.0)
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+# ---------------------------------------------------------------------------
+# Public: OpenAIScheduler
+# ---------------------------------------------------------------------------
+
+class OpenAIScheduler:
+    """요청/토큰 버킷 + bounded FIFO 대기열 + Retry-After 인식 재시도."""
+
+    def __init__(
+        self,
+        rpm: int = OPENAI_RPM // WEB_CONCURRENCY,     # 이 프로세스 몫
+        tpm: int = OPENAI_TPM // WEB_CONCURRENCY,
+        max_queue: int = OPENAI_MAX_QUEUE,
+        max_attempts: int = OPENAI_MAX_ATTEMPTS,
+    ):
+        self._requests = _TokenBucket(rpm)
+        self._tokens = _TokenBucket(tpm)
+        self.max_queue = max_queue
+        self.max_attempts = max(1, max_attempts)
+        self._lock = asyncio.Lock()             # 대기 순서 보장 (FIFO)
+
+        # 지표
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._retries = 0
+        self._wait_total = 0.0
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """요청 1개 + tokens 를 버킷에서 꺼낼 때까지 기다립니다. 대기열이 가득 차면 OpenAIQueueFull."""
+        if self._waiting >= self.max_queue:
+            self._rejected += 1
+            raise OpenAIQueueFull(f"OpenAI 대기열 초과 ({self._waiting}/{self.max_queue})")
+
+        self._waiting += 1
+        started = time.monotonic()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    wait = max(self._requests.wait_time(1, now), self._tokens.wait_time(tokens, now))
+                    if wait <= 0:
+                        self._requests.take(1)
+                        self._tokens.take(tokens)
+                        break
+                    await asyncio.sleep(wait)
+        finally:
+            self._waiting -= 1
+            self._wait_total += time.monotonic() - started
+
+    def _wait(self, retry_state) -> float:
+        exc = retry_state.outcome.exception()
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            delay = min(retry_after, OPENAI_MAX_BACKOFF)
+        else:
+            delay = wait_random_exponential(multiplier=0.5, max=OPENAI_MAX_BACKOFF)(retry_state)
+        if isinstance(exc, RateLimitError):
+            # 한도에 닿았으므로 다른 호출도 같이 쉬게 함
+            self._requests.pause(delay)
+            self._tokens.pause(delay)
+        self._retries += 1
+        print(f"[⏳] OpenAI {type(exc).__name__} → {delay:.1f}s 후 재시도")
+        return delay
+
+    async def run(self, fn: Callable[[], Awaitable[Any]], tokens: int = 0) -> Any:
+        """
+        버킷을 통과한 뒤 fn() 을 실행합니다. 재시도할 때마다 버킷을 다시 통과합니다.
+        fn 은 매번 새 요청을 만드는 함수여야 합니다(lambda: client.xxx.create(...)).
+        """
+        try:
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception_type(RETRYABLE),
+                wait=self._wait,
+                stop=stop_after_attempt(self.max_attempts),
+                reraise=True,
+            ):
+                with attempt:
+                    await self.acquire(tokens)
+                    result = await fn()
+        except OpenAIQueueFull:
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        self._completed += 1
+        return result
+
+    def stats(self) -> dict:
+        done = self._completed + self._failed
+        return {
+            "queued": self._waiting,
+            "max_queue": self.max_queue,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "retries": self._retries,
+            "wait_time_avg": self._wait_total / done if done else 0.0,
+        }
+
+
+# 프로세스 전역 OpenAI 스케줄러
+openai_scheduler = OpenAIScheduler()
@@ -0,0 +1,241 @@
+"""
+response_cache.py
+~~~~~~~~~~~~~~~~~
+자기소개서 피드백 응답을 재사용하는 캐시 모듈입니다.
+
+같은 공고·같은 문항에 거의 같은 답변(지원동기·성장과정 등)이 자주 들어오므로
+피드백 호출 앞에서 두 단계로 찾아봅니다.
+
+주요 기능
+---------
+1. **정확 일치**
+   (scope, 정규화한 답변) 해시 → diskcache 에서 바로 조회
+   scope = 엔진·모델·프롬프트 + 직무 정보 + 질문 (답변을 뺀 나머지 전부)
+2. **유사 답변 (semantic)**
+   답변 임베딩을 memmap 행렬(RESPONSE_CACHE_CAPACITY × 차원, float32)에 보관하고,
+   같은 scope 행만 골라 NumPy 행렬곱 한 번으로 코사인 유사도를 계산합니다.
+   RESPONSE_CACHE_SIMILARITY 이상이면 그 행의 피드백을 반환합니다.
+   - 벡터는 저장 시 정규화하므로 코사인 = 내적
+   - 행렬이 가득 차면 가장 오래 안 쓴 행(last_used 최소)부터 덮어씀
+   - 파일을 공유하므로 gunicorn 워커·재시작 간에도 유지 (행 할당은 diskcache Lock)
+3. **ResponseCache.stats()**
+   정확/유사 hit, miss 건수
+"""
+
+import os
+import time
+import asyncio
+import unicodedata
+from pathlib import Path
+from typing import Optional
+
+import diskcache
+import numpy as np
+from openai import AsyncOpenAI
+from openai import OpenAIError
+
+from artifact_store import content_hash
+from metrics import record_usage
+from openai_scheduler import openai_scheduler, estimate_tokens, OpenAIQueueFull
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+RESPONSE_CACHE_DIR        = os.getenv("RESPONSE_CACHE_DIR", str(PROJECT_ROOT / ".cache" / "response"))
+RESPONSE_CACHE_TTL        = float(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))   # 7일
+RESPONSE_CACHE_CAPACITY   = int(os.getenv("RESPONSE_CACHE_CAPACITY", "10000"))          # 임베딩 행 수
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95"))       # 코사인 임계값
+RESPONSE_CACHE_MIN_CHARS  = int(os.getenv("RESPONSE_CACHE_MIN_CHARS", "80"))            # 너무 짧은 답변은 유사 검색 제외
+EMBEDDING_MODEL           = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIM             = int(os.getenv("EMBEDDING_DIM", "1536"))
+
+# 행별 메타데이터 (scope 해시 앞 8바이트, 저장 시각, 마지막 사용 시각; created=0 이면 빈 행)
+ROW_DTYPE = np.dtype([("scope", "<i8"), ("created", "<f8"), ("last_used", "<f8")])
+
+# ---------------------------------------------------------------------------
+# Helper: 정규화 / 키
+# ---------------------------------------------------------------------------
+
+def normalize_text(text: str) -> str:
+    """NFKC + 연속 공백 축약 (답변 의미에 영향 없는 차이만 제거)."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def _scope_id(scope: str) -> int:
+    return int.from_bytes(bytes.fromhex(content_hash(scope)[:16]), "big", signed=True)
+
+# ---------------------------------------------------------------------------
+# Helper: 공유 memmap 임베딩 인덱스
+# ---------------------------------------------------------------------------
+
+class _EmbeddingIndex:
+    """capacity × dim float32 memmap + 행 메타데이터 memmap (동기 함수, to_thread 로 호출)."""
+
+    def __init__(self, root: Path, capacity: int, dim: int):
+        root.mkdir(parents=True, exist_ok=True)
+        self.capacity, self.dim = capacity, dim
+        self.vectors = self._open(root / f"vectors-{capacity}x{dim}.f32", np.float32, (capacity, dim))
+        self.rows = self._open(root / f"rows-{capacity}.bin", ROW_DTYPE, (capacity,))
+
+    @staticmethod
+    def _open(path: Path, dtype, shape) -> np.memmap:
+        mode = "r+" if path.exists() else "w+"      # w+ 는 0 으로 채운 새 파일
+        return np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+
+    def search(self, scope_id: int, vector: np.ndarray, threshold: float, min_created: float):
+        """같은 scope 의 유효한 행 중 가장 비슷한 행 → (row, 유사도, created) 또는 None."""
+        rows = self.rows
+        candidates = np.flatnonzero((rows["scope"] == scope_id) & (rows["created"] > min_created))
+        if candidates.size == 0:
+            return None
+        scores = self.vectors[candidates] @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        row = int(candidates[best])
+        return row, float(scores[best]), float(rows["created"][row])
+
+    def allocate(self, now: float, min_created: float) -> int:
+        """빈 행(또는 만료된 행) → 없으면 가장 오래 안 쓴 행."""
+        rows = self.rows
+        free = np.flatnonzero(rows["created"] <= min_created)
+        return int(free[0]) if free.size else int(np.argmin(rows["last_used"]))
+
+    def write(self, row: int, scope_id: int, vector: np.ndarray, now: float) -> None:
+        self.vectors[row] = vector
+        self.rows[row] = (scope_id, now, now)
+
+    def touch(self, row: int, now: float) -> None:
+        self.rows["last_used"][row] = now
+
+# ---------------------------------------------------------------------------
+# Public: ResponseCache
+# ---------------------------------------------------------------------------
+
+class ResponseCache:
+    """정확 일치(diskcache) + 유사 답변(memmap 코사인 검색) 피드백 캐시."""
+
+    def __init__(
+        self,
+        cache_dir: str = RESPONSE_CACHE_DIR,
+        ttl: float = RESPONSE_CACHE_TTL,
+        capacity: int = RESPONSE_CACHE_CAPACITY,
+        threshold: float = RESPONSE_CACHE_SIMILARITY,
+        min_chars: int = RESPONSE_CACHE_MIN_CHARS,
+        embedding_model: str = EMBEDDING_MODEL,
+        dim: int = EMBEDDING_DIM,
+    ):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self.embedding_model = embedding_model
+        self._root = Path(cache_dir)
+        self._disk = diskcache.Cache(str(self._root / "replies"))
+        self._capacity, self._dim = capacity, dim
+        self._index: Optional[_EmbeddingIndex] = None
+        self._openai: Optional[AsyncOpenAI] = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _get_index(self) -> _EmbeddingIndex:
+        # 처음 쓸 때 memmap 을 엶 (import 시 큰 파일을 만들지 않도록)
+        if self._index is None:
+            self._index = _EmbeddingIndex(self._root / "index", self._capacity, self._dim)
+        return self._index
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """답변 임베딩(정규화된 float32). 실패하거나 OpenAI 대기열이 가득 차면 None → 유사 검색 생략."""
+        if self._openai is None:
+            self._openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        try:
+            response = await openai_scheduler.run(
+                lambda: self._openai.embeddings.create(model=self.embedding_model, input=text),
+                tokens=estimate_tokens(text),
+            )
+        except (OpenAIError, OpenAIQueueFull) as exc:
+            print(f"⚠️ 임베딩 실패 (유사 캐시 생략): {exc}")
+            return None
+        record_usage(response.usage, self.embedding_model)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if vector.shape != (self._dim,) or norm == 0.0:
+            return None
+        return vector / norm
+
+    # ------------------------------ 동기 구현 -----------------------------
+
+    def _semantic_get(self, scope_id: int, vector: np.ndarray) -> Optional[tuple[str, float]]:
+        now = time.time()
+        index = self._get_index()
+        found = index.search(scope_id, vector, self.threshold, now - self.ttl)
+        if found is None:
+            return None
+        row, score, created = found
+        entry = self._disk.get(f"row:{row}")
+        # 다른 워커가 방금 행을 덮어썼으면 created 가 달라짐 → 무시
+        if entry is None or entry[0] != created:
+            return None
+        index.touch(row, now)
+        return entry[1], score
+
+    def _semantic_set(self, scope_id: int, vector: np.ndarray, reply: str) -> None:
+        now = time.time()
+        index = self._get_index()
+        with diskcache.Lock(self._disk, "row-alloc"):
+            row = index.allocate(now, now - self.ttl)
+            index.write(row, scope_id, vector, now)
+            self._disk.set(f"row:{row}", (now, reply))
+
+    # ------------------------------ 공개 API -----------------------------
+
+    async def lookup(self, scope: str, answer: str) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        캐시된 피드백을 찾습니다. → (피드백 또는 None, 계산한 임베딩)
+        임베딩은 miss 후 store() 에 그대로 넘기면 다시 계산하지 않습니다.
+        """
+        answer = normalize_text(answer)
+        exact_key = f"exact:{content_hash(scope, answer)}"
+        reply = await asyncio.to_thread(self._disk.get, exact_key)
+        if reply is not None:
+            self.exact_hits += 1
+            return reply, None
+
+        if len(answer) < self.min_chars:
+            self.misses += 1
+            return None, None
+
+        vector = await self._embed(answer)
+        if vector is not None:
+            found = await asyncio.to_thread(self._semantic_get, _scope_id(scope), vector)
+            if found is not None:
+                self.semantic_hits += 1
+                print(f"[♻] 유사 답변 피드백 재사용 (cos={found[1]:.3f})")
+                return found[0], vector
+
+        self.misses += 1
+        return None, vector
+
+    async def store(
+        self, scope: str, answer: str, reply: str, vector: Optional[np.ndarray] = None
+    ) -> None:
+        answer = normalize_text(answer)
+        exact_key = f"exact:{content_hash(scope, answer)}"
+        await asyncio.to_thread(self._disk.set, exact_key, reply, expire=self.ttl)
+        if vector is not None:
+            await asyncio.to_thread(self._semantic_set, _scope_id(scope), vector, reply)
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
+
+
+# 프로세스 전역 피드백 캐시
+response_cache = ResponseCache()
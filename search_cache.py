@@ -0,0 +1,159 @@
+"""
+search_cache.py
+~~~~~~~~~~~~~~~
+/search 결과(채용공고 dict 리스트)를 캐싱하는 모듈입니다.
+
+주요 기능
+---------
+1. **normalize_company(name)**
+   캐시 키용 회사명 정규화 (NFKC, 앞뒤 공백 제거, 연속 공백 축약)
+2. **SearchCache.get_or_load(key, loader)**
+   - TTL 이내(fresh)  → 캐시 값을 바로 반환
+   - TTL 경과, STALE_TTL 이내(stale) → 캐시 값을 반환하고 백그라운드에서 갱신
+   - 그 외(miss)       → loader 를 await 해서 저장 후 반환
+   같은 키에 대한 동시 로딩/갱신은 하나로 합쳐집니다.
+
+저장소는 2단 구조입니다.
+- 메모리: 워커별 LRU (OrderedDict, 최대 MAX_ENTRIES 개)
+- 디스크: diskcache (gunicorn 워커 간 공유, size_limit 초과 시 LRU 삭제)
+"""
+
+import os
+import time
+import asyncio
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+import diskcache
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+SEARCH_CACHE_TTL         = float(os.getenv("SEARCH_CACHE_TTL", "1800"))        # fresh 유지(초)
+SEARCH_CACHE_STALE_TTL   = float(os.getenv("SEARCH_CACHE_STALE_TTL", "21600")) # stale 허용(초)
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "512"))   # 메모리 LRU 크기
+SEARCH_CACHE_SIZE_LIMIT  = int(os.getenv("SEARCH_CACHE_SIZE_LIMIT", str(64 * 1024 * 1024)))
+# 빈 문자열이면 디스크 공유 없이 메모리만 사용
+SEARCH_CACHE_DIR         = os.getenv("SEARCH_CACHE_DIR", str(PROJECT_ROOT / ".cache" / "search"))
+
+# ---------------------------------------------------------------------------
+# Helper: 캐시 키 정규화
+# ---------------------------------------------------------------------------
+
+def normalize_company(name: str) -> str:
+    """검색어 → 캐시 키 (검색 결과에 영향이 없는 차이만 제거)."""
+    return " ".join(unicodedata.normalize("NFKC", name).split())
+
+# ---------------------------------------------------------------------------
+# Public: TTL + stale-while-revalidate 캐시
+# ---------------------------------------------------------------------------
+
+class SearchCache:
+    """메모리 LRU + 디스크(diskcache) 2단 TTL 캐시."""
+
+    def __init__(
+        self,
+        ttl: float = SEARCH_CACHE_TTL,
+        stale_ttl: float = SEARCH_CACHE_STALE_TTL,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        cache_dir: Optional[str] = SEARCH_CACHE_DIR,
+        size_limit: int = SEARCH_CACHE_SIZE_LIMIT,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._disk = (
+            diskcache.Cache(cache_dir, size_limit=size_limit, eviction_policy="least-recently-used")
+            if cache_dir else None
+        )
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    # ------------------------------ 저장소 -------------------------------
+
+    def _remember(self, key: str, entry: tuple[float, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _lookup(self, key: str) -> Optional[tuple[float, Any]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            if time.time() - entry[0] < self.ttl or self._disk is None:
+                return entry
+
+        # 메모리에 없거나 stale → 다른 워커가 갱신했을 수 있으니 디스크 확인
+        if self._disk is not None:
+            disk_entry = await asyncio.to_thread(self._disk.get, key)
+            if disk_entry is not None and (entry is None or disk_entry[0] > entry[0]):
+                entry = disk_entry
+                self._remember(key, entry)
+        return entry
+
+    async def _store(self, key: str, value: Any) -> None:
+        entry = (time.time(), value)
+        self._remember(key, entry)
+        if self._disk is not None:
+            await asyncio.to_thread(
+                self._disk.set, key, entry, expire=self.ttl + self.stale_ttl
+            )
+
+    # ------------------------------ 로딩 ---------------------------------
+
+    def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """같은 키의 로딩은 하나의 Task 로 합칩니다."""
+        task = self._inflight.get(key)
+        if task is None:
+            async def run():
+                value = await loader()
+                if value:                   # 빈 결과(요청 실패 포함)는 캐싱하지 않음
+                    await self._store(key, value)
+                return value
+
+            def done(task: asyncio.Task) -> None:
+                # stale-while-revalidate 갱신은 아무도 await 하지 않으므로 여기서 예외를 꺼내 기록
+                if not task.cancelled() and task.exception() is not None:
+                    print(f"[!] 검색 캐시 갱신 실패 ({key}): {task.exception()!r}")
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+            task = asyncio.create_task(run())
+            task.add_done_callback(done)
+            self._inflight[key] = task
+        return task
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """캐시 값을 반환하거나(필요 시 백그라운드 갱신), 없으면 loader 결과를 반환합니다."""
+        entry = await self._lookup(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._load(key, loader)     # stale-while-revalidate
+                return entry[1]
+
+        self.misses += 1
+        # shield: 요청이 취소돼도 다른 대기자를 위해 로딩은 계속
+        return await asyncio.shield(self._load(key, loader))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+        }
@@ -0,0 +1,221 @@
+"""
+session_store.py
+~~~~~~~~~~~~~~~~
+세션 키 → 값(OpenAI thread_id 등)을 저장하는 세션 저장소 모듈입니다.
+
+gunicorn 워커 간·재시작 후에도 같은 세션이 같은 Thread 로 이어지도록
+DB(기본 SQLite, SQLAlchemy) 를 원본으로 두고, 워커마다 메모리 hot tier 를 둡니다.
+
+주요 기능
+---------
+1. **SessionStore.get(key)**
+   메모리 LRU(OrderedDict, O(1)) → 없으면 DB 조회 후 메모리에 올림
+   메모리 값은 SESSION_HOT_TTL 초 동안만 그대로 쓰고, 그 뒤에는 DB 를 다시 확인
+   (다른 워커가 세션을 지우거나 바꾼 것을 반영)
+2. **SessionStore.set_if_absent(key, value)**
+   ``INSERT … ON CONFLICT DO NOTHING`` 후 실제 저장된 값을 반환
+   (두 워커가 동시에 만들면 먼저 들어간 값으로 통일)
+   SQLite·PostgreSQL 은 각 dialect 의 upsert, 그 외 DB 는 INSERT 후 IntegrityError 무시
+3. **TTL + 크기 제한**
+   - 마지막 사용 후 SESSION_TTL 초가 지난 세션은 만료 (조회 시 무시, 주기적으로 삭제)
+   - 행 수가 SESSION_MAX_ENTRIES 를 넘으면 오래 안 쓴 것부터 삭제
+   - 메모리 tier 는 SESSION_HOT_ENTRIES 개 LRU
+"""
+
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import (
+    Column, Float, MetaData, String, Table, create_engine, delete, event, insert, select, update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+SESSION_DB_URL        = os.getenv("SESSION_DB_URL", f"sqlite:///{PROJECT_ROOT / '.cache' / 'sessions.db'}")
+SESSION_TTL           = float(os.getenv("SESSION_TTL", str(7 * 24 * 3600)))     # 7일
+SESSION_MAX_ENTRIES   = int(os.getenv("SESSION_MAX_ENTRIES", "100000"))
+SESSION_HOT_ENTRIES   = int(os.getenv("SESSION_HOT_ENTRIES", "2048"))
+SESSION_HOT_TTL       = float(os.getenv("SESSION_HOT_TTL", "5"))                # 메모리 값을 DB 재확인 없이 쓰는 시간(초)
+SESSION_TOUCH_INTERVAL = 300       # 마지막 사용 시각은 이 간격(초)마다만 DB 에 반영
+SESSION_PURGE_EVERY    = 500       # 쓰기 N 번마다 만료·초과 행 정리
+
+metadata = MetaData()
+
+sessions = Table(
+    "sessions", metadata,
+    Column("session_key", String(64), primary_key=True),
+    Column("value", String(128), nullable=False),
+    Column("last_used", Float, nullable=False, index=True),
+)
+
+# ---------------------------------------------------------------------------
+# Public: SessionStore
+# ---------------------------------------------------------------------------
+
+class SessionStore:
+    """DB(SQLite 등) 원본 + 워커별 메모리 LRU 세션 저장소 (LRU + TTL)."""
+
+    def __init__(
+        self,
+        db_url: str = SESSION_DB_URL,
+        ttl: float = SESSION_TTL,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        hot_entries: int = SESSION_HOT_ENTRIES,
+        hot_ttl: float = SESSION_HOT_TTL,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hot_entries = hot_entries
+        self.hot_ttl = hot_ttl
+        # {key: (value, last_used, checked)}
+        # last_used 는 DB 에 마지막으로 반영한 시각, checked 는 DB 에서 값을 마지막으로 확인한 시각
+        self._hot: "OrderedDict[str, tuple[str, float, float]]" = OrderedDict()
+        self._writes = 0
+
+        if db_url.startswith("sqlite:///"):
+            Path(db_url[len("sqlite:///"):]).parent.mkdir(parents=True, exist_ok=True)
+            self._engine = create_engine(db_url, connect_args={"timeout": 30})
+            event.listen(self._engine, "connect", _sqlite_pragmas)
+        else:
+            self._engine = create_engine(db_url, pool_pre_ping=True)
+        metadata.create_all(self._engine)
+
+    # ------------------------------ 메모리 tier ---------------------------
+
+    def _remember(self, key: str, value: str, last_used: float, checked: float) -> None:
+        self._hot[key] = (value, last_used, checked)
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_entries:
+            self._hot.popitem(last=False)
+
+    # ------------------------------ DB (동기) -----------------------------
+
+    def _db_get(self, key: str, now: float) -> Optional[tuple[str, float]]:
+        with self._engine.begin() as conn:
+            row = conn.execute(
+                select(sessions.c.value, sessions.c.last_used).where(sessions.c.session_key == key)
+            ).first()
+            if row is None or now - row.last_used >= self.ttl:
+                return None
+            last_used = row.last_used
+            if now - last_used >= SESSION_TOUCH_INTERVAL:
+                conn.execute(
+                    update(sessions).where(sessions.c.session_key == key).values(last_used=now)
+                )
+                last_used = now
+        return row.value, last_used
+
+    def _db_touch(self, key: str, now: float) -> None:
+        with self._engine.begin() as conn:
+            conn.execute(
+                update(sessions).where(sessions.c.session_key == key).values(last_used=now)
+            )
+
+    def _db_set_if_absent(self, key: str, value: str, now: float) -> str:
+        with self._engine.begin() as conn:
+            # 만료된 행은 지우고 새로 넣음
+            conn.execute(
+                delete(sessions).where(
+                    sessions.c.session_key == key, sessions.c.last_used <= now - self.ttl
+                )
+            )
+            self._insert_if_absent(conn, {"session_key": key, "value": value, "last_used": now})
+            return conn.execute(
+                select(sessions.c.value).where(sessions.c.session_key == key)
+            ).scalar_one()
+
+    def _insert_if_absent(self, conn, values: dict) -> None:
+        """``INSERT … ON CONFLICT DO NOTHING`` (dialect 별로 선택)."""
+        dialect = self._engine.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            upsert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            conn.execute(
+                upsert(sessions).values(**values).on_conflict_do_nothing(index_elements=["session_key"])
+            )
+            return
+        # 그 외 DB: savepoint 안에서 INSERT, 이미 있으면(PK 충돌) 기존 값 유지
+        try:
+            with conn.begin_nested():
+                conn.execute(insert(sessions).values(**values))
+        except IntegrityError:
+            pass
+
+    def _db_delete(self, key: str) -> None:
+        with self._engine.begin() as conn:
+            conn.execute(delete(sessions).where(sessions.c.session_key == key))
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """만료된 행과 SESSION_MAX_ENTRIES 초과분(오래 안 쓴 순)을 삭제합니다."""
+        now = now if now is not None else time.time()
+        with self._engine.begin() as conn:
+            removed = conn.execute(
+                delete(sessions).where(sessions.c.last_used <= now - self.ttl)
+            ).rowcount
+            cutoff = conn.execute(
+                select(sessions.c.last_used)
+                .order_by(sessions.c.last_used.desc())
+                .offset(self.max_entries)
+                .limit(1)
+            ).scalar()
+            if cutoff is not None:
+                removed += conn.execute(
+                    delete(sessions).where(sessions.c.last_used <= cutoff)
+                ).rowcount
+        return removed
+
+    # ------------------------------ 공개 API -----------------------------
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._hot.get(key)
+        if entry is not None:
+            value, last_used, checked = entry
+            if now - checked < self.hot_ttl and now - last_used < self.ttl:
+                self._hot.move_to_end(key)
+                if now - last_used >= SESSION_TOUCH_INTERVAL:
+                    await asyncio.to_thread(self._db_touch, key, now)
+                    self._hot[key] = (value, now, checked)
+                return value
+            # hot TTL 경과 또는 만료 → 다른 워커가 지우거나 바꿨을 수 있으니 DB 확인
+            del self._hot[key]
+
+        entry = await asyncio.to_thread(self._db_get, key, now)
+        if entry is None:
+            return None
+        self._remember(key, *entry, now)
+        return entry[0]
+
+    async def set_if_absent(self, key: str, value: str) -> str:
+        """key 가 없을 때만 저장하고, 최종적으로 저장된 값을 반환합니다."""
+        now = time.time()
+        stored = await asyncio.to_thread(self._db_set_if_absent, key, value, now)
+        self._remember(key, stored, now, now)
+
+        self._writes += 1
+        if self._writes % SESSION_PURGE_EVERY == 0:
+            removed = await asyncio.to_thread(self.purge, now)
+            if removed:
+                print(f"[🧹] 만료·초과 세션 {removed}건 삭제")
+        return stored
+
+    async def delete(self, key: str) -> None:
+        self._hot.pop(key, None)
+        await asyncio.to_thread(self._db_delete, key)
+
+
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+    # 여러 워커가 동시에 읽고 쓰도록 WAL 모드
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
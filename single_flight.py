@@ -0,0 +1,129 @@
+"""
+single_flight.py
+~~~~~~~~~~~~~~~~
+같은 키로 동시에 들어온 작업을 한 번만 실행하는 single-flight 모듈입니다.
+
+주요 기능
+---------
+**SingleFlight.do(key, fn)**
+  - 워커 내부: 이미 실행 중인 같은 키의 Task 가 있으면 그 결과를 await (follower)
+  - 워커 간  : diskcache 의 원자적 ``add`` 로 잠금을 잡은 워커만 fn 을 실행하고(leader),
+               결과를 디스크에 잠시 넘겨줍니다(handoff). 다른 워커의 follower 는
+               결과가 올라올 때까지 폴링합니다.
+  - leader 가 죽어 잠금이 만료되면 follower 중 하나가 leader 를 이어받습니다.
+  - leader 의 예외는 클래스 이름과 메시지로 넘겨, ``reraise`` 에 등록된 예외(대기열 초과 등)와
+    TimeoutError 는 다른 워커의 follower 에서도 같은 타입으로 다시 발생시킵니다.
+    (엔드포인트가 같은 과부하를 워커와 관계없이 같은 상태 코드로 응답하도록)
+
+결과 캐싱이 아니라 "동시에 실행 중인 작업"만 합칩니다.
+끝난 뒤 새로 들어온 요청은 다시 실행됩니다.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+import diskcache
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+SINGLE_FLIGHT_LOCK_TTL      = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "300"))    # leader 잠금 만료(초)
+SINGLE_FLIGHT_HANDOFF_TTL   = float(os.getenv("SINGLE_FLIGHT_HANDOFF_TTL", "60"))  # 결과 보관(초)
+SINGLE_FLIGHT_POLL_INTERVAL = float(os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", "0.2"))
+# 빈 문자열이면 워커 간 합치기 없이 워커 내부에서만 동작
+SINGLE_FLIGHT_DIR           = os.getenv("SINGLE_FLIGHT_DIR", str(PROJECT_ROOT / ".cache" / "single_flight"))
+
+# ---------------------------------------------------------------------------
+# Public: SingleFlight
+# ---------------------------------------------------------------------------
+
+class SingleFlight:
+    """워커 내부(Task 공유) + 워커 간(diskcache 잠금·결과 handoff) 요청 합치기."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = SINGLE_FLIGHT_DIR,
+        lock_ttl: float = SINGLE_FLIGHT_LOCK_TTL,
+        handoff_ttl: float = SINGLE_FLIGHT_HANDOFF_TTL,
+        poll_interval: float = SINGLE_FLIGHT_POLL_INTERVAL,
+        reraise: tuple[type[Exception], ...] = (),
+    ):
+        self.lock_ttl = lock_ttl
+        self.handoff_ttl = handoff_ttl
+        self.poll_interval = poll_interval
+        self._disk = diskcache.Cache(cache_dir) if cache_dir else None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._owner = uuid.uuid4().hex           # 이 워커의 잠금 소유자 표시
+        # handoff 로 받은 예외 이름 → 같은 타입으로 다시 발생시킬 예외 클래스
+        self._reraise = {cls.__name__: cls for cls in (TimeoutError, *reraise)}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """key 로 진행 중인 작업이 있으면 그 결과를, 없으면 fn() 결과를 반환합니다."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, fn))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: 한 요청이 끊겨도 같은 작업을 기다리는 다른 요청은 계속
+        return await asyncio.shield(task)
+
+    # ------------------------------ 워커 간 -------------------------------
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if self._disk is None:
+            return await fn()
+
+        lock_key, result_key = f"lock:{key}", f"result:{key}"
+        deadline = time.monotonic() + self.lock_ttl
+        while True:
+            acquired = await asyncio.to_thread(
+                self._disk.add, lock_key, self._owner, expire=self.lock_ttl
+            )
+            if acquired:
+                return await self._lead(lock_key, result_key, fn)
+
+            # follower: leader 가 결과를 넘겨줄 때까지 대기
+            while True:
+                handoff = await asyncio.to_thread(self._disk.get, result_key)
+                if handoff is not None:
+                    return self._unwrap(handoff)
+                if await asyncio.to_thread(self._disk.get, lock_key) is None:
+                    break                   # leader 종료(결과 없음) → 잠금 재시도
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"single-flight 대기 시간 초과: {key}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _lead(self, lock_key: str, result_key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # 이전 실행의 결과가 남아 있으면 follower 가 잘못 가져가지 않도록 먼저 제거
+        await asyncio.to_thread(self._disk.delete, result_key)
+        try:
+            value = await fn()
+        except Exception as exc:
+            await asyncio.to_thread(
+                self._disk.set, result_key, (False, (type(exc).__name__, str(exc))),
+                expire=self.handoff_ttl,
+            )
+            raise
+        else:
+            await asyncio.to_thread(
+                self._disk.set, result_key, (True, value), expire=self.handoff_ttl
+            )
+            return value
+        finally:
+            await asyncio.to_thread(self._disk.delete, lock_key)
+
+    def _unwrap(self, handoff: tuple[bool, Any]) -> Any:
+        ok, value = handoff
+        if ok:
+            return value
+        name, message = value
+        cls = self._reraise.get(name)
+        if cls is not None:
+            raise cls(message)
+        raise RuntimeError(f"single-flight leader 실패: {name}: {message}")
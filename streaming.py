@@ -0,0 +1,37 @@
+"""
+streaming.py
+~~~~~~~~~~~~
+StreamingResponse 로 내보낼 NDJSON / SSE 프레임을 만드는 유틸리티 모듈입니다.
+
+주요 기능
+---------
+1. **ndjson_line(obj)**   → ``{"...": ...}\\n`` 한 줄
+2. **sse_event(obj, event)** → ``event: ...\\ndata: ...\\n\\n`` 한 프레임
+3. **NDJSON_MEDIA_TYPE / SSE_MEDIA_TYPE / SSE_HEADERS** 응답용 상수
+"""
+
+import json
+from typing import Any, Optional
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE    = "text/event-stream"
+
+# 프록시(nginx 등)가 SSE 를 버퍼링하지 않도록
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def ndjson_line(obj: Any) -> str:
+    """객체를 NDJSON 한 줄로 직렬화합니다(한글 그대로 유지)."""
+    return json.dumps(obj, ensure_ascii=False) + "\n"
+
+
+def sse_event(obj: Any, event: Optional[str] = None) -> str:
+    """객체를 SSE 프레임으로 직렬화합니다. 문자열은 그대로 data 로 보냅니다."""
+    data = obj if isinstance(obj, str) else json.dumps(obj, ensure_ascii=False)
+    frame = f"event: {event}\n" if event else ""
+    # data 안의 줄바꿈은 data: 줄을 나눠서 보내야 클라이언트가 그대로 복원함
+    frame += "".join(f"data: {line}\n" for line in data.split("\n"))
+    return frame + "\n"
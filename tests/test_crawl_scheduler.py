@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import crawl_scheduler
+from crawl_scheduler import CrawlScheduler, HostUnavailable, _HostState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(crawl_scheduler, "time", SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(crawl_scheduler, "CRAWL_BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(crawl_scheduler, "CRAWL_BREAKER_COOLDOWN", 30.0)
+    return fake
+
+
+def open_circuit(state):
+    for _ in range(3):
+        state.record_failure()
+    assert state.circuit == "open"
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    state = _HostState("example.com", 4, 5.0, 5.0)
+    state.record_failure()
+    state.record_failure()
+    assert state.circuit == "closed"
+    assert state.admit(clock.now) == (True, False)
+
+    state.record_failure()
+    assert state.circuit == "open"
+    assert state.admit(clock.now + 29) == (False, False)
+
+
+def test_half_open_admits_a_single_probe(clock):
+    state = _HostState("example.com", 4, 5.0, 5.0)
+    open_circuit(state)
+
+    assert state.admit(clock.now + 30) == (True, True)
+    assert state.circuit == "half_open"
+    assert state.admit(clock.now + 30) == (False, False)
+
+
+def test_only_the_probe_closes_the_circuit(clock):
+    state = _HostState("example.com", 4, 5.0, 5.0)
+    open_circuit(state)
+    state.admit(clock.now + 30)
+
+    state.record_success(is_probe=False)    # open 전에 보낸 요청이 늦게 성공
+    assert state.circuit == "half_open"
+    assert state.probing
+
+    state.record_success(is_probe=True)
+    assert state.circuit == "closed"
+    assert not state.probing
+    assert state.admit(clock.now + 30) == (True, False)
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    state = _HostState("example.com", 4, 5.0, 5.0)
+    open_circuit(state)
+    clock.now += 30
+    state.admit(clock.now)
+
+    state.record_failure(is_probe=True)
+    assert state.circuit == "open"
+    assert not state.probing
+    assert state.admit(clock.now + 29) == (False, False)
+    assert state.admit(clock.now + 30) == (True, True)
+
+
+def test_retry_after_pauses_the_host(clock):
+    state = _HostState("example.com", 4, 5.0, 5.0)
+    response = httpx.Response(429, headers={"Retry-After": "7"})
+    state.record(response)
+
+    assert state.throttled == 1
+    assert state.rate < 5.0
+    assert state.wait_time(clock.now) == pytest.approx(7.0)
+    assert state.wait_time(clock.now + 7) == 0.0
+
+
+def test_get_rejects_without_request_while_circuit_is_open(monkeypatch):
+    monkeypatch.setattr(crawl_scheduler, "CRAWL_BREAKER_THRESHOLD", 2)
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(503)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(crawl_scheduler, "get_async_client", lambda: client)
+
+    async def main():
+        scheduler = CrawlScheduler(rate=1000.0, burst=1000.0)
+        for _ in range(2):
+            assert (await scheduler.get("https://example.com/a")).status_code == 503
+        with pytest.raises(HostUnavailable):
+            await scheduler.get("https://example.com/a")
+        await client.aclose()
+        return scheduler.stats()["example.com"]
+
+    stats = asyncio.run(main())
+    assert len(calls) == 2
+    assert stats["circuit"] == "open"
+    assert stats["rejected"] == 1
@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import http_cache
+from http_cache import HttpCache
+
+URL = "https://www.saramin.co.kr/zf_user/search?searchword=test"
+
+
+class FakeScheduler:
+    """crawl_scheduler.get 대신 정해 둔 응답(또는 예외)을 순서대로 돌려줌."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = []
+
+    async def get(self, url, headers=None):
+        self.requests.append(dict(headers or {}))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(http_cache, "time", SimpleNamespace(time=lambda: fake.now))
+    monkeypatch.setattr(http_cache, "HTTP_CACHE_MIN_FRESH", 60.0)
+    return fake
+
+
+def use(monkeypatch, *outcomes):
+    scheduler = FakeScheduler(*outcomes)
+    monkeypatch.setattr(http_cache, "crawl_scheduler", scheduler)
+    return scheduler
+
+
+def ok(body="<html>v1</html>"):
+    return httpx.Response(
+        200,
+        headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        text=body,
+        request=httpx.Request("GET", URL),
+    )
+
+
+def test_fresh_copy_is_served_without_request(tmp_path, monkeypatch, clock):
+    cache = HttpCache(cache_dir=str(tmp_path))
+    scheduler = use(monkeypatch, ok())
+
+    first = asyncio.run(cache.get(URL))
+    clock.now += 59
+    second = asyncio.run(cache.get(URL))
+
+    assert first.extensions["cache"] == "miss"
+    assert second.extensions["cache"] == "fresh"
+    assert second.text == "<html>v1</html>"
+    assert len(scheduler.requests) == 1
+
+
+def test_304_revalidates_stored_copy_and_reuses_parse(tmp_path, monkeypatch, clock):
+    cache = HttpCache(cache_dir=str(tmp_path))
+    not_modified = httpx.Response(304, headers={"ETag": '"v1"'}, request=httpx.Request("GET", URL))
+    scheduler = use(monkeypatch, ok(), not_modified)
+    parsed = []
+
+    def parse(text):
+        parsed.append(text)
+        return [text.upper()]
+
+    async def main():
+        first = await cache.get(URL, headers={"User-Agent": "test"})
+        first_result = await cache.parse(first, "list", parse, first.text)
+        clock.now += 61
+        second = await cache.get(URL, headers={"User-Agent": "test"})
+        second_result = await cache.parse(second, "list", parse, second.text)
+        return second, first_result, second_result
+
+    second, first_result, second_result = asyncio.run(main())
+    assert second.extensions["cache"] == "revalidated"
+    assert second.text == "<html>v1</html>"
+    assert first_result == second_result == ["<HTML>V1</HTML>"]
+    assert len(parsed) == 1
+
+    conditional = scheduler.requests[1]
+    assert conditional["If-None-Match"] == '"v1"'
+    assert conditional["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert conditional["User-Agent"] == "test"
+    assert cache.stats()["revalidated_hits"] == 1
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [httpx.ConnectError("down"), httpx.Response(503, request=httpx.Request("GET", URL))],
+)
+def test_stale_copy_is_served_when_revalidation_fails(tmp_path, monkeypatch, clock, failure):
+    cache = HttpCache(cache_dir=str(tmp_path))
+    use(monkeypatch, ok(), failure)
+
+    asyncio.run(cache.get(URL))
+    clock.now += 61
+    response = asyncio.run(cache.get(URL))
+
+    assert response.status_code == 200
+    assert response.extensions["cache"] == "stale"
+    assert response.text == "<html>v1</html>"
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_error_without_stored_copy_is_raised(tmp_path, monkeypatch, clock):
+    cache = HttpCache(cache_dir=str(tmp_path))
+    use(monkeypatch, httpx.ConnectError("down"))
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(cache.get(URL))
@@ -0,0 +1,16 @@
+from image_ocr import stitch_strip_texts
+
+
+def test_stitch_keeps_similar_lines_at_blank_row_cut():
+    texts = ["자격요건\n• 경력 3년 이상", "• 경력 5년 이상\n우대사항"]
+    assert stitch_strip_texts(texts, [False]) == "자격요건\n• 경력 3년 이상\n• 경력 5년 이상\n우대사항"
+
+
+def test_stitch_dedups_exact_lines_at_overlapping_cut():
+    texts = ["자격요건\n• 경력 3년 이상", "• 경력  3년 이상\n우대사항"]
+    assert stitch_strip_texts(texts, [True]) == "자격요건\n• 경력 3년 이상\n우대사항"
+
+
+def test_stitch_keeps_near_duplicates_at_overlapping_cut():
+    texts = ["• 경력 3년 이상", "• 경력 5년 이상"]
+    assert stitch_strip_texts(texts, [True]) == "• 경력 3년 이상\n• 경력 5년 이상"
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import pytest
+from openai import BadRequestError, RateLimitError
+
+from openai_scheduler import OpenAIQueueFull, OpenAIScheduler, _retry_after, _TokenBucket
+
+
+def api_error(cls, status, headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("error", response=response, body=None)
+
+
+def test_bucket_refills_at_per_minute_rate():
+    bucket = _TokenBucket(60)               # 초당 1개, 최대 60개
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0.0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+def test_bucket_caps_requests_larger_than_capacity():
+    bucket = _TokenBucket(60)
+    now = bucket.updated
+    assert bucket.wait_time(1000, now) == 0.0   # 1분치보다 큰 요청도 가득 찬 버킷이면 통과
+    bucket.take(1000)
+    assert bucket.tokens == 0.0
+
+
+def test_bucket_pause_blocks_until_retry_after(monkeypatch):
+    bucket = _TokenBucket(60)
+    now = bucket.updated
+    monkeypatch.setattr("openai_scheduler.time.monotonic", lambda: now)
+    bucket.pause(5)
+    assert bucket.wait_time(1, now) == pytest.approx(5.0)
+    assert bucket.wait_time(1, now + 5) == 0.0
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"retry-after": "3"}, 3.0),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after_header(headers, expected):
+    assert _retry_after(api_error(RateLimitError, 429, headers)) == expected
+
+
+def test_rate_limit_is_retried_after_retry_after_and_pauses_buckets():
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise api_error(RateLimitError, 429, {"retry-after-ms": "10"})
+        return "ok"
+
+    async def main():
+        scheduler = OpenAIScheduler(rpm=600, tpm=10000)
+        result = await scheduler.run(call, tokens=10)
+        return scheduler, result
+
+    scheduler, result = asyncio.run(main())
+    assert result == "ok"
+    assert attempts == 2
+    assert scheduler._requests.paused_until > 0
+    stats = scheduler.stats()
+    assert (stats["completed"], stats["retries"], stats["failed"]) == (1, 1, 0)
+
+
+def test_non_retryable_error_is_not_retried():
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        raise api_error(BadRequestError, 400)
+
+    scheduler = OpenAIScheduler()
+    with pytest.raises(BadRequestError):
+        asyncio.run(scheduler.run(call))
+    assert attempts == 1
+    assert scheduler.stats()["failed"] == 1
+
+
+def test_full_queue_rejects_immediately():
+    async def call():
+        raise AssertionError("must not be called")
+
+    scheduler = OpenAIScheduler(max_queue=0)
+    with pytest.raises(OpenAIQueueFull):
+        asyncio.run(scheduler.run(call))
+    assert scheduler.stats()["rejected"] == 1
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+def test_concurrent_calls_in_one_worker_run_once():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        flight = SingleFlight(cache_dir=None)
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == [1] * 5
+    assert calls == 1
+
+
+def test_follower_in_other_worker_gets_leader_result(tmp_path):
+    calls = 0
+
+    async def main():
+        leader = SingleFlight(cache_dir=str(tmp_path), poll_interval=0.01)
+        follower = SingleFlight(cache_dir=str(tmp_path), poll_interval=0.01)
+        started = asyncio.Event()
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            started.set()
+            await asyncio.sleep(0.05)
+            return ["job"]
+
+        async def unused():
+            raise AssertionError("follower must not run the work")
+
+        lead = asyncio.create_task(leader.do("k", work))
+        await started.wait()
+        return await asyncio.gather(lead, follower.do("k", unused))
+
+    assert asyncio.run(main()) == [["job"], ["job"]]
+    assert calls == 1
+
+
+@pytest.mark.parametrize("exc_type, reraised", [(QueueFull, QueueFull), (ValueError, RuntimeError)])
+def test_follower_in_other_worker_reraises_registered_exceptions(tmp_path, exc_type, reraised):
+    async def main():
+        leader = SingleFlight(cache_dir=str(tmp_path), poll_interval=0.01, reraise=(QueueFull,))
+        follower = SingleFlight(cache_dir=str(tmp_path), poll_interval=0.01, reraise=(QueueFull,))
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(0.05)
+            raise exc_type("대기열 초과")
+
+        lead = asyncio.create_task(leader.do("k", work))
+        await started.wait()
+        results = await asyncio.gather(lead, follower.do("k", work), return_exceptions=True)
+        return results
+
+    lead_error, follow_error = asyncio.run(main())
+    assert type(lead_error) is exc_type
+    assert type(follow_error) is reraised
+    assert "대기열 초과" in str(follow_error)
@@ -0,0 +1,25 @@
+import pytest
+
+from image_ocr import words_to_text
+from text_normalize import clean_ocr_text
+
+
+@pytest.mark.parametrize("line", ["C/C++", "C++, C#", "C#/.NET", "Node.js · TypeScript", "경력 3~5년"])
+def test_clean_ocr_text_keeps_tech_stack_lines(line):
+    assert clean_ocr_text(line) == line
+
+
+@pytest.mark.parametrize("line", ["...", "|—|", "• ·", "a |}{]\\"])
+def test_clean_ocr_text_drops_symbol_noise(line):
+    assert clean_ocr_text(line) == ""
+
+
+def test_words_to_text_drops_low_confidence_words():
+    data = {
+        "text":      ["", "자격요건", "", "C/C++", "~|", "", "우대"],
+        "conf":      [-1, 95, -1, 88, 12, -1, 90],
+        "block_num": [1, 1, 1, 1, 1, 2, 2],
+        "par_num":   [1, 1, 1, 1, 1, 1, 1],
+        "line_num":  [1, 1, 2, 2, 2, 1, 1],
+    }
+    assert words_to_text(data, min_conf=30) == "자격요건\nC/C++\n\n우대"
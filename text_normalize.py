@@ -0,0 +1,160 @@
+"""
+text_normalize.py
+~~~~~~~~~~~~~~~~~
+GPT 직무 추출 전에 원문(td 텍스트)·OCR 텍스트를 정리하고 토큰 예산에 맞추는 모듈입니다.
+
+주요 기능
+---------
+1. **clean_page_text(text)**
+   NFKC·제로폭 문자 제거, 줄 안 공백 축약, 메뉴·버튼 같은 상투 문구 줄과
+   연속 중복 줄 제거
+2. **clean_ocr_text(text)**
+   위 정리 + 잡음 OCR 줄 제거
+   (단어별 confidence 필터는 image_ocr 에서 이미 적용됨. 여기서는 남은 줄 중
+   글자(한글·영문·숫자 + 기술 스택 표기용 ``+ # . / ·`` 등) 비율이 OCR_MIN_TEXT_RATIO 미만이거나
+   글자가 너무 적은 줄, 한글·영문·숫자가 하나도 없는 줄을 잡음 줄로 봄. "C/C++", "C#/.NET" 은 유지)
+3. **count_tokens(text)**
+   tiktoken 으로 모델 토큰 수 계산 (인코딩을 불러올 수 없으면 UTF-8 길이로 근사)
+4. **fit_token_budget(page_text, ocr_text, budget)**
+   두 텍스트 합이 EXTRACTION_TOKEN_BUDGET 을 넘으면 긴 쪽부터 줄 단위로 뒤를 잘라 맞춤
+5. **normalize_for_extraction(page_text, ocr_text, model)**
+   1~4 를 차례로 적용하고 절약한 토큰 수를 로그로 남깁니다.
+"""
+
+import os
+import re
+import unicodedata
+from typing import Optional
+
+import tiktoken
+
+# ---------------------------------------------------------------------------
+# 상수 및 설정 (환경 변수로 덮어쓰기 가능)
+# ---------------------------------------------------------------------------
+EXTRACTION_TOKEN_BUDGET = int(os.getenv("EXTRACTION_TOKEN_BUDGET", "6000"))   # 두 텍스트 합 최대 토큰
+OCR_MIN_TEXT_RATIO      = float(os.getenv("OCR_MIN_TEXT_RATIO", "0.6"))       # 줄에서 글자(한글·영문·숫자) 비율
+OCR_MIN_LINE_CHARS      = 2         # 글자가 이보다 적은 줄은 버림
+
+ZERO_WIDTH = dict.fromkeys(map(ord, "​‌‍⁠﻿"))
+
+# 줄 전체가 이 문구면 채용 내용과 무관한 화면 요소로 보고 버림
+BOILERPLATE_LINES = re.compile(
+    r"^(?:"
+    r"로그인|회원가입|홈|메뉴|검색|닫기|더보기|목록|이전|다음|top|맨\s?위로|"
+    r"스크랩|공유하기?|인쇄|신고하기|입사지원|홈페이지\s?지원|즉시\s?지원|지원하기|"
+    r"사람인|saramin|copyright.*|ⓒ.*|©.*|이미지\s?확대|원본\s?보기"
+    r")$",
+    re.IGNORECASE,
+)
+
+WORD_CHARS = re.compile(r"[0-9A-Za-z가-힣]")
+# 글자로 셀 문자: WORD_CHARS + 기술 스택·조건 표기에 흔한 기호 (C++, C#, .NET, Node.js, 3~5년, 100%)
+TEXT_CHARS = re.compile(r"[0-9A-Za-z가-힣+#./·&(),:%~\-]")
+
+# ---------------------------------------------------------------------------
+# Helper: 줄 정리
+# ---------------------------------------------------------------------------
+
+def _clean_lines(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKC", text).translate(ZERO_WIDTH)
+    lines: list[str] = []
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        if not line or BOILERPLATE_LINES.match(line):
+            continue
+        if lines and lines[-1] == line:          # 연속 중복
+            continue
+        lines.append(line)
+    return lines
+
+
+def _is_ocr_noise(line: str) -> bool:
+    if not WORD_CHARS.search(line):           # 기호만 있는 줄 ("...", "|—|")
+        return True
+    text_chars = len(TEXT_CHARS.findall(line))
+    if text_chars < OCR_MIN_LINE_CHARS:
+        return True
+    return text_chars / len(line.replace(" ", "")) < OCR_MIN_TEXT_RATIO
+
+
+def clean_page_text(text: str) -> str:
+    return "\n".join(_clean_lines(text))
+
+
+def clean_ocr_text(text: str) -> str:
+    return "\n".join(line for line in _clean_lines(text) if not _is_ocr_noise(line))
+
+# ---------------------------------------------------------------------------
+# Helper: 토큰 계산
+# ---------------------------------------------------------------------------
+_encodings: dict = {}
+
+def _get_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    """모델 인코딩 (처음 한 번 불러오고, 실패하면 None 을 기억해 근사치 사용)."""
+    if model not in _encodings:
+        try:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(f"⚠️ tiktoken 인코딩 로딩 실패 (근사치 사용): {e}")
+            _encodings[model] = None
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text.encode("utf-8")) + 2) // 3      # 한글 1자 ≈ 1토큰 근사
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _truncate_tokens(text: str, max_tokens: int, model: str) -> str:
+    """앞에서부터 max_tokens 안에 들어가는 줄까지만 남깁니다."""
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = count_tokens(line + "\n", model)
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def fit_token_budget(
+    page_text: str, ocr_text: str, model: str, budget: int = EXTRACTION_TOKEN_BUDGET
+) -> tuple[str, str]:
+    """
+    두 텍스트 합이 budget 을 넘으면 자릅니다.
+    각자 최소 budget 의 절반은 보장하고, 한쪽이 덜 쓰면 남는 만큼을 다른 쪽에 줍니다.
+    """
+    page_tokens, ocr_tokens = count_tokens(page_text, model), count_tokens(ocr_text, model)
+    if page_tokens + ocr_tokens <= budget:
+        return page_text, ocr_text
+
+    half = budget // 2
+    page_limit = max(half, budget - min(ocr_tokens, half))
+    ocr_limit  = budget - min(page_tokens, page_limit)
+    if page_tokens > page_limit:
+        page_text = _truncate_tokens(page_text, page_limit, model)
+    if ocr_tokens > ocr_limit:
+        ocr_text = _truncate_tokens(ocr_text, ocr_limit, model)
+    return page_text, ocr_text
+
+# ---------------------------------------------------------------------------
+# Public: 추출 전 정규화
+# ---------------------------------------------------------------------------
+
+def normalize_for_extraction(
+    page_text: str, ocr_text: str, model: str, budget: int = EXTRACTION_TOKEN_BUDGET
+) -> tuple[str, str]:
+    """원문·OCR 텍스트 → (정리 + 토큰 예산 적용한 원문, OCR). 절약 토큰 수를 출력합니다."""
+    before = count_tokens(page_text, model) + count_tokens(ocr_text, model)
+    page_text, ocr_text = fit_token_budget(
+        clean_page_text(page_text), clean_ocr_text(ocr_text), model, budget
+    )
+    after = count_tokens(page_text, model) + count_tokens(ocr_text, model)
+    if before:
+        print(f"[✂] 추출 입력 토큰 {before} → {after} (-{before - after}, {100 * (before - after) / before:.0f}%)")
+    return page_text, ocr_text
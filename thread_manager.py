@@ -1,18 +1,26 @@
 # thread_manager.py
 import uuid
-from typing import Dict
 from openai import AsyncOpenAI
-openai = AsyncOpenAI()
 
-_thread_map: Dict[str, str] = {}          # {session_key: thread_id}
+from session_store import SessionStore
+from openai_scheduler import openai_scheduler
+
+openai = AsyncOpenAI(max_retries=0)   # 재시도는 openai_scheduler
+
+# {session_key: thread_id}  SQLite 원본 + 워커별 LRU (워커 간·재시작 후에도 유지, TTL 만료)
+_thread_store = SessionStore()
 
 def new_session_key() -> str:
     return str(uuid.uuid4())
 
 async def get_or_create_thread(session_key: str) -> str:
-    if session_key in _thread_map:
-        return _thread_map[session_key]
+    thread_id = await _thread_store.get(session_key)
+    if thread_id is not None:
+        return thread_id
+
+    thread = await openai_scheduler.run(lambda: openai.beta.threads.create())  # 빈 Thread
+    # 다른 워커가 먼저 만들었으면 그 Thread 를 사용
+    return await _thread_store.set_if_absent(session_key, thread.id)
 
-    thread = await openai.beta.threads.create()  # 빈 Thread
-    _thread_map[session_key] = thread.id
-    return thread.id
\ No newline at end of file
+async def forget_thread(session_key: str) -> None:
+    await _thread_store.delete(session_key)